@@ -3,11 +3,15 @@ FastAPI server for Interview System API
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 
+from src.api.responses import ORJSONResponse
 from src.api.routes import router as api_router
 from src.api.webhook_routes import router as webhook_router
 from config.database import db_manager
+from config.settings import settings
+from src.services.job_manager import job_manager
 from src.utils.logger import logger
 
 
@@ -27,6 +31,8 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down Interview System API...")
+    job_manager.shutdown()
+    await db_manager.dispose_async_engine()
 
 
 # Create FastAPI app
@@ -34,9 +40,24 @@ app = FastAPI(
     title="Interview System API",
     description="API for managing and retrieving interview data with AI-powered grading",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+
+def add_compression(app: FastAPI):
+    """Brotli (with gzip fallback) when brotli-asgi is installed, gzip otherwise"""
+    if settings.response_brotli:
+        try:
+            from brotli_asgi import BrotliMiddleware
+        except ImportError:
+            logger.warning("brotli-asgi not installed, falling back to gzip compression")
+        else:
+            app.add_middleware(BrotliMiddleware, minimum_size=settings.response_compression_min_size, gzip_fallback=True)
+            return
+    app.add_middleware(GZipMiddleware, minimum_size=settings.response_compression_min_size)
+
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +67,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression
+add_compression(app)
+
 # Include routers
 app.include_router(api_router)
 app.include_router(webhook_router)
@@ -20,13 +20,31 @@ class Settings(BaseSettings):
 
     # Vector Store
     vector_store_path: str = "./data/vectorstore"
+    
+    # Local Q&A store (QADatabase, SQLite WAL)
+    qa_database_path: str = "./data/qa_database.sqlite3"
 
     # Interview Settings
     similarity_threshold: float = 0.8
+    embedding_version_check_seconds: float = 30.0  # PgVectorSearch đọc lại version active (flip re-embedding)
     top_k_results: int = 3
     pass_threshold: float = 6.0
     passing_score: float = 6.0
     
+    # Read model
+    session_document_compression: bool = False  # Lưu detail document dạng zlib thay vì JSONB
+    response_cache_ttl_seconds: float = 30.0  # Giới hạn độ trễ khi worker ở process khác ghi session
+    response_cache_max_entries: int = 512
+    user_id_cache_max_entries: int = 10000  # (name, role) -> users.id trong UserDatabase
+    
+    # API responses
+    response_compression_min_size: int = 1024  # Bytes; response nhỏ hơn không nén
+    response_brotli: bool = True  # Brotli cho client gửi "br" (cần brotli-asgi), còn lại gzip
+    
+    # Retention user_interactions (partition theo tháng)
+    interaction_retention_months: int = 24
+    interaction_archive_dir: str = "./data/archive"
+    
     # Logging
     log_level: str = "INFO"
 
@@ -38,6 +56,16 @@ class Settings(BaseSettings):
     webhook_port: int = 8000
     webhook_secret: Optional[str] = None  # Secret để verify webhook
 
+    # Background jobs
+    job_workers: int = 3  # Tổng số worker dùng chung cho các lane
+    job_interactive_concurrency: int = 2  # POST /process-file (thủ công)
+    job_background_concurrency: int = 2  # Webhook; nên < job_workers để luôn chừa chỗ cho job thủ công
+    job_queue_backend: str = "local"  # local (in-process) hoặc postgres (processing_jobs + workers)
+    job_lease_seconds: int = 300
+    job_max_attempts: int = 5
+    job_retry_base_seconds: int = 30
+    job_retry_max_seconds: int = 3600
+
     class Config:
         env_file = ".env"
         case_sensitive = False
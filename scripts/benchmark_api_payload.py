@@ -0,0 +1,131 @@
+"""
+Payload benchmark: serialization time and bytes on the wire for API responses
+
+Compares FastAPI's default path (jsonable_encoder + json.dumps) with orjson,
+and raw vs gzip vs Brotli sizes, for the full interview detail document and
+for projections that drop the heavy text fields.
+
+Usage:
+    python -m scripts.benchmark_api_payload                       # synthetic detail, 10 questions
+    python -m scripts.benchmark_api_payload --questions 30 --repeat 2000
+    python -m scripts.benchmark_api_payload --session-id <uuid>   # real detail document from the DB
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+from typing import Callable, Dict
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from src.api.routes import _project
+
+
+PROJECTIONS = (
+    ("full", None, None),
+    ("exclude correctAnswer", None, "questions.correctAnswer"),
+    ("exclude correctAnswer,feedback", None, "questions.correctAnswer,questions.feedback"),
+    ("fields scores only", "session_id,overallScore,overallResult,questions.question,questions.score,questions.passed", None)
+)
+
+
+WORDS = (
+    "ứng viên trình bày REST GraphQL endpoint tài nguyên schema client server cache phiên bản "
+    "truy vấn dữ liệu hiệu năng bảo mật xác thực token giao dịch chỉ mục phân trang lỗi kiểm thử "
+    "triển khai giám sát microservice hàng đợi đồng bộ bất đồng bộ mở rộng khả dụng nhất quán"
+).split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def synthetic_detail(questions: int) -> Dict:
+    """Detail document with realistic text lengths (non-repeating, so compression is not flattered)"""
+    rng = random.Random(0)
+    return {
+        "session_id": "00000000-0000-0000-0000-000000000000",
+        "candidate": "Trần Thị B",
+        "interviewer": "Nguyễn Văn A",
+        "position": "Senior Developer",
+        "date": "2025-11-15 14:30:00",
+        "overallScore": 7.5,
+        "overallResult": "pass",
+        "totalQuestions": questions,
+        "passedQuestions": questions - 1,
+        "strengths": _text(rng, 60),
+        "weaknesses": _text(rng, 60),
+        "summary": _text(rng, 120),
+        "questions": [
+            {
+                "question": f"Câu hỏi {i}: REST và GraphQL khác nhau như thế nào?",
+                "answer": _text(rng, 120),
+                "correctAnswer": _text(rng, 250),
+                "score": 7.5,
+                "passed": True,
+                "feedback": _text(rng, 60)
+            }
+            for i in range(questions)
+        ]
+    }
+
+
+def load_detail(session_id: str) -> Dict:
+    from src.api.interview_service import InterviewService
+
+    detail = InterviewService().get_interview_detail(session_id)
+    if not detail:
+        raise SystemExit(f"Session not found: {session_id}")
+    return detail
+
+
+def fastapi_default(payload: Dict) -> bytes:
+    """What JSONResponse does for a dict returned from a route"""
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def time_per_call(fn: Callable, payload: Dict, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(payload)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API payload serialization and compression")
+    parser.add_argument("--questions", type=int, default=10, help="Questions in the synthetic detail")
+    parser.add_argument("--session-id", help="Benchmark a real detail document instead")
+    parser.add_argument("--repeat", type=int, default=1000, help="Serializations per measurement")
+    args = parser.parse_args()
+
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    detail = load_detail(args.session_id) if args.session_id else synthetic_detail(args.questions)
+
+    print("\n" + "=" * 92)
+    print("API PAYLOAD BENCHMARK")
+    print("=" * 92)
+    print(f"{'payload':<32} {'default µs':>11} {'orjson µs':>10} {'raw B':>9} {'gzip B':>9} {'br B':>9}")
+    for name, fields, exclude in PROJECTIONS:
+        payload = _project(detail, fields, exclude)
+        default_us = time_per_call(fastapi_default, payload, args.repeat) * 1e6
+        orjson_us = time_per_call(orjson.dumps, payload, args.repeat) * 1e6
+
+        body = orjson.dumps(payload)
+        # Cùng mức nén với GZipMiddleware (9) và BrotliMiddleware (quality 4)
+        gzipped = len(gzip.compress(body, compresslevel=9))
+        brotlied = len(brotli.compress(body, quality=4)) if brotli else None
+        print(f"{name:<32} {default_us:>11.1f} {orjson_us:>10.1f} {len(body):>9} {gzipped:>9} "
+              f"{brotlied if brotlied is not None else 'n/a':>9}")
+    print("=" * 92 + "\n")
+
+
+if __name__ == "__main__":
+    main()
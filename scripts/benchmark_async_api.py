@@ -0,0 +1,137 @@
+"""
+Concurrency benchmark: blocking vs async InterviewService calls on one event loop
+
+Simulates one API worker serving a mix of slow requests (SELECT pg_sleep)
+and fast list/detail requests. With blocking calls every slow query stalls
+the loop, so fast requests queue behind it; with the async engine they
+complete while the slow queries are in flight.
+
+Usage:
+    python -m scripts.benchmark_async_api
+    python -m scripts.benchmark_async_api --slow 5 --slow-seconds 1.0 --fast 200
+"""
+import argparse
+import asyncio
+import math
+import time
+from typing import Dict, List
+
+from sqlalchemy import text
+
+from config.database import db_manager
+from src.api.interview_service import InterviewService
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(math.ceil(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[rank]
+
+
+class BlockingHandlers:
+    """What the routes did before: sync calls inside `async def`"""
+
+    def __init__(self, service: InterviewService):
+        self.service = service
+
+    async def slow(self, seconds: float):
+        session = db_manager.get_session()
+        try:
+            session.execute(text("SELECT pg_sleep(:s)"), {"s": seconds})
+        finally:
+            session.close()
+
+    async def fast(self, session_id: str):
+        if session_id:
+            self.service.get_interview_detail(session_id)
+        else:
+            self.service.get_interview_list(page=1, page_size=10)
+
+
+class AsyncHandlers:
+    """Routes on the asyncpg engine"""
+
+    def __init__(self, service: InterviewService):
+        self.service = service
+
+    async def slow(self, seconds: float):
+        async with db_manager.get_async_session() as session:
+            await session.execute(text("SELECT pg_sleep(:s)"), {"s": seconds})
+
+    async def fast(self, session_id: str):
+        if session_id:
+            await self.service.get_interview_detail_async(session_id)
+        else:
+            await self.service.get_interview_list_async(page=1, page_size=10)
+
+
+async def run_scenario(handlers, args, session_id: str) -> Dict:
+    latencies = []
+
+    async def timed_fast(delay: float):
+        # Latency tính từ thời điểm request "tới", gồm cả thời gian chờ event loop
+        arrival = time.perf_counter() + delay
+        await asyncio.sleep(delay)
+        await handlers.fast(session_id)
+        latencies.append(time.perf_counter() - arrival)
+
+    # Request nhanh tới đều trong suốt thời gian các query chậm đang chạy
+    window = args.slow_seconds * args.slow
+    tasks = [timed_fast(window * i / args.fast) for i in range(args.fast)]
+    tasks += [handlers.slow(args.slow_seconds) for _ in range(args.slow)]
+
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "elapsed": elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "max_ms": max(latencies) * 1000 if latencies else 0.0
+    }
+
+
+async def main_async(args):
+    service = InterviewService()
+
+    latest = service.get_interview_list(page=1, page_size=1, total_mode="none")["results"]
+    session_id = latest[0]["session_id"] if latest and args.detail else ""
+
+    # Warm up both pools so connection setup is not measured
+    await AsyncHandlers(service).fast(session_id)
+    await BlockingHandlers(service).fast(session_id)
+
+    results = {}
+    for name, handlers in (("blocking", BlockingHandlers(service)), ("async", AsyncHandlers(service))):
+        results[name] = await run_scenario(handlers, args, session_id)
+
+    await db_manager.dispose_async_engine()
+
+    print("\n" + "=" * 70)
+    print("MIXED SLOW/FAST REQUEST BENCHMARK")
+    print("=" * 70)
+    print(f"{args.slow} slow requests ({args.slow_seconds}s each) + {args.fast} fast "
+          f"{'detail' if session_id else 'list'} requests")
+    print(f"{'mode':>10} {'wall s':>8} {'fast p50 ms':>12} {'fast p95 ms':>12} {'fast max ms':>12}")
+    for name, r in results.items():
+        print(f"{name:>10} {r['elapsed']:>8.2f} {r['p50_ms']:>12.1f} {r['p95_ms']:>12.1f} {r['max_ms']:>12.1f}")
+    print("=" * 70 + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark blocking vs async API handlers")
+    parser.add_argument("--slow", type=int, default=3, help="Number of slow requests")
+    parser.add_argument("--slow-seconds", type=float, default=1.0, help="Duration of each slow query")
+    parser.add_argument("--fast", type=int, default=100, help="Number of fast requests")
+    parser.add_argument("--detail", action="store_true", help="Use the detail endpoint for fast requests")
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Regression benchmark for InterviewService.get_interview_list
+
+Seeds synthetic sessions in steps and checks that the number of SQL
+statements per call stays constant as the page size and table size grow.
+Synthetic rows are marked with position BENCH_POSITION and removed afterwards.
+
+Usage:
+    python -m scripts.benchmark_interview_list
+    python -m scripts.benchmark_interview_list --sizes 1000,10000,50000 --page-sizes 10,100
+"""
+import argparse
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from config.database import db_manager, User, InterviewSession
+from src.api.interview_service import InterviewService
+
+
+BENCH_POSITION = "__benchmark__"
+BENCH_USER_PREFIX = "__bench__"
+
+
+class QueryCounter:
+    """Count SQL statements sent through the engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def seed(target_rows: int, seeded: int) -> int:
+    """Add synthetic sessions until `target_rows` benchmark rows exist"""
+    missing = target_rows - seeded
+    if missing <= 0:
+        return seeded
+
+    session = db_manager.get_session()
+    try:
+        # Mỗi bước seed dùng lại interviewer của bước trước (unique (name, role))
+        statement = pg_insert(User).values(name=f"{BENCH_USER_PREFIX}interviewer", role="interviewer")
+        interviewer_id = session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[User.name, User.role], set_={"name": statement.excluded.name}
+            ).returning(User.id)
+        ).scalar_one()
+        now = datetime.utcnow()
+
+        for start in range(0, missing, 1000):
+            batch = min(1000, missing - start)
+            candidate_ids = session.execute(
+                insert(User).returning(User.id),
+                [{"name": f"{BENCH_USER_PREFIX}candidate_{seeded + start + i}", "role": "candidate"} for i in range(batch)]
+            ).scalars().all()
+            session.execute(insert(InterviewSession), [
+                {
+                    "session_id": str(uuid.uuid4()),
+                    "candidate_id": candidate_id,
+                    "interviewer_id": interviewer_id,
+                    "position": BENCH_POSITION,
+                    "total_questions": 5,
+                    "passed_questions": i % 6,
+                    "average_score": float(i % 10),
+                    "overall_result": "pass" if i % 2 else "fail",
+                    "strengths": "x" * 2000,
+                    "weaknesses": "x" * 2000,
+                    "summary": "x" * 4000,
+                    "created_at": now - timedelta(minutes=seeded + start + i)
+                }
+                for i, candidate_id in enumerate(candidate_ids)
+            ])
+        session.commit()
+    finally:
+        session.close()
+
+    return target_rows
+
+
+def cleanup():
+    session = db_manager.get_session()
+    try:
+        session.execute(delete(InterviewSession).where(InterviewSession.position == BENCH_POSITION))
+        session.execute(delete(User).where(User.name.like(f"{BENCH_USER_PREFIX}%")))
+        session.commit()
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the interview list query")
+    parser.add_argument("--sizes", default="100,1000,5000", help="Comma-separated synthetic table sizes")
+    parser.add_argument("--page-sizes", default="10,50,100", help="Comma-separated page sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Calls per measurement")
+    parser.add_argument("--keep", action="store_true", help="Keep synthetic rows after the run")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    page_sizes = [int(s) for s in args.page_sizes.split(",")]
+    service = InterviewService()
+    query_counts = set()
+
+    session = db_manager.get_session()
+    try:
+        existing = session.execute(
+            select(InterviewSession.id).where(InterviewSession.position == BENCH_POSITION).limit(1)
+        ).first()
+    finally:
+        session.close()
+    if existing:
+        print(f"✗ Found leftover benchmark rows (position={BENCH_POSITION}); cleaning up first")
+        cleanup()
+
+    print("\n" + "=" * 70)
+    print("INTERVIEW LIST BENCHMARK")
+    print("=" * 70)
+    print(f"{'rows':>8} {'page_size':>10} {'queries':>8} {'avg ms':>10}")
+
+    seeded = 0
+    try:
+        for size in sorted(sizes):
+            seeded = seed(size, seeded)
+            for page_size in page_sizes:
+                # get_read_session() chọn replica nếu có cấu hình: unit_of_work ép đọc từ primary,
+                # nơi QueryCounter lắng nghe và dữ liệu vừa seed chắc chắn đã có
+                with db_manager.unit_of_work():
+                    with QueryCounter(db_manager.engine) as counter:
+                        service.get_interview_list(page=1, page_size=page_size)
+                    queries = counter.count
+                    query_counts.add(queries)
+
+                    started = time.perf_counter()
+                    for _ in range(args.repeat):
+                        service.get_interview_list(page=1, page_size=page_size)
+                    avg_ms = (time.perf_counter() - started) / args.repeat * 1000
+
+                print(f"{size:>8} {page_size:>10} {queries:>8} {avg_ms:>10.1f}")
+    finally:
+        if not args.keep:
+            cleanup()
+
+    print("=" * 70)
+    if len(query_counts) == 1:
+        print(f"✓ Query count is constant ({query_counts.pop()} per call)\n")
+    else:
+        print(f"✗ Query count grows with data: {sorted(query_counts)}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
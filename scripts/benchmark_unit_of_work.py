@@ -0,0 +1,132 @@
+"""
+Pool checkout benchmark: the database calls of one interview, with and without a unit of work
+
+Replays the calls process_interview_batch makes (checkpoints, users,
+per-question answer lookup + save_interaction + checkpoint, session summary)
+without the LLM, and reports pool checkouts and wall time per interview.
+Synthetic rows use BENCH_USER_PREFIX names / session ids and are removed
+afterwards (interview_stats is rebuilt at the end).
+
+Usage:
+    python -m scripts.benchmark_unit_of_work
+    python -m scripts.benchmark_unit_of_work --questions 20 --interviews 10
+"""
+import argparse
+import time
+import uuid
+
+from sqlalchemy import delete
+
+from config.database import (
+    db_manager, InterviewSession, ProcessingCheckpoint, ReferenceAnswer, User, UserInteraction
+)
+from src.database.checkpoint_db import CheckpointDatabase, GRADE_STAGE, SUMMARY_STAGE
+from src.database.interview_db import InterviewDatabase
+from src.database.session_db import SessionDatabase
+from src.database.stats_db import StatsDatabase
+from src.database.user_db import UserDatabase
+from src.utils.cache import user_id_cache
+from src.utils.metrics import metrics
+
+
+BENCH_USER_PREFIX = "__bench__"
+
+
+def run_interview(questions: int, index: int):
+    """Database calls of one graded interview, in process_interview_batch order"""
+    session_id = f"{BENCH_USER_PREFIX}{uuid.uuid4()}"
+    checkpoints = CheckpointDatabase()
+    interviews = InterviewDatabase()
+    users = UserDatabase()
+
+    checkpoints.get_stage_items(session_id, GRADE_STAGE)
+    interviews.delete_session_interactions(session_id, keep_ids=[])
+    candidate_id = users.get_or_create_user(f"{BENCH_USER_PREFIX}candidate {index}", "candidate")
+    interviewer_id = users.get_or_create_user(f"{BENCH_USER_PREFIX}interviewer", "interviewer")
+
+    for i in range(1, questions + 1):
+        interviews.get_question_by_id(-1)
+        interaction_id = interviews.save_interaction(
+            candidate_id=candidate_id,
+            interviewer_id=interviewer_id,
+            question_id=None,
+            answer_original="Câu trả lời mẫu",
+            question_summarized=f"Câu hỏi {i}",
+            final_answer=f"{BENCH_USER_PREFIX}reference answer {i}",
+            is_passed=True,
+            grading_score=7,
+            feedback="Tốt",
+            session_id=session_id,
+            question_index=i,
+            answer_source="ai_generated_new_question"
+        )
+        checkpoints.save(session_id, GRADE_STAGE, {"interaction_id": interaction_id}, item_key=str(i))
+
+    checkpoints.get(session_id, SUMMARY_STAGE)
+    SessionDatabase().save_session_summary(
+        session_id=session_id,
+        candidate_id=candidate_id,
+        interviewer_id=interviewer_id,
+        position=BENCH_USER_PREFIX,
+        total_questions=questions,
+        passed_questions=questions,
+        average_score=7.0,
+        overall_result="pass",
+        strengths="-",
+        weaknesses="-",
+        summary="-"
+    )
+
+
+def measure(label: str, questions: int, interviews: int, unit_of_work: bool):
+    before = metrics.total("db.pool.checkouts.")
+    started = time.perf_counter()
+    for index in range(interviews):
+        # Cache id user trống như một process mới
+        user_id_cache.clear()
+        if unit_of_work:
+            with db_manager.unit_of_work():
+                run_interview(questions, index)
+        else:
+            run_interview(questions, index)
+    elapsed = time.perf_counter() - started
+    checkouts = metrics.total("db.pool.checkouts.") - before
+    print(f"{label:<22} {checkouts / interviews:>12.1f} {elapsed / interviews * 1000:>12.1f}")
+
+
+def cleanup():
+    session = db_manager.get_session()
+    try:
+        pattern = f"{BENCH_USER_PREFIX}%"
+        session.execute(delete(UserInteraction).where(UserInteraction.session_id.like(pattern)))
+        session.execute(delete(ProcessingCheckpoint).where(ProcessingCheckpoint.session_id.like(pattern)))
+        session.execute(delete(InterviewSession).where(InterviewSession.session_id.like(pattern)))
+        session.execute(delete(User).where(User.name.like(pattern)))
+        session.execute(delete(ReferenceAnswer).where(ReferenceAnswer.answer.like(pattern)))
+        session.commit()
+    finally:
+        session.close()
+    user_id_cache.clear()
+    StatsDatabase().rebuild()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pool checkouts per interview with and without a unit of work")
+    parser.add_argument("--questions", type=int, default=10, help="Questions per interview")
+    parser.add_argument("--interviews", type=int, default=5, help="Interviews per measurement")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 48)
+    print("UNIT OF WORK BENCHMARK")
+    print("=" * 48)
+    print(f"{'mode':<22} {'checkouts':>12} {'ms':>12}")
+    try:
+        measure("session per method", args.questions, args.interviews, unit_of_work=False)
+        measure("unit of work", args.questions, args.interviews, unit_of_work=True)
+    finally:
+        cleanup()
+    print("=" * 48 + "\n")
+
+
+if __name__ == "__main__":
+    main()
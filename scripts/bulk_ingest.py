@@ -0,0 +1,296 @@
+"""
+Bulk ingestion of historical interviews
+
+Streams JSONL/NDJSON payloads (one MOCK_JSON_INPUT-style object per line)
+through process_interview_batch with a thread or process pool.
+
+Usage:
+    python -m scripts.bulk_ingest data/backfill.jsonl --workers 4
+    python -m scripts.bulk_ingest data/backfill/ --mode process --workers 4
+    python -m scripts.bulk_ingest data/backfill/ --resume          # tiếp tục từ offset đã lưu
+    python -m scripts.bulk_ingest data/backfill.jsonl --start-offset 1200
+
+Offsets are global record numbers across all files (sorted by name), so a
+directory is resumed exactly like a single file.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.processors.batch_processor import process_interview_batch
+from src.utils.metrics import metrics
+from src.utils.logger import logger
+
+
+PAYLOAD_EXTENSIONS = (".jsonl", ".ndjson")
+LLM_CALLS_PREFIX = "llm_calls."
+
+_local = threading.local()
+
+
+def _get_processor():
+    """One InterviewProcessor per worker thread/process (models load once)"""
+    if getattr(_local, "processor", None) is None:
+        from src.processors.interview_processor import InterviewProcessor
+        _local.processor = InterviewProcessor()
+    return _local.processor
+
+
+def list_payload_files(path: str) -> List[str]:
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(PAYLOAD_EXTENSIONS)
+        )
+    return [path]
+
+
+def iter_records(files: List[str], start_offset: int = 0) -> Iterator[Tuple[int, str, int, str]]:
+    """
+    Yield (offset, file, line_no, line) for every non-empty line
+
+    Lines are read lazily, so arbitrarily large files are never loaded into memory.
+    """
+    offset = 0
+    for file_path in files:
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                if offset >= start_offset:
+                    yield offset, file_path, line_no, line
+                offset += 1
+
+
+def process_record(offset: int, payload: Dict, reprocess: bool = False) -> Dict:
+    """Process one interview; runs inside a pool worker"""
+    llm_calls_before = metrics.total(LLM_CALLS_PREFIX)
+    started = time.monotonic()
+    try:
+        result = process_interview_batch(payload, reprocess=reprocess, processor=_get_processor())
+        error = result.get("message") if result.get("status") == "error" else None
+    except Exception as e:
+        result, error = None, str(e)
+
+    return {
+        "offset": offset,
+        "error": error,
+        "session_id": result.get("session_id") if result else None,
+        "seconds": time.monotonic() - started,
+        "llm_calls": metrics.total(LLM_CALLS_PREFIX) - llm_calls_before
+    }
+
+
+class OffsetTracker:
+    """Track completed offsets and persist the highest contiguous one for resume"""
+
+    def __init__(self, start_offset: int, offset_file: Optional[str]):
+        self.next_offset = start_offset
+        self.offset_file = offset_file
+        self._done = set()
+
+    def mark_done(self, offset: int):
+        self._done.add(offset)
+        advanced = False
+        # Chỉ tiến offset khi mọi record trước đó đã xong (pool xử lý không theo thứ tự)
+        while self.next_offset in self._done:
+            self._done.remove(self.next_offset)
+            self.next_offset += 1
+            advanced = True
+        if advanced:
+            self.save()
+
+    def save(self):
+        if not self.offset_file:
+            return
+        tmp_path = f"{self.offset_file}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"next_offset": self.next_offset}, f)
+        os.replace(tmp_path, self.offset_file)
+
+    @staticmethod
+    def load(offset_file: str) -> int:
+        if not os.path.exists(offset_file):
+            return 0
+        with open(offset_file, "r") as f:
+            return int(json.load(f).get("next_offset", 0))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(math.ceil(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[rank]
+
+
+def run(args) -> Dict:
+    files = list_payload_files(args.path)
+    if not files:
+        raise ValueError(f"No {'/'.join(PAYLOAD_EXTENSIONS)} files found in {args.path}")
+
+    offset_file = args.offset_file or os.path.join(
+        args.path if os.path.isdir(args.path) else os.path.dirname(args.path) or ".",
+        ".bulk_ingest_offset.json"
+    )
+    if args.start_offset is not None:
+        start_offset = args.start_offset
+    elif args.resume:
+        start_offset = OffsetTracker.load(offset_file)
+    else:
+        start_offset = 0
+
+    tracker = OffsetTracker(start_offset, offset_file)
+    rejects_path = args.rejects
+    rejects = open(rejects_path, "a", encoding="utf-8")
+
+    if args.mode == "process":
+        executor = ProcessPoolExecutor(max_workers=args.workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="bulk-ingest")
+
+    max_in_flight = args.workers * 2
+    in_flight = {}
+    durations = []
+    stats = {"processed": 0, "succeeded": 0, "rejected": 0, "llm_calls": 0}
+    llm_calls_before = metrics.total(LLM_CALLS_PREFIX)
+    started = time.monotonic()
+
+    def reject(offset: int, source: str, line_no: int, error: str, record: str):
+        rejects.write(json.dumps({
+            "offset": offset,
+            "source": f"{source}:{line_no}",
+            "error": error,
+            "record": record
+        }, ensure_ascii=False) + "\n")
+        rejects.flush()
+        stats["rejected"] += 1
+
+    def collect(done):
+        for future in done:
+            offset, source, line_no, line = in_flight.pop(future)
+            try:
+                outcome = future.result()
+            except Exception as e:
+                outcome = {"offset": offset, "error": f"Worker crashed: {e}", "seconds": 0.0, "llm_calls": 0}
+
+            stats["processed"] += 1
+            stats["llm_calls"] += outcome["llm_calls"]
+            durations.append(outcome["seconds"])
+            if outcome["error"]:
+                reject(offset, source, line_no, outcome["error"], line)
+            else:
+                stats["succeeded"] += 1
+            tracker.mark_done(offset)
+
+            if stats["processed"] % args.log_every == 0:
+                _print_progress(stats, time.monotonic() - started)
+
+    print(f"Ingesting {len(files)} file(s) from offset {start_offset} "
+          f"({args.mode} pool, {args.workers} workers)")
+
+    try:
+        for offset, source, line_no, line in iter_records(files, start_offset):
+            try:
+                payload = json.loads(line)
+                if not isinstance(payload, dict) or not payload.get("qa_pairs"):
+                    raise ValueError("Payload must be an object with non-empty qa_pairs")
+            except ValueError as e:
+                reject(offset, source, line_no, f"Invalid payload: {e}", line)
+                tracker.mark_done(offset)
+                continue
+
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+
+            future = executor.submit(process_record, offset, payload, args.reprocess)
+            in_flight[future] = (offset, source, line_no, line)
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            collect(done)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted - resume with --resume (next offset: {tracker.next_offset})")
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        rejects.close()
+
+    executor.shutdown(wait=True)
+
+    # Thread mode: các thread dùng chung counter của process chính
+    if args.mode == "thread":
+        stats["llm_calls"] = metrics.total(LLM_CALLS_PREFIX) - llm_calls_before
+
+    elapsed = time.monotonic() - started
+    summary = {
+        **stats,
+        "elapsed_seconds": round(elapsed, 1),
+        "interviews_per_minute": round(stats["processed"] / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        "p50_seconds": round(percentile(durations, 50), 2),
+        "p95_seconds": round(percentile(durations, 95), 2),
+        "next_offset": tracker.next_offset,
+        "offset_file": offset_file,
+        "rejects_file": rejects_path
+    }
+    _print_summary(summary)
+    return summary
+
+
+def _print_progress(stats: Dict, elapsed: float):
+    rate = stats["processed"] / elapsed * 60 if elapsed > 0 else 0.0
+    print(f"  {stats['processed']} processed, {stats['rejected']} rejected ({rate:.1f} interviews/min)")
+
+
+def _print_summary(summary: Dict):
+    print("\n" + "=" * 70)
+    print("BULK INGEST SUMMARY")
+    print("=" * 70)
+    print(f"Processed:          {summary['processed']}")
+    print(f"✓ Succeeded:        {summary['succeeded']}")
+    print(f"✗ Rejected:         {summary['rejected']}  -> {summary['rejects_file']}")
+    print(f"Elapsed:            {summary['elapsed_seconds']}s")
+    print(f"Throughput:         {summary['interviews_per_minute']} interviews/min")
+    print(f"LLM calls:          {summary['llm_calls']}")
+    print(f"Per interview p50:  {summary['p50_seconds']}s")
+    print(f"Per interview p95:  {summary['p95_seconds']}s")
+    print(f"Next offset:        {summary['next_offset']}  ({summary['offset_file']})")
+    print("=" * 70 + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ingest JSONL/NDJSON interview payloads")
+    parser.add_argument("path", help="JSONL/NDJSON file or directory of files")
+    parser.add_argument("--workers", type=int, default=4, help="Pool size")
+    parser.add_argument("--mode", choices=("thread", "process"), default="thread",
+                        help="thread: shared models, LLM-bound work; process: CPU-bound work")
+    parser.add_argument("--start-offset", type=int, default=None, help="Skip records before this global offset")
+    parser.add_argument("--resume", action="store_true", help="Start from the offset saved in --offset-file")
+    parser.add_argument("--offset-file", default=None,
+                        help="Where to persist progress (default: .bulk_ingest_offset.json next to the input)")
+    parser.add_argument("--rejects", default="bulk_ingest_rejects.jsonl", help="Append failed records here")
+    parser.add_argument("--reprocess", action="store_true", help="Ignore checkpoints and grade everything again")
+    parser.add_argument("--log-every", type=int, default=50, help="Print progress every N records")
+    args = parser.parse_args()
+
+    try:
+        run(args)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    except Exception as e:
+        logger.error(f"Bulk ingest failed: {e}", exc_info=True)
+        print(f"\nError: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Bulk export of interview sessions and their interactions
+
+Same data as GET /api/v1/export: one row per interaction, streamed from a
+server-side cursor so memory stays flat for any export size.
+
+Usage:
+    python -m scripts.export_interviews --format ndjson > interviews.ndjson
+    python -m scripts.export_interviews --format csv --from 2025-11-01 --to 2025-11-30 -o nov.csv
+    python -m scripts.export_interviews --format parquet -o interviews.parquet   # cần pyarrow
+"""
+import argparse
+import sys
+import time
+from datetime import date
+
+from src.database.export_db import EXPORT_FORMATS, iter_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export interviews as NDJSON/CSV/Parquet")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson", help="Output format")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="First session day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Last session day, inclusive (YYYY-MM-DD)")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout; required for parquet)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows fetched per round trip")
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not args.output:
+        parser.error("--output is required for parquet")
+
+    try:
+        chunks = iter_export(args.format, args.date_from, args.date_to, batch_size=args.batch_size)
+    except (ValueError, RuntimeError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.monotonic()
+    written = 0
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            out.close()
+        else:
+            out.flush()
+
+    # Thống kê ra stderr để không lẫn vào dữ liệu khi ghi ra stdout
+    print(f"✓ Exported {written / 1024:.1f} KiB in {time.monotonic() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Partition maintenance and retention for user_interactions
+
+Creates the upcoming monthly partitions, then handles partitions older than
+the retention window:
+  - archive (default): write them to <archive-dir>/<partition>.ndjson.gz, then drop
+  - detach: detach them, keeping a standalone table for ad-hoc queries
+
+Run daily (e.g. from cron); it is idempotent.
+
+Usage:
+    python -m scripts.interaction_retention --dry-run
+    python -m scripts.interaction_retention --retention-months 24 --mode archive
+    python -m scripts.interaction_retention --mode detach
+
+Sessions, summaries, detail documents and dashboard stats are not touched;
+scripts.refresh_stats after an archive only counts the retained interactions.
+"""
+import argparse
+import sys
+
+from config.settings import settings
+from src.database.partition_db import InteractionPartitionDatabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain user_interactions partitions")
+    parser.add_argument("--retention-months", type=int, default=settings.interaction_retention_months,
+                        help="Keep this many full months (default: INTERACTION_RETENTION_MONTHS)")
+    parser.add_argument("--mode", choices=("archive", "detach"), default="archive",
+                        help="What to do with expired partitions")
+    parser.add_argument("--archive-dir", default=settings.interaction_archive_dir, help="Archive directory")
+    parser.add_argument("--ahead", type=int, default=3, help="Months of partitions to create ahead")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be done")
+    args = parser.parse_args()
+
+    partitions = InteractionPartitionDatabase()
+
+    print("\n" + "="*70)
+    print("USER_INTERACTIONS PARTITION MAINTENANCE")
+    print("="*70)
+
+    if not partitions.is_partitioned():
+        print("✗ user_interactions is not partitioned; run `python -m scripts.migrate upgrade` first")
+        sys.exit(1)
+
+    if not args.dry_run:
+        created = partitions.ensure(args.ahead)
+        print(f"✓ Partitions ensured {args.ahead} months ahead ({created} created)")
+
+    expired = partitions.expired(args.retention_months)
+    print(f"Retention: {args.retention_months} months, {len(expired)} expired partitions")
+
+    for partition in expired:
+        size_mb = partition["size_bytes"] / 1024 / 1024
+        label = f"{partition['name']} ({partition['start']}..{partition['end']}, ~{partition['estimated_rows']} rows, {size_mb:.1f} MB)"
+        if args.dry_run:
+            print(f"  would {args.mode} {label}")
+        elif args.mode == "archive":
+            result = partitions.archive(partition["name"], args.archive_dir)
+            print(f"  ✓ archived {label} -> {result['path']} ({result['rows']} rows)")
+        else:
+            partitions.detach(partition["name"])
+            print(f"  ✓ detached {label}")
+
+    print("="*70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Schema migrations (Alembic, scripts/migrations) and hot-path index check
+
+Usage:
+    python -m scripts.migrate upgrade                # tới head
+    python -m scripts.migrate stamp 0001             # bỏ qua baseline (idempotent, chạy lại cũng được)
+    python -m scripts.migrate downgrade 0001
+    python -m scripts.migrate current
+    python -m scripts.migrate revision -m "add foo"  # tạo file revision mới
+    python -m scripts.migrate check-indexes          # exit 1 nếu thiếu index
+
+check-indexes runs EXPLAIN on the queries the code issues on its hot paths,
+with sequential scans disabled: if the plan still scans the table, no index
+can serve the query. Queries whose ORDER BY is not covered by the index
+(an explicit Sort node) are reported as warnings.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Dict, List
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from config.database import db_manager
+
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations", "alembic.ini")
+
+# (code path, table, SQL mirroring the query it runs, ordered)
+HOT_PATH_QUERIES = (
+    ("InterviewDatabase.get_session_interactions / build_session_document", "user_interactions",
+     "SELECT * FROM user_interactions WHERE session_id = 'probe' "
+     "ORDER BY question_index ASC NULLS LAST, id", False),
+    ("InterviewDatabase.get_user_interactions", "user_interactions",
+     "SELECT * FROM user_interactions WHERE candidate_id = 1 ORDER BY created_at DESC", True),
+    ("InterviewService._interview_list (keyset page)", "interview_sessions",
+     "SELECT id FROM interview_sessions WHERE (created_at, id) < (now(), 0) "
+     "ORDER BY created_at DESC, id DESC LIMIT 11", True),
+    ("InterviewService._list_version", "interview_sessions",
+     "SELECT max(updated_at) FROM interview_sessions", False),
+    ("SessionDatabase.save_session_summary (ON CONFLICT)", "interview_sessions",
+     "SELECT id FROM interview_sessions WHERE session_id = 'probe'", False),
+    ("UserDatabase.get_or_create_user (ON CONFLICT)", "users",
+     "SELECT id FROM users WHERE name = 'probe' AND role = 'candidate'", False),
+    ("InterviewService filter: candidate/interviewer name", "users",
+     "SELECT id FROM users WHERE lower(f_unaccent(name)) LIKE '%probe%'", False),
+    ("InterviewService filter: position", "interview_sessions",
+     "SELECT id FROM interview_sessions WHERE lower(f_unaccent(position)) LIKE '%probe%'", False),
+    ("JobQueueDatabase.claim", "processing_jobs",
+     "SELECT id FROM processing_jobs WHERE job_type = ANY(ARRAY['grade']) AND status = 'queued' "
+     "AND available_at <= now() ORDER BY priority, available_at, id LIMIT 1", False),
+)
+
+
+def alembic_config() -> Config:
+    return Config(ALEMBIC_INI)
+
+
+def _plan_nodes(plan: Dict) -> List[Dict]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+
+def _is_table(relation: str, table: str) -> bool:
+    # Bảng partitioned: plan quét từng partition (user_interactions_2025_01, ...)
+    return relation == table or relation.startswith(f"{table}_")
+
+
+def check_indexes() -> int:
+    """Print one line per hot-path query; returns the number of missing indexes"""
+    missing = 0
+    print("\n" + "=" * 70)
+    print("HOT-PATH INDEX CHECK")
+    print("=" * 70)
+
+    for used_by, table, sql, ordered in HOT_PATH_QUERIES:
+        try:
+            with db_manager.engine.begin() as connection:
+                # Tắt seq scan: nếu plan vẫn seq scan thì không có index nào dùng được
+                connection.execute(text("SET LOCAL enable_seqscan = off"))
+                plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        except Exception as e:
+            missing += 1
+            print(f"✗ {used_by}\n    could not plan query: {str(e).splitlines()[0]}")
+            continue
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        nodes = _plan_nodes(plan[0]["Plan"])
+        seq_scans = [n for n in nodes if n["Node Type"] == "Seq Scan" and _is_table(n.get("Relation Name", ""), table)]
+        # Index của từng partition gộp lại: user_interactions_*_session_id_idx
+        index_names = sorted({
+            re.sub(r"_(\d{4}_\d{2}|default)_", "_*_", n["Index Name"]) for n in nodes if n.get("Index Name")
+        })
+
+        if seq_scans:
+            missing += 1
+            print(f"✗ {used_by}\n    no usable index on {table}")
+        elif ordered and any(n["Node Type"] in ("Sort", "Incremental Sort") for n in nodes):
+            print(f"! {used_by}\n    {', '.join(index_names) or 'index'} used, but ORDER BY needs a sort")
+        else:
+            print(f"✓ {used_by}\n    {', '.join(index_names)}")
+
+    print("=" * 70)
+    print(f"{missing} missing" if missing else "All hot-path queries are indexed")
+    print("=" * 70 + "\n")
+    return missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run schema migrations or check hot-path indexes")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    upgrade = subparsers.add_parser("upgrade", help="Upgrade to a revision (default: head)")
+    upgrade.add_argument("revision", nargs="?", default="head")
+    upgrade.add_argument("--sql", action="store_true", help="Print SQL instead of running it")
+
+    downgrade = subparsers.add_parser("downgrade", help="Downgrade to a revision")
+    downgrade.add_argument("revision")
+
+    stamp = subparsers.add_parser("stamp", help="Mark the database as being at a revision without running it")
+    stamp.add_argument("revision")
+
+    subparsers.add_parser("current", help="Show the current revision")
+    subparsers.add_parser("history", help="List revisions")
+
+    revision = subparsers.add_parser("revision", help="Create a new revision file")
+    revision.add_argument("-m", "--message", required=True)
+
+    subparsers.add_parser("check-indexes", help="Report hot-path queries without a usable index")
+
+    args = parser.parse_args()
+    config = alembic_config()
+
+    if args.command == "upgrade":
+        command.upgrade(config, args.revision, sql=args.sql)
+    elif args.command == "downgrade":
+        command.downgrade(config, args.revision)
+    elif args.command == "stamp":
+        command.stamp(config, args.revision)
+    elif args.command == "current":
+        command.current(config, verbose=True)
+    elif args.command == "history":
+        command.history(config)
+    elif args.command == "revision":
+        command.revision(config, message=args.message)
+    elif args.command == "check-indexes":
+        sys.exit(1 if check_indexes() else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Alembic environment: migrations run against db_manager's DATABASE_URL
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from config.database import Base, db_manager
+
+config = context.config
+
+# create_tables chạy migration trong process của app: giữ cấu hình logging của app
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Emit SQL to stdout instead of running it (alembic upgrade --sql)"""
+    context.configure(
+        url=db_manager.db_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        transaction_per_migration=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with db_manager.engine.connect() as connection:
+        # Mỗi revision một transaction, để autocommit_block (CREATE INDEX CONCURRENTLY) chạy được
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=True
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
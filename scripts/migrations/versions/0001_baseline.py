@@ -0,0 +1,223 @@
+"""
+Baseline: the schema as it stood when migrations were introduced
+
+Written out as plain DDL (not generated from the models, which keep
+changing), with IF NOT EXISTS / ADD COLUMN IF NOT EXISTS so it is safe both
+on an empty database and on one set up by create_tables before migrations
+existed: missing tables are created, and tables from older versions get
+the columns and indexes that the ad-hoc schema updates used to add.
+
+Later schema changes are separate revisions.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        role VARCHAR(50) NOT NULL,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        updated_at TIMESTAMP WITHOUT TIME ZONE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS questions (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL,
+        answer TEXT NOT NULL,
+        category VARCHAR(50),
+        level VARCHAR(20),
+        embedding VECTOR(384),
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        updated_at TIMESTAMP WITHOUT TIME ZONE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS interview_sessions (
+        id SERIAL PRIMARY KEY,
+        session_id VARCHAR(100) NOT NULL,
+        candidate_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        interviewer_id INTEGER REFERENCES users (id) ON DELETE SET NULL,
+        position VARCHAR(100),
+        total_questions INTEGER,
+        passed_questions INTEGER,
+        average_score DOUBLE PRECISION,
+        overall_result VARCHAR(20),
+        strengths TEXT,
+        weaknesses TEXT,
+        summary TEXT,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        updated_at TIMESTAMP WITHOUT TIME ZONE
+    )
+    """,
+    # interview_session_documents tham chiếu session_id
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_interview_sessions_session_id ON interview_sessions (session_id)",
+    """
+    CREATE TABLE IF NOT EXISTS user_interactions (
+        id SERIAL PRIMARY KEY,
+        candidate_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        interviewer_id INTEGER REFERENCES users (id) ON DELETE SET NULL,
+        question_id INTEGER REFERENCES questions (id) ON DELETE CASCADE,
+        question_summarized TEXT,
+        answer_original TEXT NOT NULL,
+        final_answer TEXT,
+        is_passed BOOLEAN,
+        grading_score DOUBLE PRECISION,
+        feedback TEXT,
+        session_id VARCHAR(100),
+        question_index INTEGER,
+        processing_time_ms INTEGER,
+        created_at TIMESTAMP WITHOUT TIME ZONE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS interview_session_documents (
+        session_id VARCHAR(100) PRIMARY KEY
+            REFERENCES interview_sessions (session_id) ON DELETE CASCADE,
+        document JSONB,
+        document_zlib BYTEA,
+        built_at TIMESTAMP WITHOUT TIME ZONE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS interview_stats (
+        scope VARCHAR(20) NOT NULL,
+        scope_key VARCHAR(255) NOT NULL,
+        sessions_count INTEGER NOT NULL,
+        sessions_passed INTEGER NOT NULL,
+        questions_count INTEGER NOT NULL,
+        questions_passed INTEGER NOT NULL,
+        score_sum DOUBLE PRECISION NOT NULL,
+        score_count INTEGER NOT NULL,
+        candidates_count INTEGER NOT NULL,
+        scope_keys JSONB,
+        updated_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (scope, scope_key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS processing_jobs (
+        id SERIAL PRIMARY KEY,
+        job_id VARCHAR(64) NOT NULL,
+        job_type VARCHAR(50) NOT NULL,
+        payload JSONB NOT NULL,
+        idempotency_key VARCHAR(255) UNIQUE,
+        status VARCHAR(20) NOT NULL,
+        priority SMALLINT NOT NULL DEFAULT 1,
+        attempts INTEGER NOT NULL,
+        max_attempts INTEGER NOT NULL,
+        available_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        worker_id VARCHAR(100),
+        lease_expires_at TIMESTAMP WITHOUT TIME ZONE,
+        heartbeat_at TIMESTAMP WITHOUT TIME ZONE,
+        started_at TIMESTAMP WITHOUT TIME ZONE,
+        stage VARCHAR(50),
+        progress DOUBLE PRECISION,
+        result JSONB,
+        last_error TEXT,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        updated_at TIMESTAMP WITHOUT TIME ZONE,
+        finished_at TIMESTAMP WITHOUT TIME ZONE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS processing_checkpoints (
+        id SERIAL PRIMARY KEY,
+        session_id VARCHAR(100) NOT NULL,
+        stage VARCHAR(50) NOT NULL,
+        item_key VARCHAR(100) NOT NULL,
+        data JSONB NOT NULL,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        CONSTRAINT uq_processing_checkpoints_stage_item UNIQUE (session_id, stage, item_key)
+    )
+    """,
+)
+
+# Cột mà các phiên bản trước thêm sau khi bảng đã được tạo
+COLUMNS = (
+    "ALTER TABLE processing_jobs ADD COLUMN IF NOT EXISTS priority SMALLINT NOT NULL DEFAULT 1",
+    "ALTER TABLE processing_jobs ADD COLUMN IF NOT EXISTS started_at TIMESTAMP WITHOUT TIME ZONE",
+    "ALTER TABLE user_interactions ADD COLUMN IF NOT EXISTS question_index INTEGER",
+)
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_interview_sessions_candidate_id ON interview_sessions (candidate_id)",
+    "CREATE INDEX IF NOT EXISTS ix_interview_sessions_interviewer_id ON interview_sessions (interviewer_id)",
+    "CREATE INDEX IF NOT EXISTS ix_interview_sessions_created_at ON interview_sessions (created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_interview_sessions_created_at_id ON interview_sessions (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_interview_sessions_updated_at ON interview_sessions (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_user_interactions_candidate_id ON user_interactions (candidate_id)",
+    "CREATE INDEX IF NOT EXISTS ix_user_interactions_interviewer_id ON user_interactions (interviewer_id)",
+    "CREATE INDEX IF NOT EXISTS ix_user_interactions_created_at ON user_interactions (created_at)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_processing_jobs_job_id ON processing_jobs (job_id)",
+    "DROP INDEX IF EXISTS ix_processing_jobs_claim",
+    "CREATE INDEX IF NOT EXISTS ix_processing_jobs_claim_priority "
+    "ON processing_jobs (job_type, status, priority, available_at)",
+    # Gộp user trùng (name, role) do get_or_create_user cũ tạo ra, trước khi tạo unique index
+    "DO $$ BEGIN "
+    "IF NOT EXISTS (SELECT 1 FROM pg_class WHERE relname = 'uq_users_name_role') THEN "
+    "CREATE TEMP TABLE user_merge ON COMMIT DROP AS "
+    "SELECT id, keep FROM (SELECT id, min(id) OVER (PARTITION BY name, role) AS keep FROM users) d WHERE id <> keep; "
+    "UPDATE interview_sessions t SET candidate_id = m.keep FROM user_merge m WHERE t.candidate_id = m.id; "
+    "UPDATE interview_sessions t SET interviewer_id = m.keep FROM user_merge m WHERE t.interviewer_id = m.id; "
+    "UPDATE user_interactions t SET candidate_id = m.keep FROM user_merge m WHERE t.candidate_id = m.id; "
+    "UPDATE user_interactions t SET interviewer_id = m.keep FROM user_merge m WHERE t.interviewer_id = m.id; "
+    "DELETE FROM users u USING user_merge m WHERE u.id = m.id; "
+    "END IF; END $$",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_users_name_role ON users (name, role)",
+)
+
+# Tìm tên/vị trí không phân biệt dấu: cần pg_trgm + unaccent (có thể không có trên server)
+SEARCH = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    # unaccent() chỉ STABLE nên không dùng được trong index -> wrapper IMMUTABLE với dictionary cố định
+    "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+    "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_trgm "
+    "ON users USING gin (lower(f_unaccent(name)) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_interview_sessions_position_trgm "
+    "ON interview_sessions USING gin (lower(f_unaccent(position)) gin_trgm_ops)",
+)
+
+
+def _try(statement: str):
+    """Run a statement in a savepoint; optional extensions may be unavailable"""
+    if op.get_context().as_sql:
+        op.execute(statement)
+        return
+    bind = op.get_bind()
+    try:
+        with bind.begin_nested():
+            bind.execute(text(statement))
+    except Exception as e:
+        print(f" Warning: Could not apply '{statement[:60]}...': {e}")
+
+
+def upgrade():
+    _try("CREATE EXTENSION IF NOT EXISTS vector")
+    for statement in TABLES + COLUMNS + INDEXES:
+        op.execute(statement)
+    for statement in SEARCH:
+        _try(statement)
+
+
+def downgrade():
+    # Xoá toàn bộ bảng của baseline (và dữ liệu); extension dùng chung nên giữ lại
+    op.execute(
+        "DROP TABLE IF EXISTS interview_session_documents, user_interactions, interview_sessions, "
+        "processing_checkpoints, processing_jobs, interview_stats, questions, users"
+    )
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
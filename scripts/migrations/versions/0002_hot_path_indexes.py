@@ -0,0 +1,53 @@
+"""
+Indexes for hot-path filters on user_interactions
+
+- session_id: get_session_interactions, detail documents, stats, export
+- (candidate_id, created_at): get_user_interactions (ORDER BY created_at DESC)
+
+Built with CREATE INDEX CONCURRENTLY so writers are not blocked.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_user_interactions_session_id', 'user_interactions', ['session_id']),
+    ('ix_user_interactions_candidate_id_created_at', 'user_interactions', ['candidate_id', 'created_at']),
+)
+
+
+def _index_state(name: str):
+    """None if missing, otherwise whether the index is valid"""
+    return op.get_bind().execute(
+        text("SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"),
+        {"name": name}
+    ).scalar()
+
+
+def upgrade():
+    # CONCURRENTLY không chạy được trong transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            if not op.get_context().as_sql:
+                state = _index_state(name)
+                # Đã có (vd. DB mới tạo từ model - bảng partitioned không hỗ trợ CONCURRENTLY)
+                if state:
+                    continue
+                # Build CONCURRENTLY bị lỗi để lại index INVALID mà IF NOT EXISTS sẽ giữ nguyên
+                if state is False:
+                    op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,198 @@
+"""
+Partition user_interactions by month on created_at
+
+The existing heap table is renamed to user_interactions_legacy, the
+partitioned table is created (columns as of revision 0002, PK
+(id, created_at), BRIN on created_at), monthly partitions are created from
+the oldest row up to three months ahead, rows are copied over and the
+legacy table is dropped. ids and the sequence position are kept.
+
+Runs in one transaction holding an ACCESS EXCLUSIVE lock on the table for
+the duration of the copy, so schedule it in a maintenance window on large
+tables. A database whose table is already partitioned (created by
+create_all before create_tables ran migrations) is left as is.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+PARTITIONED_TABLE = """
+    CREATE TABLE user_interactions (
+        id SERIAL NOT NULL,
+        candidate_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        interviewer_id INTEGER REFERENCES users (id) ON DELETE SET NULL,
+        question_id INTEGER REFERENCES questions (id) ON DELETE CASCADE,
+        question_summarized TEXT,
+        answer_original TEXT NOT NULL,
+        final_answer TEXT,
+        is_passed BOOLEAN,
+        grading_score DOUBLE PRECISION,
+        feedback TEXT,
+        session_id VARCHAR(100),
+        question_index INTEGER,
+        processing_time_ms INTEGER,
+        created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        CONSTRAINT user_interactions_pkey PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at)
+"""
+
+PARTITIONED_INDEXES = (
+    "CREATE INDEX ix_user_interactions_candidate_id ON user_interactions (candidate_id)",
+    "CREATE INDEX ix_user_interactions_interviewer_id ON user_interactions (interviewer_id)",
+    "CREATE INDEX ix_user_interactions_session_id ON user_interactions (session_id)",
+    "CREATE INDEX ix_user_interactions_candidate_id_created_at ON user_interactions (candidate_id, created_at)",
+    # Dữ liệu insert theo thời gian: BRIN nhỏ hơn B-tree rất nhiều
+    "CREATE INDEX ix_user_interactions_created_at_brin ON user_interactions USING brin (created_at)",
+)
+
+# Partition tháng của user_interactions: tạo partition DEFAULT và các tháng từ first_month tới
+# tháng hiện tại + months_ahead. Dòng đã rơi vào DEFAULT được chuyển sang partition mới trước
+# khi ATTACH. Không làm gì nếu bảng chưa được partition (chưa chạy migration 0003).
+# Chạy định kỳ bởi scripts.interaction_retention (InteractionPartitionDatabase.ensure).
+ENSURE_INTERACTION_PARTITIONS = (
+    "CREATE OR REPLACE FUNCTION ensure_user_interaction_partitions(first_month date, months_ahead integer) "
+    "RETURNS integer LANGUAGE plpgsql AS $$ "
+    "DECLARE "
+    "    m date := date_trunc('month', first_month)::date; "
+    "    last_month date := (date_trunc('month', now()) + make_interval(months => months_ahead))::date; "
+    "    part text; "
+    "    created integer := 0; "
+    "BEGIN "
+    "    IF NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('user_interactions')) THEN "
+    "        RETURN 0; "
+    "    END IF; "
+    "    CREATE TABLE IF NOT EXISTS user_interactions_default PARTITION OF user_interactions DEFAULT; "
+    "    WHILE m <= last_month LOOP "
+    "        part := 'user_interactions_' || to_char(m, 'YYYY_MM'); "
+    "        IF to_regclass(part) IS NULL THEN "
+    "            EXECUTE format('CREATE TABLE %I (LIKE user_interactions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', part); "
+    "            EXECUTE format('WITH moved AS (DELETE FROM user_interactions_default "
+    "WHERE created_at >= %L AND created_at < %L RETURNING *) INSERT INTO %I SELECT * FROM moved', "
+    "m, (m + interval '1 month')::date, part); "
+    "            EXECUTE format('ALTER TABLE user_interactions ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', "
+    "part, m, (m + interval '1 month')::date); "
+    "            created := created + 1; "
+    "        END IF; "
+    "        m := (m + interval '1 month')::date; "
+    "    END LOOP; "
+    "    RETURN created; "
+    "END $$"
+)
+
+
+
+def _is_partitioned(bind) -> bool:
+    return bool(bind.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('user_interactions')"
+    )).scalar())
+
+
+def _shared_columns(bind, source: str, target: str) -> str:
+    """Columns present in both tables"""
+    return ", ".join(bind.execute(text(
+        "SELECT s.column_name FROM information_schema.columns s "
+        "JOIN information_schema.columns t ON t.table_schema = s.table_schema "
+        "AND t.table_name = :target AND t.column_name = s.column_name "
+        "WHERE s.table_schema = current_schema() AND s.table_name = :source "
+        "ORDER BY s.ordinal_position"
+    ), {"source": source, "target": target}).scalars().all())
+
+
+def _rename_indexes(bind, table: str, suffix: str):
+    """Free index/constraint names (user_interactions_pkey, ix_...) for the new table"""
+    names = bind.execute(
+        text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"),
+        {"table": table}
+    ).scalars().all()
+    for name in names:
+        # ALTER INDEX cũng đổi tên constraint đi kèm (pkey)
+        op.execute(f'ALTER INDEX "{name}" RENAME TO "{(name + suffix)[:63]}"')
+
+
+def _rename_sequence(bind, table: str, new_name: str):
+    sequence = bind.execute(text(f"SELECT pg_get_serial_sequence('{table}', 'id')")).scalar()
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} RENAME TO {new_name}")
+
+
+def upgrade():
+    bind = op.get_bind()
+    if _is_partitioned(bind):
+        return
+
+    op.execute("LOCK TABLE user_interactions IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE user_interactions RENAME TO user_interactions_legacy")
+    _rename_indexes(bind, "user_interactions_legacy", "_legacy")
+    _rename_sequence(bind, "user_interactions_legacy", "user_interactions_legacy_id_seq")
+
+    op.execute(PARTITIONED_TABLE)
+    for statement in PARTITIONED_INDEXES:
+        op.execute(statement)
+    op.execute(ENSURE_INTERACTION_PARTITIONS)
+    bind.execute(text(
+        "SELECT ensure_user_interaction_partitions("
+        "COALESCE((SELECT min(created_at) FROM user_interactions_legacy), now())::date, 3)"
+    ))
+
+    # created_at giờ là NOT NULL (cột partition)
+    columns = _shared_columns(bind, "user_interactions_legacy", "user_interactions")
+    select_columns = columns.replace("created_at", "COALESCE(created_at, now()::timestamp)")
+    op.execute(f"INSERT INTO user_interactions ({columns}) SELECT {select_columns} FROM user_interactions_legacy")
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('user_interactions', 'id'), "
+        "COALESCE((SELECT max(id) FROM user_interactions), 0) + 1, false)"
+    )
+    op.execute("DROP TABLE user_interactions_legacy")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if not _is_partitioned(bind):
+        return
+
+    op.execute("LOCK TABLE user_interactions IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE user_interactions RENAME TO user_interactions_partitioned")
+    _rename_indexes(bind, "user_interactions_partitioned", "_partitioned")
+    _rename_sequence(bind, "user_interactions_partitioned", "user_interactions_partitioned_id_seq")
+
+    op.execute("""
+        CREATE TABLE user_interactions (
+            id SERIAL PRIMARY KEY,
+            candidate_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            interviewer_id INTEGER REFERENCES users (id) ON DELETE SET NULL,
+            question_id INTEGER REFERENCES questions (id) ON DELETE CASCADE,
+            question_summarized TEXT,
+            answer_original TEXT NOT NULL,
+            final_answer TEXT,
+            is_passed BOOLEAN,
+            grading_score DOUBLE PRECISION,
+            feedback TEXT,
+            session_id VARCHAR(100),
+            question_index INTEGER,
+            processing_time_ms INTEGER,
+            created_at TIMESTAMP WITHOUT TIME ZONE
+        )
+    """)
+    columns = _shared_columns(bind, "user_interactions_partitioned", "user_interactions")
+    op.execute(f"INSERT INTO user_interactions ({columns}) SELECT {columns} FROM user_interactions_partitioned")
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('user_interactions', 'id'), "
+        "COALESCE((SELECT max(id) FROM user_interactions), 0) + 1, false)"
+    )
+    for name, columns in (
+        ("ix_user_interactions_candidate_id", "candidate_id"),
+        ("ix_user_interactions_interviewer_id", "interviewer_id"),
+        ("ix_user_interactions_created_at", "created_at"),
+        ("ix_user_interactions_session_id", "session_id"),
+        ("ix_user_interactions_candidate_id_created_at", "candidate_id, created_at"),
+    ):
+        op.execute(f"CREATE INDEX {name} ON user_interactions ({columns})")
+    op.execute("DROP TABLE user_interactions_partitioned")
@@ -0,0 +1,83 @@
+"""
+Store reference answers once, content-addressed by sha256
+
+Adds reference_answers (content_hash unique) and user_interactions
+.answer_source / .reference_answer_id, then moves the inline final_answer
+text out of user_interactions:
+
+- rows whose final_answer equals questions.answer become
+  answer_source = 'database' with no stored text;
+- every other distinct text is inserted once into reference_answers and
+  referenced by id.
+
+final_answer is kept (NULL on migrated rows) so the downgrade can put the
+text back. Run VACUUM (or pg_repack) afterwards to give the space back.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS reference_answers (
+            id SERIAL PRIMARY KEY,
+            content_hash VARCHAR(64) NOT NULL UNIQUE,
+            answer TEXT NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE
+        )
+    """)
+    op.execute("COMMENT ON COLUMN reference_answers.content_hash IS 'sha256 hex của answer (UTF-8)'")
+    op.execute("ALTER TABLE user_interactions ADD COLUMN IF NOT EXISTS answer_source VARCHAR(40)")
+    op.execute(
+        "ALTER TABLE user_interactions ADD COLUMN IF NOT EXISTS reference_answer_id INTEGER "
+        "REFERENCES reference_answers (id) ON DELETE SET NULL"
+    )
+
+    # Đáp án lấy từ ngân hàng câu hỏi: không cần lưu lại
+    op.execute("""
+        UPDATE user_interactions i
+        SET answer_source = 'database', final_answer = NULL
+        FROM questions q
+        WHERE q.id = i.question_id AND i.final_answer IS NOT NULL AND i.final_answer = q.answer
+    """)
+    op.execute("""
+        INSERT INTO reference_answers (content_hash, answer, created_at)
+        SELECT encode(sha256(convert_to(final_answer, 'UTF8')), 'hex'), final_answer, min(created_at)
+        FROM user_interactions
+        WHERE final_answer IS NOT NULL
+        GROUP BY final_answer
+        ON CONFLICT (content_hash) DO NOTHING
+    """)
+    op.execute("""
+        UPDATE user_interactions i
+        SET reference_answer_id = r.id, final_answer = NULL
+        FROM reference_answers r
+        WHERE i.final_answer IS NOT NULL
+          AND r.content_hash = encode(sha256(convert_to(i.final_answer, 'UTF8')), 'hex')
+    """)
+
+
+def downgrade():
+    op.execute("""
+        UPDATE user_interactions i
+        SET final_answer = r.answer
+        FROM reference_answers r
+        WHERE r.id = i.reference_answer_id AND i.final_answer IS NULL
+    """)
+    op.execute("""
+        UPDATE user_interactions i
+        SET final_answer = q.answer
+        FROM questions q
+        WHERE q.id = i.question_id AND i.answer_source = 'database' AND i.final_answer IS NULL
+    """)
+    op.execute("ALTER TABLE user_interactions DROP COLUMN IF EXISTS reference_answer_id")
+    op.execute("ALTER TABLE user_interactions DROP COLUMN IF EXISTS answer_source")
+    op.execute("DROP TABLE IF EXISTS reference_answers")
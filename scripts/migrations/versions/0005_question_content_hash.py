@@ -0,0 +1,90 @@
+"""
+questions.content_hash: unique hash of the normalized question
+
+Existing questions are hashed in Python (same normalization as the
+importer) and duplicates left by earlier imports are merged into the lowest
+id, with their interactions moved over, before the unique index is created.
+Interactions graded against a merged question's answer (answer_source
+'database') get that text pinned in reference_answers first; the stored
+detail documents of their sessions are dropped and rebuilt on next read.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+import hashlib
+import unicodedata
+
+from alembic import op
+from sqlalchemy import text
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def _question_hash(name: str) -> str:
+    # Bản chốt của src.database.question_db.question_hash tại revision này
+    normalized = " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _backfill(bind):
+    keep = dict(bind.execute(text(
+        "SELECT content_hash, min(id) FROM questions WHERE content_hash IS NOT NULL GROUP BY content_hash"
+    )).all())
+    merge, updates = {}, []
+    for question_id, name in bind.execute(text("SELECT id, name FROM questions WHERE content_hash IS NULL ORDER BY id")):
+        content_hash = _question_hash(name)
+        if content_hash in keep and keep[content_hash] != question_id:
+            merge[question_id] = keep[content_hash]
+        else:
+            keep[content_hash] = question_id
+            updates.append({"question_id": question_id, "content_hash": content_hash})
+
+    if updates:
+        bind.execute(text("UPDATE questions SET content_hash = :content_hash WHERE id = :question_id"), updates)
+    if not merge:
+        return
+
+    params = {"question_ids": list(merge)}
+    bind.execute(text("""
+        INSERT INTO reference_answers (content_hash, answer, created_at)
+        SELECT DISTINCT encode(sha256(convert_to(q.answer, 'UTF8')), 'hex'), q.answer, now() AT TIME ZONE 'utc'
+        FROM questions q
+        JOIN user_interactions i ON i.question_id = q.id
+        WHERE q.id = ANY(:question_ids) AND i.answer_source = 'database' AND i.reference_answer_id IS NULL
+        ON CONFLICT (content_hash) DO NOTHING
+    """), params)
+    bind.execute(text("""
+        DELETE FROM interview_session_documents
+        WHERE session_id IN (
+            SELECT session_id FROM user_interactions WHERE question_id = ANY(:question_ids)
+        )
+    """), params)
+    bind.execute(text("""
+        UPDATE user_interactions i
+        SET reference_answer_id = r.id
+        FROM questions q, reference_answers r
+        WHERE q.id = i.question_id
+          AND r.content_hash = encode(sha256(convert_to(q.answer, 'UTF8')), 'hex')
+          AND q.id = ANY(:question_ids) AND i.answer_source = 'database' AND i.reference_answer_id IS NULL
+    """), params)
+
+    pairs = [{"old_id": old, "new_id": new} for old, new in merge.items()]
+    bind.execute(text("UPDATE user_interactions SET question_id = :new_id WHERE question_id = :old_id"), pairs)
+    bind.execute(text("DELETE FROM questions WHERE id = :old_id"), [{"old_id": p["old_id"]} for p in pairs])
+    print(f" Merged {len(merge)} duplicate questions")
+
+
+def upgrade():
+    op.execute("ALTER TABLE questions ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)")
+    if not op.get_context().as_sql:
+        _backfill(op.get_bind())
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_questions_content_hash ON questions (content_hash)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS uq_questions_content_hash")
+    op.execute("ALTER TABLE questions DROP COLUMN IF EXISTS content_hash")
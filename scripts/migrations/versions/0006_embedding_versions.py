@@ -0,0 +1,65 @@
+"""
+embedding_versions: which questions vector column / model search uses
+
+Existing vectors in questions.embedding are registered as the active
+version with the configured EMBEDDING_MODEL. Re-embedding for a new model
+(python -m scripts.reembed_questions) adds shadow columns embedding_v<id>.
+
+The downgrade drops the shadow columns; if one of them was active, re-import
+the questions afterwards (questions.embedding may have been cleaned up).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+from sqlalchemy import text
+
+from config.settings import settings
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS embedding_versions (
+            id SERIAL PRIMARY KEY,
+            model VARCHAR(255) NOT NULL,
+            dimensions INTEGER NOT NULL,
+            column_name VARCHAR(63) NOT NULL UNIQUE,
+            status VARCHAR(20) NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            activated_at TIMESTAMP WITHOUT TIME ZONE,
+            retired_at TIMESTAMP WITHOUT TIME ZONE
+        )
+    """)
+    op.execute("COMMENT ON COLUMN embedding_versions.model IS 'Tên model embedding (HuggingFace)'")
+    op.execute("COMMENT ON COLUMN embedding_versions.column_name IS 'Cột vector trong bảng questions'")
+    op.execute("COMMENT ON COLUMN embedding_versions.status IS 'building, active, retired'")
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_embedding_versions_active "
+        "ON embedding_versions (status) WHERE status = 'active'"
+    )
+    # questions.embedding (vector(384)) là của model đang cấu hình
+    op.execute(text("""
+        INSERT INTO embedding_versions (model, dimensions, column_name, status, created_at, activated_at)
+        SELECT :model, 384, 'embedding', 'active', now() AT TIME ZONE 'utc', now() AT TIME ZONE 'utc'
+        WHERE NOT EXISTS (SELECT 1 FROM embedding_versions WHERE status = 'active')
+        ON CONFLICT DO NOTHING
+    """).bindparams(model=settings.embedding_model))
+
+
+def downgrade():
+    op.execute("""
+        DO $$
+        DECLARE shadow record;
+        BEGIN
+            FOR shadow IN SELECT column_name FROM embedding_versions WHERE column_name ~ '^embedding_v[0-9]+$' LOOP
+                EXECUTE format('ALTER TABLE questions DROP COLUMN IF EXISTS %I', shadow.column_name);
+            END LOOP;
+        END $$
+    """)
+    op.execute("DROP TABLE IF EXISTS embedding_versions")
@@ -0,0 +1,79 @@
+"""
+Re-embed the question bank after EMBEDDING_MODEL changes
+
+Vectors for the new model go into a shadow column (questions.embedding_v<id>)
+in resumable chunks; question search keeps using the current column and model
+until the shadow column is complete and indexed, then flips in one
+transaction. Rerun the same command to resume after an interruption.
+
+Usage:
+    python -m scripts.reembed_questions                  # settings.embedding_model
+    python -m scripts.reembed_questions --model sentence-transformers/all-mpnet-base-v2
+    python -m scripts.reembed_questions --enqueue        # run on the job workers instead
+    python -m scripts.reembed_questions --status
+    python -m scripts.reembed_questions --cleanup        # free the columns of retired versions
+"""
+import argparse
+import time
+
+from config.settings import settings
+from src.database.embedding_db import EmbeddingVersionDatabase
+
+
+def print_status():
+    print(f"\n{'id':>4}  {'status':<9} {'column':<16} {'embedded':>15}  model")
+    for version in EmbeddingVersionDatabase().list_versions():
+        embedded = f"{version['embedded']}/{version['total']}"
+        print(f"{version['id']:>4}  {version['status']:<9} {version['column_name']:<16} {embedded:>15}  {version['model']}")
+    print(f"\nEMBEDDING_MODEL: {settings.embedding_model}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed questions into a shadow column and switch search to it")
+    parser.add_argument("--model", default=settings.embedding_model, help="Embedding model (default: EMBEDDING_MODEL)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Questions embedded and written per transaction")
+    parser.add_argument("--no-activate", action="store_true", help="Fill and index the column but keep search on the current one")
+    parser.add_argument("--enqueue", action="store_true", help="Queue a reembed job for python -m src.workers")
+    parser.add_argument("--status", action="store_true", help="Show embedding versions and coverage")
+    parser.add_argument("--cleanup", action="store_true", help="Drop the columns of retired versions")
+    args = parser.parse_args()
+
+    if args.status:
+        print_status()
+        return
+
+    if args.cleanup:
+        freed = EmbeddingVersionDatabase().cleanup()
+        print(f"Freed: {', '.join(freed)}" if freed else "No retired versions")
+        return
+
+    if args.enqueue:
+        from src.workers.tasks import enqueue_reembedding
+        job_id = enqueue_reembedding(args.model, args.chunk_size)
+        print(f"Queued re-embedding with {args.model}: job {job_id}")
+        return
+
+    from src.processors.reembed_processor import run_reembedding
+
+    started = time.monotonic()
+    last = {"stage": None}
+
+    def report(stage: str, progress: float):
+        if stage != last["stage"] or stage == "embedding":
+            print(f"  {stage:<11} {progress * 100:5.1f}%  ({time.monotonic() - started:.0f}s)")
+            last["stage"] = stage
+
+    result = run_reembedding(
+        args.model,
+        chunk_size=args.chunk_size,
+        progress_callback=report,
+        activate=not args.no_activate
+    )
+    version = result["version"]
+    print(f"\n{result['status']}: {version['column_name']} ({version['model']}), "
+          f"{result.get('embedded', 0)} questions embedded in {time.monotonic() - started:.0f}s")
+    print_status()
+
+
+if __name__ == "__main__":
+    main()
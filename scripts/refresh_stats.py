@@ -0,0 +1,35 @@
+"""
+Rebuild the dashboard statistics (interview_stats) from the source tables
+
+Stats are maintained on every session summary write; run this once after
+upgrading (backfill) or to repair drift after manual data changes.
+
+Usage:
+    python -m scripts.refresh_stats
+"""
+import sys
+import time
+
+from config.database import db_manager
+from src.database.stats_db import StatsDatabase
+
+
+def refresh_stats():
+    print("\n" + "="*70)
+    print("REBUILDING INTERVIEW STATISTICS")
+    print("="*70)
+    
+    try:
+        db_manager.create_tables()
+        started = time.monotonic()
+        counted = StatsDatabase().rebuild()
+        print(f"✓ Rebuilt statistics from {counted} sessions in {time.monotonic() - started:.1f}s")
+    except Exception as e:
+        print(f"✗ Rebuild failed: {e}")
+        sys.exit(1)
+    
+    print("="*70 + "\n")
+
+
+if __name__ == "__main__":
+    refresh_stats()
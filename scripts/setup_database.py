@@ -1,77 +1,155 @@
-from config.database import db_manager, Question
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from config.settings import settings
+"""
+Import the question bank from CSV (name, answer, category, level) with pgvector embeddings
+
+Incremental and idempotent: rows are upserted on the hash of the normalized
+question, unchanged rows are skipped, and only new questions or questions
+whose text changed are embedded (one embed_documents call per batch). The
+CSV is streamed, so a large bank is never held in memory.
+
+Usage:
+    python -m scripts.setup_database
+    python -m scripts.setup_database --csv data/imports/questions.csv --batch-size 512
+"""
+from config.database import db_manager
+from src.database.embedding_db import EmbeddingVersionDatabase, BASE_COLUMN
+from src.database.pgvector_search import get_embeddings
+from src.database.question_db import QuestionDatabase, question_hash
 from src.utils.logger import logger
+from typing import Dict, Iterator, List
+import argparse
 import csv
 import os
+import time
 
-def load_questions_from_csv(csv_path: str = "data/imports/sample_questions.csv"):
-    """Load questions from CSV file"""
-    questions = []
-    
+DEFAULT_CSV_PATH = "data/imports/sample_questions.csv"
+
+
+def iter_question_batches(csv_path: str = DEFAULT_CSV_PATH, batch_size: int = 256) -> Iterator[List[Dict]]:
+    """Stream questions from a CSV file in batches"""
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f"CSV file not found: {csv_path}")
     
-    with open(csv_path, 'r', encoding='utf-8') as f:
+    batch = []
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
         reader = csv.DictReader(f)
         for row in reader:
-            questions.append({
+            batch.append({
                 'name': row['name'],
                 'answer': row['answer'],
                 'category': row['category'],
                 'level': row['level']
             })
-    
-    return questions
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
 
+def load_questions_from_csv(csv_path: str = DEFAULT_CSV_PATH) -> List[Dict]:
+    """Load questions from CSV file"""
+    return [q for batch in iter_question_batches(csv_path) for q in batch]
 
-def import_questions_to_db():
-    """Import questions from CSV to database with pgvector embeddings"""
+
+def _import_batch(session, questions_db: QuestionDatabase, versions: EmbeddingVersionDatabase, batch: List[Dict], counts: Dict):
+    # Khoá version active (FOR SHARE) tới commit: không flip re-embedding giữa lúc embed và ghi vector
+    active = versions.active(session, for_share=True)
+    embeddings_model = get_embeddings(active['model'])
+    
+    # Cùng câu hỏi lặp lại trong batch: dòng sau thắng (một dòng chỉ upsert được một lần mỗi lệnh)
+    by_hash = {question_hash(q['name']): q for q in batch}
+    existing = questions_db.existing(session, list(by_hash), active['column_name'])
     
-    print("\n[STEP 1] Loading questions from CSV...")
-    questions_data = load_questions_from_csv()
-    print(f"  ✓ Loaded {len(questions_data)} questions from CSV")
+    rows, to_embed, renamed, answer_changed = [], [], [], []
+    for content_hash, q in by_hash.items():
+        stored = existing.get(content_hash)
+        if stored and stored['embedded'] and all(stored[k] == q[k] for k in ('name', 'answer', 'category', 'level')):
+            counts['unchanged'] += 1
+            continue
+        row = {**q, 'content_hash': content_hash, 'embedding': None}
+        # Chỉ embed khi câu hỏi mới, đổi chữ hoặc chưa có embedding; đổi answer/category/level thì giữ vector cũ
+        if not stored or not stored['embedded'] or stored['name'] != q['name']:
+            to_embed.append(row)
+        if stored and stored['name'] != q['name']:
+            renamed.append(stored['id'])
+        if stored and stored['answer'] != q['answer']:
+            answer_changed.append(stored['id'])
+        rows.append(row)
     
-    print("\n[STEP 2] Initializing embedding model...")
-    embeddings_model = HuggingFaceEmbeddings(
-        model_name=settings.embedding_model
-    )
-    print(f"  ✓ Loaded embedding model: {settings.embedding_model}")
+    vectors = []
+    if to_embed:
+        vectors = embeddings_model.embed_documents([row['name'] for row in to_embed])
+        if active['column_name'] == BASE_COLUMN:
+            for row, vector in zip(to_embed, vectors):
+                row['embedding'] = vector
+        counts['embedded'] += len(to_embed)
     
+    # Interview đã chấm giữ đáp án mẫu cũ
+    pinned_sessions = questions_db.pin_reference_answers(session, answer_changed)
+    results = questions_db.upsert(session, rows)
+    if to_embed and active['column_name'] != BASE_COLUMN:
+        ids = {row['content_hash']: question_id for row, (question_id, _) in zip(rows, results)}
+        versions.fill(active, [
+            (ids[row['content_hash']], row['name'], vector) for row, vector in zip(to_embed, vectors)
+        ], session=session)
+    # Vector của re-embedding đang chạy tính trên chữ cũ
+    versions.invalidate(session, renamed)
+    # Dựng lại document của session vừa pin để /interviews/{id} khớp với /export
+    questions_db.rebuild_documents(session, pinned_sessions)
+    session.commit()
+    questions_db.invalidate_caches(pinned_sessions)
+    counts['pinned_sessions'] += len(pinned_sessions)
+    
+    inserted = sum(1 for _, is_new in results if is_new)
+    counts['inserted'] += inserted
+    counts['updated'] += len(results) - inserted
+    counts['duplicates'] += len(batch) - len(by_hash)
+
+
+def import_questions_to_db(csv_path: str = DEFAULT_CSV_PATH, batch_size: int = 256) -> Dict:
+    """
+    Import questions from CSV to database with pgvector embeddings
+    
+    Returns:
+        Counts: rows, inserted, updated, unchanged, duplicates, embedded, pinned_sessions, seconds
+    """
+    print("\n[STEP 1] Initializing embedding model...")
+    versions = EmbeddingVersionDatabase()
+    # Embed bằng model của version active (có thể khác EMBEDDING_MODEL khi đang re-embed)
+    model_name = versions.active()['model']
+    get_embeddings(model_name)
+    print(f"  ✓ Loaded embedding model: {model_name}")
+    
+    questions_db = QuestionDatabase()
     session = db_manager.get_session()
+    counts = {'rows': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'embedded': 0, 'pinned_sessions': 0}
     
-    try: 
-        print("\n[STEP 3] Importing questions to database with embeddings...")
-        added_questions = []
-        
-        for i, q in enumerate(questions_data, 1):
-            print(f"  [{i}/{len(questions_data)}] Processing: {q['name'][:60]}...")
-            
-            # Generate embedding for question text
-            embedding_vector = embeddings_model.embed_query(q['name'])
-            
-            question = Question(
-                name=q['name'],
-                answer=q['answer'],
-                category=q['category'],
-                level=q['level'],
-                embedding=embedding_vector
-            )
-            session.add(question)
-            session.flush()  # Get ID immediately
-            
-            added_questions.append({
-                'id': question.id,
-                'name': q['name'],
-                'answer': q['answer'],
-                'category': q['category'],
-                'level': q['level']
-            })
-        
+    try:
+        # Dòng import trước khi có content_hash: hash + gộp trùng, nếu không lần này sẽ tạo bản sao
+        backfill = questions_db.backfill_hashes(session)
         session.commit()
+        questions_db.invalidate_caches(backfill['session_ids'])
+        if backfill['hashed'] or backfill['merged']:
+            print(f"  ✓ Hashed {backfill['hashed']} existing questions, merged {backfill['merged']} duplicates")
         
-        print(f"\n  ✓ Successfully added {len(added_questions)} questions with embeddings to database")
-        return added_questions
+        print(f"\n[STEP 2] Importing {csv_path} in batches of {batch_size}...")
+        started = reported = time.monotonic()
+        for batch in iter_question_batches(csv_path, batch_size):
+            _import_batch(session, questions_db, versions, batch, counts)
+            counts['rows'] += len(batch)
+            if time.monotonic() - reported >= 5:
+                reported = time.monotonic()
+                print(f"  {counts['rows']} rows | {counts['rows'] / (reported - started):.0f} rows/s | "
+                      f"{counts['inserted']} new, {counts['updated']} updated, {counts['unchanged']} unchanged")
+        
+        counts['seconds'] = round(time.monotonic() - started, 2)
+        print(f"\n  ✓ {counts['rows']} rows in {counts['seconds']}s "
+              f"({counts['rows'] / counts['seconds'] if counts['seconds'] else 0:.0f} rows/s): "
+              f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged, "
+              f"{counts['duplicates']} duplicate rows in the CSV, {counts['embedded']} embedded")
+        if counts['pinned_sessions']:
+            print(f"  ✓ Kept the previous reference answer for {counts['pinned_sessions']} graded sessions")
+        return counts
         
     except Exception as e:
         session.rollback()
@@ -81,7 +159,7 @@ def import_questions_to_db():
         session.close()
 
 
-def setup_interview_questions():
+def setup_interview_questions(csv_path: str = DEFAULT_CSV_PATH, batch_size: int = 256):
     """Main setup function - import questions from CSV with pgvector embeddings"""
     
     print("="*70)
@@ -90,20 +168,16 @@ def setup_interview_questions():
     
     try:
         # Import to database with embeddings
-        questions = import_questions_to_db()
-        
-        if not questions:
-            return
+        counts = import_questions_to_db(csv_path, batch_size)
         
         # Summary
         print("\n" + "="*70)
         print("SETUP COMPLETE!")
         print("="*70)
-        print(f"  ✓ Total questions imported: {len(questions)}")
-        print(f"  ✓ Source: data/imports/sample_questions.csv")
+        print(f"  ✓ Rows read: {counts['rows']}")
+        print(f"  ✓ New: {counts['inserted']} | Updated: {counts['updated']} | Unchanged: {counts['unchanged']}")
+        print(f"  ✓ Source: {csv_path}")
         print(f"  ✓ Embeddings: Stored in PostgreSQL with pgvector")
-        print(f"  ✓ Categories: technical, behavioral, soft_skills")
-        print(f"  ✓ Levels: junior, mid, senior, all")
         print("="*70)
         
     except Exception as e:
@@ -113,4 +187,8 @@ def setup_interview_questions():
 
 
 if __name__ == "__main__":
-    setup_interview_questions()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Import the question bank from CSV")
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH, help="CSV with name, answer, category, level")
+    parser.add_argument("--batch-size", type=int, default=256, help="Rows embedded and upserted per round trip")
+    args = parser.parse_args()
+    setup_interview_questions(args.csv, args.batch_size)
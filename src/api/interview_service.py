@@ -1,19 +1,65 @@
 """
 Service layer for interview API
 """
-from typing import List, Dict, Optional
-from sqlalchemy import func, desc
-from sqlalchemy.orm import Session
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from sqlalchemy import String, and_, func, desc, literal, text, tuple_
+from sqlalchemy.orm import Session, aliased
 
-from config.database import db_manager, UserInteraction, User, InterviewSession
+from config.database import db_manager, User, InterviewSession
+from src.database.session_document_db import SessionDocumentDatabase
+from src.database.stats_db import GLOBAL_SCOPE, StatsDatabase
 from src.utils.logger import logger
 
 
+TOTAL_MODES = ("exact", "approx", "none")
+
+
+def encode_cursor(created_at: datetime, row_id: int, offset: int) -> str:
+    """Opaque keyset cursor: position of the last row returned plus its rank"""
+    payload = json.dumps({"c": created_at.isoformat(), "i": row_id, "n": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int, int]:
+    """
+    Decode a cursor created by encode_cursor
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["c"]), int(payload["i"]), int(payload["n"])
+    except (binascii.Error, UnicodeDecodeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def unaccent_contains(column, term: str):
+    """
+    Case- and diacritic-insensitive substring match ("nguyen" matches "Nguyễn")
+    
+    Both sides go through lower(f_unaccent(...)) so the condition can use the
+    GIN trigram indexes created by the baseline migration. Accents are
+    stripped before lower() so uppercase Vietnamese letters fold correctly
+    under any collation.
+    """
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    pattern = literal('%') + func.lower(func.f_unaccent(escaped, type_=String)) + literal('%')
+    return func.lower(func.f_unaccent(column, type_=String)).like(pattern, escape='\\')
+
+
 class InterviewService:
     """Service for interview statistics and listing"""
     
     def __init__(self):
         self.db_manager = db_manager
+        self.documents = SessionDocumentDatabase()
+        self.stats = StatsDatabase()
     
     def get_interview_list(
         self, 
@@ -22,156 +68,334 @@ class InterviewService:
         interviewer_name: Optional[str] = None,
         candidate_name: Optional[str] = None,
         position: Optional[str] = None,
-        result: Optional[str] = None  # "pass" or "fail"
+        result: Optional[str] = None,  # "pass" or "fail"
+        cursor: Optional[str] = None,
+        total_mode: Optional[str] = None  # "exact", "approx" or "none"
     ) -> Dict:
         """
         Get paginated list of interviews with statistics
         
         Args:
-            page: Page number (1-indexed)
+            page: Page number (1-indexed), ignored when cursor is given
             page_size: Number of items per page
             interviewer_name: Filter by interviewer name
             candidate_name: Filter by candidate name
-            position: Filter by position (not implemented yet)
+            position: Filter by position
             result: Filter by result ("pass" or "fail")
+            cursor: nextCursor from a previous response (keyset pagination)
+            total_mode: "exact" counts rows, "approx" uses planner statistics,
+                "none" skips totals. Default: exact for pages, approx for cursors
         
         Returns:
             Dict with totalInterview, totalPass, totalFailed, results, pagination
+        
+        Raises:
+            ValueError: If cursor or total_mode is invalid
         """
-        session: Session = self.db_manager.get_session()
+        total_mode, keyset = self._parse_pagination(cursor, total_mode)
+        session: Session = self.db_manager.get_read_session()
         
         try:
-            # Query from InterviewSession table (much simpler!)
-            query = session.query(
-                InterviewSession,
-                User.name.label('candidate_name')
-            ).join(
-                User,
-                User.id == InterviewSession.candidate_id
+            return self._interview_list(
+                session, page, page_size, interviewer_name, candidate_name, position, result, keyset, total_mode
             )
-            
-            # Apply filters
-            if candidate_name:
-                query = query.filter(User.name.ilike(f'%{candidate_name}%'))
-            
-            if result:
-                query = query.filter(InterviewSession.overall_result == result.lower())
-            
-            if position:
-                query = query.filter(InterviewSession.position.ilike(f'%{position}%'))
-            
-            # Get total count before pagination
-            total_count = query.count()
-            
-            # Apply pagination
-            offset = (page - 1) * page_size
-            results = query.order_by(
-                desc(InterviewSession.created_at)
-            ).offset(offset).limit(page_size).all()
-            
-            # Format results
-            formatted_results = []
-            
-            for idx, (sess, candidate_name_val) in enumerate(results, start=offset + 1):
-                # Get interviewer name
-                interviewer = session.query(User).filter(
-                    User.id == sess.interviewer_id
-                ).first()
-                interviewer_name = interviewer.name if interviewer else "Unknown"
-                
-                formatted_results.append({
-                    "id": idx,
-                    "session_id": sess.session_id,
-                    "interviewer": interviewer_name,
-                    "candidate": candidate_name_val,
-                    "date": sess.created_at.strftime("%Y-%m-%d"),
-                    "position": sess.position or "N/A",
-                    "overallResult": sess.overall_result,
-                    "overallScore": round(sess.average_score, 1) if sess.average_score else 0.0,
-                    "totalQuestions": sess.total_questions,
-                    "passedQuestions": sess.passed_questions or 0
-                })
-            
-            # Calculate total statistics
-            all_sessions = session.query(InterviewSession).all()
-            total_pass_all = sum(1 for s in all_sessions if s.overall_result == 'pass')
-            total_failed_all = len(all_sessions) - total_pass_all
-            
-            return {
-                "totalInterview": total_count,
-                "totalPass": total_pass_all,
-                "totalFailed": total_failed_all,
-                "results": formatted_results,
-                "pagination": {
-                    "page": page,
-                    "pageSize": page_size,
-                    "totalPages": (total_count + page_size - 1) // page_size,
-                    "totalItems": total_count
-                }
-            }
-            
         except Exception as e:
             logger.error(f"Error getting interview list: {e}", exc_info=True)
             raise
         finally:
             session.close()
     
+    async def get_interview_list_async(
+        self, 
+        page: int = 1, 
+        page_size: int = 10,
+        interviewer_name: Optional[str] = None,
+        candidate_name: Optional[str] = None,
+        position: Optional[str] = None,
+        result: Optional[str] = None,
+        cursor: Optional[str] = None,
+        total_mode: Optional[str] = None
+    ) -> Dict:
+        """Same as get_interview_list, on the async engine (does not block the event loop)"""
+        total_mode, keyset = self._parse_pagination(cursor, total_mode)
+        
+        async with self.db_manager.get_async_read_session() as session:
+            try:
+                return await session.run_sync(
+                    self._interview_list,
+                    page, page_size, interviewer_name, candidate_name, position, result, keyset, total_mode
+                )
+            except Exception as e:
+                logger.error(f"Error getting interview list: {e}", exc_info=True)
+                raise
+    
+    def get_list_version(self) -> Tuple[Optional[datetime], Optional[int]]:
+        """(max updated_at, max id) of interview_sessions - changes whenever the list can change"""
+        session: Session = self.db_manager.get_read_session()
+        
+        try:
+            return self._list_version(session)
+        finally:
+            session.close()
+    
+    async def get_list_version_async(self) -> Tuple[Optional[datetime], Optional[int]]:
+        """Same as get_list_version, on the async engine"""
+        async with self.db_manager.get_async_read_session() as session:
+            return await session.run_sync(self._list_version)
+    
+    def _list_version(self, session: Session) -> Tuple[Optional[datetime], Optional[int]]:
+        row = session.query(
+            func.max(InterviewSession.updated_at),
+            func.max(InterviewSession.id)
+        ).one()
+        return row[0], row[1]
+    
+    def _parse_pagination(self, cursor: Optional[str], total_mode: Optional[str]) -> Tuple[str, Optional[Tuple]]:
+        """Validate pagination arguments before touching the database"""
+        total_mode = total_mode or ('approx' if cursor else 'exact')
+        if total_mode not in TOTAL_MODES:
+            raise ValueError(f"Invalid total mode: {total_mode}")
+        return total_mode, decode_cursor(cursor) if cursor else None
+    
+    def _interview_list(
+        self,
+        session: Session,
+        page: int,
+        page_size: int,
+        interviewer_name: Optional[str],
+        candidate_name: Optional[str],
+        position: Optional[str],
+        result: Optional[str],
+        keyset: Optional[Tuple[datetime, int, int]],
+        total_mode: str
+    ) -> Dict:
+        """
+        Build the interview list on a sync Session
+        
+        Shared by the sync and async APIs (the async one runs it through
+        AsyncSession.run_sync, so the queries go over asyncpg).
+        """
+        if keyset:
+            last_created_at, last_id, offset = keyset
+        else:
+            offset = (page - 1) * page_size
+        
+        Candidate = aliased(User, name='candidate')
+        Interviewer = aliased(User, name='interviewer')
+        
+        # Apply filters
+        filters = []
+        if interviewer_name:
+            filters.append(unaccent_contains(Interviewer.name, interviewer_name))
+        
+        if candidate_name:
+            filters.append(unaccent_contains(Candidate.name, candidate_name))
+        
+        if result:
+            filters.append(InterviewSession.overall_result == result.lower())
+        
+        if position:
+            filters.append(unaccent_contains(InterviewSession.position, position))
+        
+        # Chỉ lấy các cột cần cho list (không load strengths/weaknesses/summary)
+        query = session.query(
+            InterviewSession.id,
+            InterviewSession.session_id,
+            InterviewSession.created_at,
+            InterviewSession.position,
+            InterviewSession.overall_result,
+            InterviewSession.average_score,
+            InterviewSession.total_questions,
+            InterviewSession.passed_questions,
+            Candidate.name.label('candidate_name'),
+            Interviewer.name.label('interviewer_name')
+        ).join(
+            Candidate,
+            Candidate.id == InterviewSession.candidate_id
+        ).outerjoin(
+            Interviewer,
+            Interviewer.id == InterviewSession.interviewer_id
+        ).filter(
+            *filters
+        )
+        
+        if total_mode == 'exact':
+            # Một câu aggregate cho cả total theo filter lẫn pass/fail toàn bảng
+            total_count, total_pass_all, total_all = self._count_totals(session, Candidate, Interviewer, filters)
+        elif total_mode == 'approx':
+            total_count, total_pass_all, total_all = self._estimate_totals(session, query, Candidate, Interviewer, filters)
+        else:
+            total_count = total_pass_all = total_all = None
+        
+        # Keyset: WHERE (created_at, id) < cursor dùng index, không phải bỏ qua OFFSET dòng
+        query = query.order_by(
+            desc(InterviewSession.created_at),
+            desc(InterviewSession.id)
+        )
+        if keyset:
+            query = query.filter(
+                tuple_(InterviewSession.created_at, InterviewSession.id) < tuple_(last_created_at, last_id)
+            )
+        else:
+            query = query.offset(offset)
+        
+        # Lấy dư 1 dòng để biết còn trang sau hay không
+        results = query.limit(page_size + 1).all()
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        
+        # Format results
+        formatted_results = []
+        
+        for idx, row in enumerate(results, start=offset + 1):
+            formatted_results.append({
+                "id": idx,
+                "session_id": row.session_id,
+                "interviewer": row.interviewer_name or "Unknown",
+                "candidate": row.candidate_name,
+                "date": row.created_at.strftime("%Y-%m-%d"),
+                "position": row.position or "N/A",
+                "overallResult": row.overall_result,
+                "overallScore": round(row.average_score, 1) if row.average_score else 0.0,
+                "totalQuestions": row.total_questions,
+                "passedQuestions": row.passed_questions or 0
+            })
+        
+        next_cursor = None
+        if has_more:
+            last = results[-1]
+            next_cursor = encode_cursor(last.created_at, last.id, offset + len(results))
+        
+        return {
+            "totalInterview": total_count,
+            "totalPass": total_pass_all,
+            "totalFailed": total_all - total_pass_all if total_all is not None else None,
+            "results": formatted_results,
+            "pagination": {
+                "page": None if keyset else page,
+                "pageSize": page_size,
+                "totalPages": (total_count + page_size - 1) // page_size if total_count is not None else None,
+                "totalItems": total_count,
+                "totalExact": total_mode == 'exact',
+                "nextCursor": next_cursor
+            }
+        }
+    
+    def _count_totals(self, session: Session, Candidate, Interviewer, filters: List) -> Tuple[int, int, int]:
+        """
+        Count filtered rows, passed sessions and all sessions in one query
+        
+        Returns:
+            (filtered_count, total_pass, total_all) - pass/total are over the whole table
+        """
+        all_count = func.count(InterviewSession.id)
+        filtered_count = all_count.filter(and_(*filters)) if filters else all_count
+        
+        row = session.query(
+            filtered_count,
+            all_count.filter(InterviewSession.overall_result == 'pass'),
+            all_count
+        ).select_from(
+            InterviewSession
+        ).join(
+            Candidate,
+            Candidate.id == InterviewSession.candidate_id
+        ).outerjoin(
+            Interviewer,
+            Interviewer.id == InterviewSession.interviewer_id
+        ).one()
+        
+        return row[0], row[1], row[2]
+    
+    def _estimate_totals(self, session: Session, query, Candidate, Interviewer, filters: List) -> Tuple[int, int, int]:
+        """
+        Estimate the same totals as _count_totals from planner statistics
+        
+        Table size comes from pg_class.reltuples and the pass ratio from
+        pg_stats; the filtered count is the planner's row estimate for the
+        list query. Falls back to exact counts if the table was never analysed.
+        """
+        row = session.execute(text("""
+            SELECT c.reltuples::bigint AS total_all,
+                   s.most_common_vals::text::text[] AS vals,
+                   s.most_common_freqs AS freqs
+            FROM pg_class c
+            LEFT JOIN pg_stats s
+                ON s.schemaname = current_schema()
+               AND s.tablename = c.relname
+               AND s.attname = 'overall_result'
+            WHERE c.oid = to_regclass(:table_name)
+        """), {"table_name": InterviewSession.__tablename__}).first()
+        
+        if not row or row.total_all < 0:
+            return self._count_totals(session, Candidate, Interviewer, filters)
+        
+        total_all = row.total_all
+        freqs = dict(zip(row.vals or [], row.freqs or []))
+        total_pass_all = int(round(total_all * freqs.get('pass', 0.0)))
+        
+        if not filters:
+            return total_all, total_pass_all, total_all
+        
+        connection = session.connection()
+        statement = query.statement.compile(dialect=connection.dialect)
+        params = statement.params
+        if statement.positional:
+            # asyncpg dùng $1, $2... -> tham số theo vị trí
+            params = tuple(params[name] for name in statement.positiontup)
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", params).scalar()
+        total_count = int(plan[0]["Plan"]["Plan Rows"])
+        
+        return total_count, total_pass_all, total_all
+    
     def get_interview_detail(self, session_id: str) -> Optional[Dict]:
         """Get detailed information for a specific interview session"""
-        session: Session = self.db_manager.get_session()
-        
         try:
-            # Get session summary
-            session_record = session.query(InterviewSession).filter(
-                InterviewSession.session_id == session_id
-            ).first()
+            session: Session = self.db_manager.get_read_session()
+            try:
+                document = self.documents.load(session, session_id)
+            finally:
+                session.close()
+            if document is not None:
+                return document
             
-            if not session_record:
-                return None
-            
-            # Get candidate and interviewer
-            candidate = session.query(User).filter(
-                User.id == session_record.candidate_id
-            ).first()
-            interviewer = session.query(User).filter(
-                User.id == session_record.interviewer_id
-            ).first()
-            
-            # Get interactions
-            interactions = session.query(UserInteraction).filter(
-                UserInteraction.session_id == session_id
-            ).all()
-            
-            # Format questions
-            questions = []
-            for i in interactions:
-                questions.append({
-                    "question": i.question.name if i.question_id and i.question else i.question_summarized or "N/A",
-                    "answer": i.answer_original,
-                    "correctAnswer": i.final_answer,
-                    "score": i.grading_score,
-                    "passed": i.is_passed,
-                    "feedback": i.feedback
-                })
-            
-            return {
-                "session_id": session_id,
-                "candidate": candidate.name if candidate else "Unknown",
-                "interviewer": interviewer.name if interviewer else "Unknown",
-                "position": session_record.position or "N/A",
-                "date": session_record.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                "overallScore": round(session_record.average_score, 1) if session_record.average_score else 0.0,
-                "overallResult": session_record.overall_result,
-                "totalQuestions": session_record.total_questions,
-                "passedQuestions": session_record.passed_questions,
-                "strengths": session_record.strengths,
-                "weaknesses": session_record.weaknesses,
-                "summary": session_record.summary,
-                "questions": questions
-            }
+            # Chưa có trên replica (mới lưu, replica trễ) hoặc cần backfill: primary
+            session = self.db_manager.get_session()
+            try:
+                return self._interview_detail(session, session_id)
+            finally:
+                session.close()
+        except Exception as e:
+            logger.error(f"Error getting interview detail: {e}", exc_info=True)
+            raise
+    
+    async def get_interview_detail_async(self, session_id: str) -> Optional[Dict]:
+        """Same as get_interview_detail, on the async engine"""
+        try:
+            async with self.db_manager.get_async_read_session() as session:
+                document = await session.run_sync(self.documents.load, session_id)
+            if document is not None:
+                return document
             
+            async with self.db_manager.get_async_session() as session:
+                return await session.run_sync(self._interview_detail, session_id)
         except Exception as e:
             logger.error(f"Error getting interview detail: {e}", exc_info=True)
             raise
-        finally:
-            session.close()
+    
+    def _interview_detail(self, session: Session, session_id: str) -> Optional[Dict]:
+        """Serve the materialized detail document (one primary-key lookup), backfilling it if missing"""
+        return self.documents.get_or_build(session, session_id)
+    
+    async def get_stats_async(self, scope: str = GLOBAL_SCOPE, key: Optional[str] = None, limit: int = 50):
+        """
+        Read pre-aggregated statistics
+        
+        Returns:
+            One stats dict for the global scope or when key is given (None if
+            the key has no data), otherwise a list of the scope's rows
+        """
+        async with self.db_manager.get_async_read_session() as session:
+            if scope == GLOBAL_SCOPE or key is not None:
+                return await session.run_sync(self.stats.load, scope, key or "")
+            return await session.run_sync(self.stats.load_scope, scope, limit)
@@ -0,0 +1,20 @@
+"""
+Response classes for the API
+"""
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson
+
+    Used as the app's default_response_class and by the cached interview
+    routes. Non-str dict keys and datetimes are serialized natively, so
+    payloads skip the jsonable_encoder pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
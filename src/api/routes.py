@@ -1,24 +1,139 @@
 """
 FastAPI routes for interview system
 """
-from fastapi import APIRouter, Query, HTTPException
-from typing import Optional
+import hashlib
+import json
+from email.utils import format_datetime
+from datetime import date, timezone
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, Optional
 
+from config.database import db_manager
 from src.api.interview_service import InterviewService
+from src.api.responses import ORJSONResponse
+from src.database.export_db import MEDIA_TYPES, iter_export
+from src.utils.cache import (
+    CACHES, MISSING, interview_detail_cache, interview_list_cache, interview_list_version_cache
+)
+from src.utils.metrics import metrics
 from src.utils.logger import logger
 
 router = APIRouter(prefix="/api/v1", tags=["interviews"])
 service = InterviewService()
 
+LIST_VERSION_KEY = "__version__"
 
-@router.get("/interviews")
+
+async def read_unit_of_work():
+    """Dependency: the request's reads share one connection (taken only if the cache misses)"""
+    async with db_manager.async_read_unit_of_work():
+        yield
+
+
+def _etag(*parts) -> str:
+    digest = hashlib.sha1(json.dumps(parts, default=str, sort_keys=True).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match (RFC 9110)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def _field_tree(value: Optional[str]) -> Optional[Dict]:
+    """
+    Parse a comma-separated list of dotted field paths into a nested dict
+    
+    "candidate,questions.score" -> {"candidate": True, "questions": {"score": True}}
+    (True = the whole value). Lists are traversed transparently, so
+    "questions.score" applies to every question.
+    """
+    if not value:
+        return None
+    tree: Dict = {}
+    for path in sorted({p.strip() for p in value.split(",") if p.strip()}):
+        node = tree
+        parts = path.split(".")
+        for part in parts[:-1]:
+            child = node.setdefault(part, {})
+            if child is True:
+                break
+            node = child
+        else:
+            node[parts[-1]] = True
+    return tree or None
+
+
+def _include_fields(value: Any, tree: Dict) -> Any:
+    if isinstance(value, list):
+        return [_include_fields(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {
+        key: value[key] if sub is True else _include_fields(value[key], sub)
+        for key, sub in tree.items() if key in value
+    }
+
+
+def _exclude_fields(value: Any, tree: Dict) -> Any:
+    if isinstance(value, list):
+        return [_exclude_fields(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {
+        key: item if key not in tree else _exclude_fields(item, tree[key])
+        for key, item in value.items() if tree.get(key) is not True
+    }
+
+
+def _projection_etag(etag: str, fields: Optional[str], exclude: Optional[str]) -> str:
+    """ETag of a projected response (known before the payload is loaded, for 304s)"""
+    if not fields and not exclude:
+        return etag
+    return _etag(etag, _field_tree(fields), _field_tree(exclude))
+
+
+def _project(payload: Dict, fields: Optional[str], exclude: Optional[str]) -> Dict:
+    """Apply fields=/exclude= to a (cached, full) payload"""
+    include_tree, exclude_tree = _field_tree(fields), _field_tree(exclude)
+    if include_tree:
+        payload = _include_fields(payload, include_tree)
+    if exclude_tree:
+        payload = _exclude_fields(payload, exclude_tree)
+    return payload
+
+
+def _cached_response(payload: Optional[Dict], etag: str, last_modified=None) -> Response:
+    """JSON response with validators, or 304 when payload is None"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    if payload is None:
+        metrics.increment("http.not_modified")
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(content=payload, headers=headers)
+
+
+@router.get("/interviews", dependencies=[Depends(read_unit_of_work)])
 async def get_interviews(
+    request: Request,
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
     interviewer: Optional[str] = Query(None, description="Filter by interviewer name"),
     candidate: Optional[str] = Query(None, description="Filter by candidate name"),
     position: Optional[str] = Query(None, description="Filter by position"),
-    result: Optional[str] = Query(None, regex="^(pass|fail)$", description="Filter by result (pass/fail)")
+    result: Optional[str] = Query(None, regex="^(pass|fail)$", description="Filter by result (pass/fail)"),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous response (keyset pagination)"),
+    total: Optional[str] = Query(None, regex="^(exact|approx|none)$", description="How to compute totals"),
+    fields: Optional[str] = Query(None, description="Comma-separated dotted paths to keep, e.g. results.candidate,pagination"),
+    exclude: Optional[str] = Query(None, description="Comma-separated dotted paths to drop, e.g. results.interviewer")
 ):
     """
     Get paginated list of interviews
@@ -26,10 +141,21 @@ async def get_interviews(
     **Query Parameters:**
     - page: Page number (default: 1)
     - page_size: Items per page (default: 10, max: 100)
-    - interviewer: Filter by interviewer name (partial match)
-    - candidate: Filter by candidate name (partial match)
-    - position: Filter by position
+    - interviewer: Filter by interviewer name (partial match, case/diacritic-insensitive)
+    - candidate: Filter by candidate name (partial match, case/diacritic-insensitive)
+    - position: Filter by position (partial match, case/diacritic-insensitive)
     - result: Filter by result ("pass" or "fail")
+    - cursor: Opaque cursor from `pagination.nextCursor`; when given, `page` is ignored
+      and the next page is read with a keyset condition instead of OFFSET
+    - total: "exact" (default for page mode), "approx" (planner statistics, default
+      for cursor mode) or "none" (totals are null)
+    - fields: Keep only these dotted paths (lists are traversed), e.g.
+      `fields=totalInterview,results.session_id,results.candidate,pagination`
+    - exclude: Drop these dotted paths, e.g. `exclude=results.interviewer`
+    
+    Responses carry an ETag (derived from max(updated_at)/max(id) of
+    interview_sessions and the query) and Last-Modified; a matching
+    If-None-Match returns 304 without running the list query.
     
     **Response:**
     ```json
@@ -55,34 +181,66 @@ async def get_interviews(
         "page": 1,
         "pageSize": 10,
         "totalPages": 10,
-        "totalItems": 100
+        "totalItems": 100,
+        "totalExact": true,
+        "nextCursor": "eyJjIjoiMjAyNS0xMS0xNVQxNDozMDowMCIsImkiOjkwLCJuIjoxMH0"
       }
     }
     ```
     """
     try:
-        result_data = service.get_interview_list(
-            page=page,
-            page_size=page_size,
-            interviewer_name=interviewer,
-            candidate_name=candidate,
-            position=position,
-            result=result
-        )
-        return result_data
+        version = interview_list_version_cache.get(LIST_VERSION_KEY)
+        if version is MISSING:
+            version = await service.get_list_version_async()
+            interview_list_version_cache.set(LIST_VERSION_KEY, version)
+        
+        params = (page, page_size, interviewer, candidate, position, result, cursor, total)
+        full_etag = _etag("list", version, params)
+        etag = _projection_etag(full_etag, fields, exclude)
+        if _not_modified(request, etag):
+            return _cached_response(None, etag, version[0])
+        
+        # Key theo ETag: version mới -> key mới, entry cũ tự hết hạn
+        # Cache payload đầy đủ; fields/exclude áp dụng khi trả về
+        result_data = interview_list_cache.get(full_etag)
+        if result_data is MISSING:
+            result_data = await service.get_interview_list_async(
+                page=page,
+                page_size=page_size,
+                interviewer_name=interviewer,
+                candidate_name=candidate,
+                position=position,
+                result=result,
+                cursor=cursor,
+                total_mode=total
+            )
+            interview_list_cache.set(full_etag, result_data)
+        return _cached_response(_project(result_data, fields, exclude), etag, version[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in get_interviews endpoint: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/interviews/{session_id}")
-async def get_interview_detail(session_id: str):
+@router.get("/interviews/{session_id}", dependencies=[Depends(read_unit_of_work)])
+async def get_interview_detail(
+    session_id: str,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated dotted paths to keep, e.g. candidate,overallScore,questions.score"),
+    exclude: Optional[str] = Query(None, description="Comma-separated dotted paths to drop, e.g. questions.correctAnswer")
+):
     """
     Get detailed information for a specific interview session
     
     **Path Parameters:**
     - session_id: UUID of the interview session
     
+    **Query Parameters:**
+    - fields: Keep only these dotted paths (lists are traversed), e.g.
+      `fields=candidate,overallScore,questions.question,questions.score`
+    - exclude: Drop these dotted paths, e.g. `exclude=questions.correctAnswer,questions.feedback`
+    
     **Response:**
     ```json
     {
@@ -107,10 +265,19 @@ async def get_interview_detail(session_id: str):
     ```
     """
     try:
-        detail = service.get_interview_detail(session_id)
-        if not detail:
-            raise HTTPException(status_code=404, detail="Interview session not found")
-        return detail
+        cached = interview_detail_cache.get(session_id)
+        if cached is MISSING:
+            detail = await service.get_interview_detail_async(session_id)
+            if not detail:
+                raise HTTPException(status_code=404, detail="Interview session not found")
+            cached = (detail, _etag("detail", detail))
+            interview_detail_cache.set(session_id, cached)
+        
+        detail, full_etag = cached
+        etag = _projection_etag(full_etag, fields, exclude)
+        if _not_modified(request, etag):
+            return _cached_response(None, etag)
+        return _cached_response(_project(detail, fields, exclude), etag)
     except HTTPException:
         raise
     except Exception as e:
@@ -118,7 +285,116 @@ async def get_interview_detail(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/stats", dependencies=[Depends(read_unit_of_work)])
+async def get_stats(
+    scope: str = Query("global", regex="^(global|position|interviewer|day|candidate)$", description="Aggregation scope"),
+    key: Optional[str] = Query(None, description="Position name, interviewer/candidate id or YYYY-MM-DD"),
+    limit: int = Query(50, ge=1, le=500, description="Max rows when listing a scope")
+):
+    """
+    Dashboard statistics from pre-aggregated summary rows
+    
+    Rows are updated when a session summary is saved, so only sessions with
+    a saved summary are counted.
+    
+    **Query Parameters:**
+    - scope: global (default), position, interviewer, day, candidate
+    - key: Return a single row of the scope; without key all rows of the scope are listed
+    - limit: Max rows when listing (busiest first; day scope: most recent first)
+    
+    **Response (global):**
+    ```json
+    {
+      "scope": "global",
+      "key": "",
+      "totalInterview": 100,
+      "totalPass": 80,
+      "totalFailed": 20,
+      "passRate": 0.8,
+      "totalQuestions": 500,
+      "passedQuestions": 390,
+      "averageScore": 7.1,
+      "updatedAt": "2025-11-15T14:30:00",
+      "totalCandidates": 95
+    }
+    ```
+    """
+    try:
+        stats = await service.get_stats_async(scope, key, limit)
+        if stats is None:
+            raise HTTPException(status_code=404, detail="No statistics for this key")
+        return stats
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_stats endpoint: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/export")
+async def export_interviews(
+    format: str = Query("ndjson", regex="^(ndjson|csv|parquet)$", description="Output format"),
+    date_from: Optional[date] = Query(None, description="Sessions created on or after this day (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, description="Sessions created on or before this day (YYYY-MM-DD)")
+):
+    """
+    Bulk export of interview sessions joined with their interactions
+    
+    One row per interaction (sessions without interactions get one row with
+    empty interaction columns), ordered by session creation time and question
+    order. The body is streamed from a server-side cursor, so memory use does
+    not grow with the export size.
+    
+    **Query Parameters:**
+    - format: "ndjson" (default), "csv" or "parquet" (requires pyarrow on the server)
+    - date_from / date_to: Inclusive range on the session creation day
+    
+    **Example:**
+    ```
+    GET /api/v1/export?format=csv&date_from=2025-11-01&date_to=2025-11-30
+    ```
+    """
+    try:
+        chunks = iter_export(format, date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    
+    filename = f"interviews_{date_from or 'all'}_{date_to or 'all'}.{format}"
+    metrics.increment(f"export.{format}")
+    # Generator đồng bộ: Starlette chạy nó trong threadpool nên không chặn event loop
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "ok", "service": "interview-system"}
+
+
+@router.get("/metrics")
+async def get_metrics() -> Dict:
+    """
+    In-process counters, response cache hit rates and read replica health
+    
+    **Response:**
+    ```json
+    {
+      "counters": {"llm_calls.grading": 12, "cache.interview_list.hits": 40},
+      "caches": {
+        "interview_list": {"hits": 40, "misses": 10, "hit_rate": 0.8, "size": 6, "maxsize": 512, "ttl_seconds": 30.0}
+      },
+      "replicas": [{"replica": 0, "host": "db-replica-1", "healthy": true, "lag_seconds": 0.4}]
+    }
+    ```
+    """
+    return {
+        "counters": metrics.snapshot(),
+        "caches": {cache.name: cache.stats() for cache in CACHES},
+        "replicas": db_manager.replica_status()
+    }
@@ -1,13 +1,18 @@
 """
 Webhook routes for Google Drive integration
 """
-from fastapi import APIRouter, Request, HTTPException, Header
+from fastapi import APIRouter, Request, HTTPException, Header, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from typing import Optional
-from urllib.parse import urlparse
+from typing import Dict, Optional
+import threading
 
+from config.settings import settings
 from src.services.drive_webhook_handler import DriveWebhookHandler
+from src.services.job_manager import job_manager, ProgressCallback, INTERACTIVE, BACKGROUND
 from src.processors.batch_processor import process_interview_batch
+from src.database.job_queue_db import JobQueueDatabase
+from src.workers.tasks import enqueue_drive_file
 from src.utils.logger import logger
 
 
@@ -15,13 +20,16 @@ router = APIRouter(prefix="", tags=["webhook"])
 
 # Lazy initialization of webhook handler
 _webhook_handler = None
+_handler_lock = threading.Lock()
+_changes_lock = threading.Lock()
 
 
 def get_webhook_handler():
     """Get or create webhook handler instance"""
     global _webhook_handler
-    if _webhook_handler is None:
-        _webhook_handler = DriveWebhookHandler()
+    with _handler_lock:
+        if _webhook_handler is None:
+            _webhook_handler = DriveWebhookHandler()
     return _webhook_handler
 
 
@@ -38,6 +46,93 @@ async def verify_webhook(
     return {"status": "ok"}
 
 
+def _run_batch(result: Dict, progress_callback: ProgressCallback) -> Dict:
+    """Grade the analysed interview and combine both stage results"""
+    if result["status"] == "skipped":
+        logger.info(f"Skipped file: {result.get('message')}")
+        return result
+    if result["status"] != "success":
+        logger.error(f"Error processing file: {result.get('message')}")
+        return result
+
+    logger.info(f"Successfully processed file: {result.get('file_name')}")
+    logger.info(f"Interviewer: {result.get('interviewer_name', 'Unknown')}, Candidate: {result.get('candidate_name', 'Unknown')}")
+    logger.info(f"Summary: {result.get('summary', '')[:100]}...")
+    logger.info(f"Q&A pairs: {len(result.get('qa_pairs', []))}")
+
+    # Gọi batch processor để xử lý interview
+    logger.info("Starting batch processing...")
+    batch_result = process_interview_batch(
+        result,
+        progress_callback=lambda stage, progress: progress_callback(stage, 0.5 + 0.5 * progress)
+    )
+
+    if batch_result["status"] == "success":
+        logger.info("Batch processing completed successfully")
+        logger.info(f"Session ID: {batch_result.get('session_id')}")
+        logger.info(f"Overall result: {batch_result.get('overall_result')}")
+    else:
+        logger.error(f"Batch processing failed: {batch_result.get('message')}")
+
+    return {
+        "status": batch_result["status"],
+        "webhook_result": result,
+        "batch_processing": batch_result
+    }
+
+
+def _run_webhook_job(progress_callback: ProgressCallback) -> Dict:
+    """Background job: process Drive changes, then grade the interview"""
+    # Các notification đến dồn dập cùng đọc page token -> xử lý tuần tự
+    with _changes_lock:
+        result = get_webhook_handler().process_changes_since(
+            progress_callback=lambda stage, progress: progress_callback(stage, 0.5 * progress)
+        )
+    return _run_batch(result, progress_callback)
+
+
+def _run_file_job(progress_callback: ProgressCallback, file_id: str) -> Dict:
+    """Background job: process a single Drive file, then grade the interview"""
+    result = get_webhook_handler().handle_file_created(
+        file_id,
+        progress_callback=lambda stage, progress: progress_callback(stage, 0.5 * progress)
+    )
+    return _run_batch(result, progress_callback)
+
+
+def _enqueue_changes_job(progress_callback: ProgressCallback) -> Dict:
+    """Background job: fan Drive changes out to the durable queue"""
+    with _changes_lock:
+        handler = get_webhook_handler()
+        collected = handler.collect_changed_media_files()
+        if collected["status"] != "success":
+            return collected
+
+        queued_jobs = [
+            enqueue_drive_file(file["file_id"], file["file_name"], file["checksum"], priority=BACKGROUND)
+            for file in collected["files"]
+        ]
+        # Chỉ lưu token sau khi đã enqueue; notification sau sẽ bị lọc bởi idempotency key
+        handler.save_start_page_token(collected["new_start_page_token"])
+
+    return {"status": "success", "queued_jobs": queued_jobs}
+
+
+def _use_durable_queue() -> bool:
+    return settings.job_queue_backend == "postgres"
+
+
+def _accepted(job_id: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "accepted",
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}"
+        }
+    )
+
+
 @router.post("/webhook")
 async def handle_drive_webhook(
     request: Request,
@@ -60,101 +155,78 @@ async def handle_drive_webhook(
             logger.info(f"Ignoring resource state: {x_goog_resource_state}")
             return {"status": "ignored", "reason": f"resource_state={x_goog_resource_state}"}
 
-        # Lấy file ID từ resource URI
         if not x_goog_resource_uri:
             raise HTTPException(status_code=400, detail="Missing resource URI")
 
-        try:
-            parsed = urlparse(x_goog_resource_uri or "")
-            file_id = parsed.path.rstrip('/').split('/')[-1] if parsed.path else None
-        except Exception:
-            file_id = None
-
-        # Xử lý changes từ Drive
-        webhook_handler = get_webhook_handler()
-        result = webhook_handler.process_changes_since()
-
-        if result["status"] == "success":
-            logger.info(f"Successfully processed file: {result.get('file_name')}")
-            logger.info(f"Interviewer: {result.get('interviewer_name', 'Unknown')}, Candidate: {result.get('candidate_name', 'Unknown')}")
-            logger.info(f"Summary: {result.get('summary', '')[:100]}...")
-            logger.info(f"Q&A pairs: {len(result.get('qa_pairs', []))}")
-            
-            # Gọi batch processor để xử lý interview
-            logger.info("Starting batch processing...")
-            batch_result = process_interview_batch(result)
-            
-            if batch_result["status"] == "success":
-                logger.info(f"Batch processing completed successfully")
-                logger.info(f"Session ID: {batch_result.get('session_id')}")
-                logger.info(f"Overall result: {batch_result.get('overall_result')}")
-                
-                # Trả về kết quả kết hợp
-                return JSONResponse(
-                    status_code=200,
-                    content={
-                        "webhook_result": result,
-                        "batch_processing": batch_result
-                    }
-                )
-            else:
-                logger.error(f"Batch processing failed: {batch_result.get('message')}")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "webhook_result": result,
-                        "batch_processing": batch_result
-                    }
-                )
-            
-        elif result["status"] == "skipped":
-            logger.info(f"Skipped file: {result.get('message')}")
-            return JSONResponse(
-                status_code=200,
-                content=result
-            )
+        # Trả về 202 ngay, pipeline chạy ở background để Drive không retry
+        if _use_durable_queue():
+            # Chỉ enqueue nên chạy ở lane interactive để không bị kẹt sau backlog
+            job_id = job_manager.submit("drive_changes", _enqueue_changes_job, priority=INTERACTIVE)
         else:
-            logger.error(f"Error processing file: {result.get('message')}")
-            return JSONResponse(
-                status_code=500,
-                content=result
-            )
+            job_id = job_manager.submit("drive_webhook", _run_webhook_job, priority=BACKGROUND)
+        return _accepted(job_id)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error handling webhook: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/process-file/{file_id}")
-async def process_file_manual(file_id: str):
+async def process_file_manual(
+    file_id: str,
+    force: bool = Query(False, description="Queue a new job even if this upload was already queued")
+):
     """Manually process a specific file from Google Drive"""
     try:
         logger.info(f"Manual processing request for file: {file_id}")
-        webhook_handler = get_webhook_handler()
-        result = webhook_handler.handle_file_created(file_id)
-
-        if result["status"] == "success":
-            # Gọi batch processor để xử lý interview
-            logger.info("Starting batch processing...")
-            batch_result = process_interview_batch(result)
-            
-            return JSONResponse(
-                status_code=200 if batch_result["status"] == "success" else 500,
-                content={
-                    "webhook_result": result,
-                    "batch_processing": batch_result
-                }
+        # Yêu cầu thủ công đi lane interactive, được xử lý trước backlog của webhook
+        if _use_durable_queue():
+            # Cùng idempotency key với đường webhook: (file id, checksum)
+            file_info = await run_in_threadpool(get_webhook_handler().drive_service.get_file_info, file_id)
+            if not file_info:
+                raise HTTPException(status_code=404, detail="Could not retrieve file information")
+            job_id = enqueue_drive_file(
+                file_id,
+                file_info.get('name'),
+                file_info.get('md5Checksum') or file_info.get('modifiedTime'),
+                priority=INTERACTIVE,
+                force=force
             )
-        
-        return JSONResponse(
-            status_code=200 if result["status"] == "success" else 500,
-            content=result
-        )
+        else:
+            job_id = job_manager.submit("process_file", _run_file_job, file_id, priority=INTERACTIVE)
+        return _accepted(job_id)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in manual processing: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Get stage, progress and result of a background processing job"""
+    job = job_manager.get_job(job_id)
+    if job:
+        return job
+
+    if _use_durable_queue():
+        queue = JobQueueDatabase()
+        job = queue.get_job(job_id)
+        if job:
+            # Job transcribe nối tiếp bằng job grade -> kèm trạng thái của nó
+            grade_job_id = (job.get("result") or {}).get("grade_job_id")
+            if grade_job_id:
+                grade_job = queue.get_job(grade_job_id)
+                job["grade_job"] = grade_job
+                if grade_job and grade_job["status"] == "succeeded":
+                    job["result"]["batch_processing"] = grade_job["result"]
+            return job
+
+    raise HTTPException(status_code=404, detail="Job not found")
+
+
 @router.get("/webhook/results")
 async def get_latest_results():
     """Get information about webhook results"""
@@ -5,6 +5,7 @@ from typing import Dict
 
 from config.settings import settings
 from src.utils.logger import logger
+from src.utils.metrics import metrics
 
 class GradingChain:
     def __init__(self):
@@ -62,6 +63,7 @@ class GradingChain:
             # Get passing score from settings with fallback (thang điểm 10)
             passing_score = getattr(settings, 'passing_score', 6)
             
+            metrics.increment("llm_calls.grading")
             result = self.chain.run(
                 question=question,
                 reference_answer=reference_answer,
@@ -4,6 +4,7 @@ from langchain.prompts import PromptTemplate
 
 from config.settings import settings
 from src.utils.logger import logger
+from src.utils.metrics import metrics
 
 class QAChain:
     def __init__(self):
@@ -39,6 +40,7 @@ class QAChain:
     def generate_answer(self, question: str, context: str = "") -> str:
         """Generate reference answer for question"""
         try:
+            metrics.increment("llm_calls.qa")
             answer = self.chain.run(question=question, context=context)
             logger.info("Generated reference answer")
             return answer.strip()
@@ -8,6 +8,7 @@ from typing import Dict, List
 
 from config.settings import settings
 from src.utils.logger import logger
+from src.utils.metrics import metrics
 
 
 class SessionSummaryChain:
@@ -114,6 +115,7 @@ class SessionSummaryChain:
                 questions_detail += f"  Feedback: {q.get('feedback', 'N/A')}\n"
             
             # Generate summary
+            metrics.increment("llm_calls.session_summary")
             result = self.chain.run(
                 candidate_name=candidate_name,
                 position=position,
@@ -164,5 +166,6 @@ class SessionSummaryChain:
             return {
                 "strengths": "Không thể tạo tóm tắt điểm mạnh",
                 "weaknesses": "Không thể tạo tóm tắt điểm yếu",
-                "summary": f"Lỗi khi tạo tóm tắt: {str(e)}"
+                "summary": f"Lỗi khi tạo tóm tắt: {str(e)}",
+                "error": str(e)
             }
@@ -4,6 +4,7 @@ from langchain.prompts import PromptTemplate
 
 from config.settings import settings
 from src.utils.logger import logger
+from src.utils.metrics import metrics
 
 class SummarizeChain:
     def __init__(self):
@@ -49,6 +50,7 @@ class SummarizeChain:
     def summarize(self, question: str) -> str:
         """Summarize and normalize question"""
         try:
+            metrics.increment("llm_calls.summarize")
             summarized = self.chain.run(question=question)
             result = summarized.strip()
             
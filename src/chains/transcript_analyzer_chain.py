@@ -7,6 +7,7 @@ import re
 
 from config.settings import settings
 from src.utils.logger import logger
+from src.utils.metrics import metrics
 
 
 class TranscriptAnalyzerChain:
@@ -72,6 +73,7 @@ JSON Output:
             logger.info(f"Transcript length: {len(transcript)} characters")
 
             # Gọi LLM để phân tích
+            metrics.increment("llm_calls.transcript_analyzer")
             result = self.chain.run(transcript=transcript)
 
             # Parse JSON từ kết quả
@@ -0,0 +1,123 @@
+"""
+Database operations for pipeline stage checkpoints
+"""
+import hashlib
+import json
+import uuid
+from typing import Dict, Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from config.database import db_manager, ProcessingCheckpoint
+from src.utils.logger import logger
+
+
+TRANSCRIPT_STAGE = "transcript"
+QA_PAIRS_STAGE = "qa_pairs"
+GRADE_STAGE = "grade"
+SUMMARY_STAGE = "summary"
+
+_SESSION_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "interview-system/session")
+
+
+def stable_session_id(source_id: str) -> str:
+    """Derive a deterministic session id so retries of the same source share checkpoints"""
+    return str(uuid.uuid5(_SESSION_NAMESPACE, source_id))
+
+
+def payload_source_id(json_input: Dict) -> str:
+    """Source id for payloads that do not come from a Drive file (content hash)"""
+    content = json.dumps(
+        {
+            "candidate_name": json_input.get("candidate_name"),
+            "interviewer_name": json_input.get("interviewer_name"),
+            "position": json_input.get("position"),
+            "qa_pairs": json_input.get("qa_pairs", [])
+        },
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return "payload:" + hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class CheckpointDatabase:
+    """Database operations for processing checkpoints"""
+
+    def __init__(self):
+        self.db_manager = db_manager
+
+    def save(self, session_id: str, stage: str, data: Dict, item_key: str = "") -> None:
+        """Save (or overwrite) the checkpoint of a stage"""
+        session: Session = self.db_manager.get_session()
+
+        try:
+            stmt = insert(ProcessingCheckpoint).values(
+                session_id=session_id,
+                stage=stage,
+                item_key=item_key,
+                data=data
+            )
+            stmt = stmt.on_conflict_do_update(
+                constraint='uq_processing_checkpoints_stage_item',
+                set_={"data": stmt.excluded.data, "created_at": stmt.excluded.created_at}
+            )
+            session.execute(stmt)
+            session.commit()
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving {stage} checkpoint for {session_id}: {e}")
+            raise
+        finally:
+            session.close()
+
+    def get(self, session_id: str, stage: str, item_key: str = "") -> Optional[Dict]:
+        """Get the checkpoint of a stage, or None if the stage has not completed"""
+        session: Session = self.db_manager.get_session()
+
+        try:
+            return session.query(ProcessingCheckpoint.data).filter(
+                ProcessingCheckpoint.session_id == session_id,
+                ProcessingCheckpoint.stage == stage,
+                ProcessingCheckpoint.item_key == item_key
+            ).scalar()
+        finally:
+            session.close()
+
+    def get_stage_items(self, session_id: str, stage: str) -> Dict[str, Dict]:
+        """Get all per-item checkpoints of a stage, keyed by item_key"""
+        session: Session = self.db_manager.get_session()
+
+        try:
+            rows = session.query(
+                ProcessingCheckpoint.item_key,
+                ProcessingCheckpoint.data
+            ).filter(
+                ProcessingCheckpoint.session_id == session_id,
+                ProcessingCheckpoint.stage == stage
+            ).all()
+            return {item_key: data for item_key, data in rows}
+        finally:
+            session.close()
+
+    def clear(self, session_id: str, *stages: str) -> int:
+        """Delete checkpoints of the given stages (all stages if none given)"""
+        session: Session = self.db_manager.get_session()
+
+        try:
+            query = session.query(ProcessingCheckpoint).filter(
+                ProcessingCheckpoint.session_id == session_id
+            )
+            if stages:
+                query = query.filter(ProcessingCheckpoint.stage.in_(stages))
+            deleted = query.delete(synchronize_session=False)
+            session.commit()
+            return deleted
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error clearing checkpoints for {session_id}: {e}")
+            raise
+        finally:
+            session.close()
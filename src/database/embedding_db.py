@@ -0,0 +1,309 @@
+"""
+Question embedding versions: the active vector column, and re-embedding into a shadow column
+"""
+import re
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from pgvector.sqlalchemy import Vector
+
+from config.database import db_manager, EmbeddingVersion
+from config.settings import settings
+from src.utils.logger import logger
+
+
+BASE_COLUMN = "embedding"  # Question.embedding, Vector(384)
+BASE_DIMENSIONS = 384
+ACTIVE, BUILDING, RETIRED = "active", "building", "retired"
+SHADOW_COLUMN = re.compile(r"^embedding_v\d+$")
+
+
+def _as_dict(version: EmbeddingVersion) -> Dict:
+    return {
+        "id": version.id,
+        "model": version.model,
+        "dimensions": version.dimensions,
+        "column_name": version.column_name,
+        "status": version.status,
+        "created_at": version.created_at,
+        "activated_at": version.activated_at,
+        "retired_at": version.retired_at
+    }
+
+
+def _index_name(column: str) -> str:
+    return f"ix_questions_{column}_hnsw"
+
+
+class EmbeddingVersionDatabase:
+    """Which column/model question search uses, and the re-embedding steps"""
+
+    def __init__(self):
+        self.db_manager = db_manager
+
+    def active(self, session: Optional[Session] = None, for_share: bool = False) -> Dict:
+        """
+        The active version; created for questions.embedding and
+        settings.embedding_model the first time
+
+        for_share locks the row until the caller's transaction ends, so a
+        flip cannot happen while the caller writes vectors for it.
+        """
+        own_session = session is None
+        session = session or self.db_manager.get_session()
+        try:
+            query = session.query(EmbeddingVersion).filter(EmbeddingVersion.status == ACTIVE)
+            if for_share:
+                query = query.with_for_update(read=True)
+            version = query.first()
+            if version is None:
+                # Bảng mới: các vector hiện có là của model đang cấu hình
+                session.execute(insert(EmbeddingVersion).values(
+                    model=settings.embedding_model,
+                    dimensions=BASE_DIMENSIONS,
+                    column_name=BASE_COLUMN,
+                    status=ACTIVE,
+                    created_at=datetime.utcnow(),
+                    activated_at=datetime.utcnow()
+                ).on_conflict_do_nothing())
+                session.flush()
+                version = query.first()
+                if own_session:
+                    session.commit()
+            return _as_dict(version)
+        finally:
+            if own_session:
+                session.close()
+
+    def building(self, session: Optional[Session] = None) -> List[Dict]:
+        own_session = session is None
+        session = session or self.db_manager.get_session()
+        try:
+            versions = session.query(EmbeddingVersion).filter(
+                EmbeddingVersion.status == BUILDING
+            ).order_by(EmbeddingVersion.id).all()
+            return [_as_dict(v) for v in versions]
+        finally:
+            if own_session:
+                session.close()
+
+    def list_versions(self) -> List[Dict]:
+        """All versions with how many questions each column covers"""
+        self.active()
+        session = self.db_manager.get_session()
+        try:
+            versions = [_as_dict(v) for v in session.query(EmbeddingVersion).order_by(EmbeddingVersion.id)]
+            total = session.execute(text("SELECT count(*) FROM questions")).scalar()
+            for version in versions:
+                version["total"] = total
+                version["embedded"] = session.execute(
+                    text(f"SELECT count({version['column_name']}) FROM questions")
+                ).scalar() if self._column_exists(session, version["column_name"]) else 0
+            return versions
+        finally:
+            session.close()
+
+    def begin(self, model: str, dimensions: int) -> Dict:
+        """
+        Start (or resume) re-embedding into a shadow column for model
+
+        A building version for the same model is resumed; building versions
+        for other models are abandoned (column dropped).
+        """
+        self.active()
+        session = self.db_manager.get_session()
+        try:
+            # Một lần đổi model tại một thời điểm
+            session.execute(text("LOCK TABLE embedding_versions IN SHARE ROW EXCLUSIVE MODE"))
+            for version in session.query(EmbeddingVersion).filter(EmbeddingVersion.status == BUILDING):
+                if version.model == model and version.dimensions == dimensions:
+                    session.commit()
+                    logger.info(f"Resuming re-embedding into {version.column_name} ({model})")
+                    return _as_dict(version)
+                logger.warning(f"Abandoning re-embedding into {version.column_name} ({version.model})")
+                self._drop_column(session, version.column_name)
+                session.delete(version)
+
+            next_id = session.execute(text("SELECT coalesce(max(id), 0) + 1 FROM embedding_versions")).scalar()
+            version = EmbeddingVersion(
+                model=model,
+                dimensions=dimensions,
+                column_name=f"embedding_v{next_id}",
+                status=BUILDING,
+                created_at=datetime.utcnow()
+            )
+            session.add(version)
+            session.flush()
+            session.execute(text(
+                f"ALTER TABLE questions ADD COLUMN IF NOT EXISTS {self._checked(version.column_name)} "
+                f"vector({int(dimensions)})"
+            ))
+            session.commit()
+            logger.info(f"Re-embedding questions into {version.column_name} ({model}, {dimensions} dimensions)")
+            return _as_dict(version)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def pending(self, version: Dict, limit: int) -> List[Tuple[int, str]]:
+        """(id, name) of questions not embedded in the version's column yet, lowest id first"""
+        column = self._checked(version["column_name"])
+        session = self.db_manager.get_session()
+        try:
+            return [tuple(row) for row in session.execute(
+                text(f"SELECT id, name FROM questions WHERE {column} IS NULL ORDER BY id LIMIT :limit"),
+                {"limit": limit}
+            )]
+        finally:
+            session.close()
+
+    def remaining(self, version: Dict) -> int:
+        column = self._checked(version["column_name"])
+        session = self.db_manager.get_session()
+        try:
+            return session.execute(text(f"SELECT count(*) FROM questions WHERE {column} IS NULL")).scalar()
+        finally:
+            session.close()
+
+    def fill(self, version: Dict, rows: List[Tuple[int, str, List[float]]], session: Optional[Session] = None) -> int:
+        """
+        Store vectors for (id, name, vector) rows; a row whose name changed
+        since it was read is skipped (it is picked up again as pending)
+        """
+        if not rows:
+            return 0
+        column = self._checked(version["column_name"])
+        statement = text(
+            f"UPDATE questions SET {column} = :vector WHERE id = :id AND name = :name"
+        ).bindparams(bindparam("vector", type_=Vector(version["dimensions"])))
+
+        own_session = session is None
+        session = session or self.db_manager.get_session()
+        try:
+            result = session.execute(statement, [{"id": i, "name": n, "vector": v} for i, n, v in rows])
+            if own_session:
+                session.commit()
+            return result.rowcount
+        except Exception:
+            if own_session:
+                session.rollback()
+            raise
+        finally:
+            if own_session:
+                session.close()
+
+    def invalidate(self, session: Session, question_ids: List[int]):
+        """Clear the shadow vectors of questions whose text changed, so the re-embedding picks them up again"""
+        if not question_ids:
+            return
+        for version in self.building(session):
+            column = self._checked(version["column_name"])
+            session.execute(
+                text(f"UPDATE questions SET {column} = NULL WHERE id = ANY(:ids)"),
+                {"ids": list(question_ids)}
+            )
+
+    def build_index(self, version: Dict):
+        """HNSW cosine index on the version's column (CONCURRENTLY: search and writes continue)"""
+        column = self._checked(version["column_name"])
+        name = _index_name(column)
+        with self.db_manager.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            valid = connection.execute(
+                text("SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"),
+                {"name": name}
+            ).scalar()
+            if valid:
+                return
+            if valid is not None:
+                # Lần build trước bị gián đoạn để lại index INVALID
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            logger.info(f"Building {name}")
+            connection.execute(text(
+                f"CREATE INDEX CONCURRENTLY {name} ON questions USING hnsw ({column} vector_cosine_ops)"
+            ))
+
+    def activate(self, version: Dict, embed: Callable[[List[str]], List[List[float]]]) -> Dict:
+        """
+        Atomically make the version active and retire the current one
+
+        Question writes are blocked for the flip (reads continue); questions
+        added since the last chunk are embedded inside it, so the new column
+        is complete the moment it becomes active.
+        """
+        column = self._checked(version["column_name"])
+        session = self.db_manager.get_session()
+        try:
+            # Thứ tự khoá giống import (version active rồi mới tới questions) để không deadlock
+            current = session.query(EmbeddingVersion).filter(
+                EmbeddingVersion.status == ACTIVE
+            ).with_for_update().one()
+            target = session.query(EmbeddingVersion).filter(
+                EmbeddingVersion.id == version["id"]
+            ).with_for_update().one()
+            if target.status != BUILDING:
+                raise ValueError(f"Embedding version {target.id} is {target.status}, not {BUILDING}")
+
+            session.execute(text("LOCK TABLE questions IN SHARE ROW EXCLUSIVE MODE"))
+            rows = session.execute(text(f"SELECT id, name FROM questions WHERE {column} IS NULL ORDER BY id")).all()
+            if rows:
+                vectors = embed([name for _, name in rows])
+                self.fill(version, [(i, n, v) for (i, n), v in zip(rows, vectors)], session=session)
+
+            now = datetime.utcnow()
+            current.status, current.retired_at = RETIRED, now
+            session.flush()
+            target.status, target.activated_at = ACTIVE, now
+            session.commit()
+            logger.info(f"Question search switched from {current.column_name} ({current.model}) "
+                        f"to {target.column_name} ({target.model})")
+            return _as_dict(target)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def cleanup(self) -> List[str]:
+        """
+        Free the columns of retired versions: shadow columns are dropped,
+        questions.embedding (mapped by the model) is only emptied
+        """
+        session = self.db_manager.get_session()
+        try:
+            freed = []
+            for version in session.query(EmbeddingVersion).filter(EmbeddingVersion.status == RETIRED):
+                if version.column_name == BASE_COLUMN:
+                    session.execute(text(f"DROP INDEX IF EXISTS {_index_name(BASE_COLUMN)}"))
+                    session.execute(text(f"UPDATE questions SET {BASE_COLUMN} = NULL WHERE {BASE_COLUMN} IS NOT NULL"))
+                else:
+                    self._drop_column(session, version.column_name)
+                freed.append(version.column_name)
+                session.delete(version)
+            session.commit()
+            if freed:
+                logger.info(f"Freed retired embedding columns: {', '.join(freed)}")
+            return freed
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _drop_column(self, session: Session, column: str):
+        session.execute(text(f"ALTER TABLE questions DROP COLUMN IF EXISTS {self._checked(column)}"))
+
+    def _column_exists(self, session: Session, column: str) -> bool:
+        return bool(session.execute(text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = 'questions' AND column_name = :column"
+        ), {"column": column}).scalar())
+
+    def _checked(self, column: str) -> str:
+        # Tên cột được ghép vào SQL: chỉ chấp nhận cột embedding gốc hoặc embedding_v<id>
+        if column != BASE_COLUMN and not SHADOW_COLUMN.match(column):
+            raise ValueError(f"Not an embedding column: {column}")
+        return column
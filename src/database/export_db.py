@@ -0,0 +1,287 @@
+"""
+Streaming bulk export of interview sessions joined with their interactions
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from config.database import (
+    db_manager, INTERACTION_ORDER, REFERENCE_ANSWER_TEXT, InterviewSession, Question, ReferenceAnswer, User, UserInteraction
+)
+from src.utils.logger import logger
+
+
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+# Một dòng = một interaction; session không có interaction vẫn có một dòng (các cột interaction NULL)
+EXPORT_COLUMNS = (
+    "session_id", "session_created_at", "candidate_id", "candidate", "interviewer_id", "interviewer",
+    "position", "overall_result", "average_score", "total_questions", "passed_questions",
+    "interaction_id", "question_index", "question", "answer", "reference_answer",
+    "grading_score", "is_passed", "feedback", "processing_time_ms", "interaction_created_at"
+)
+
+
+def export_rows(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    batch_size: int = 1000
+) -> Iterator[Dict]:
+    """
+    Stream export rows through a server-side cursor
+
+    Args:
+        date_from: Sessions created on or after this day
+        date_to: Sessions created on or before this day (inclusive)
+        batch_size: Rows fetched per round trip (yield_per)
+
+    Memory stays bounded by batch_size whatever the export size. The
+    database session is held until the generator is exhausted or closed.
+    """
+    Candidate = aliased(User)
+    Interviewer = aliased(User)
+
+    query = select(
+        InterviewSession.session_id,
+        InterviewSession.created_at.label("session_created_at"),
+        InterviewSession.candidate_id,
+        Candidate.name.label("candidate"),
+        InterviewSession.interviewer_id,
+        Interviewer.name.label("interviewer"),
+        InterviewSession.position,
+        InterviewSession.overall_result,
+        InterviewSession.average_score,
+        InterviewSession.total_questions,
+        InterviewSession.passed_questions,
+        UserInteraction.id.label("interaction_id"),
+        UserInteraction.question_index,
+        UserInteraction.question_summarized,
+        Question.name.label("question_name"),
+        UserInteraction.answer_original,
+        REFERENCE_ANSWER_TEXT.label("reference_answer"),
+        UserInteraction.grading_score,
+        UserInteraction.is_passed,
+        UserInteraction.feedback,
+        UserInteraction.processing_time_ms,
+        UserInteraction.created_at.label("interaction_created_at")
+    ).join(
+        Candidate, Candidate.id == InterviewSession.candidate_id
+    ).outerjoin(
+        Interviewer, Interviewer.id == InterviewSession.interviewer_id
+    ).outerjoin(
+        UserInteraction, UserInteraction.session_id == InterviewSession.session_id
+    ).outerjoin(
+        Question, Question.id == UserInteraction.question_id
+    ).outerjoin(
+        ReferenceAnswer, ReferenceAnswer.id == UserInteraction.reference_answer_id
+    )
+
+    if date_from:
+        query = query.where(InterviewSession.created_at >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        query = query.where(InterviewSession.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+
+    query = query.order_by(InterviewSession.created_at, InterviewSession.id, *INTERACTION_ORDER)
+
+    session = db_manager.get_read_session()
+    try:
+        # stream_results + yield_per: psycopg2 dùng named cursor, không nạp toàn bộ kết quả vào RAM
+        result = session.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+        for row in result:
+            yield {
+                "session_id": row.session_id,
+                "session_created_at": row.session_created_at,
+                "candidate_id": row.candidate_id,
+                "candidate": row.candidate,
+                "interviewer_id": row.interviewer_id,
+                "interviewer": row.interviewer,
+                "position": row.position,
+                "overall_result": row.overall_result,
+                "average_score": row.average_score,
+                "total_questions": row.total_questions,
+                "passed_questions": row.passed_questions,
+                "interaction_id": row.interaction_id,
+                "question_index": row.question_index,
+                "question": row.question_name or row.question_summarized,
+                "answer": row.answer_original,
+                "reference_answer": row.reference_answer,
+                "grading_score": row.grading_score,
+                "is_passed": row.is_passed,
+                "feedback": row.feedback,
+                "processing_time_ms": row.processing_time_ms,
+                "interaction_created_at": row.interaction_created_at
+            }
+    finally:
+        session.close()
+
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_ndjson(rows: Iterable[Dict], chunk_rows: int = 500) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON, chunk_rows lines per chunk"""
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps({k: _isoformat(v) for k, v in row.items()}, ensure_ascii=False))
+        if len(buffer) >= chunk_rows:
+            yield ("\n".join(buffer) + "\n").encode("utf-8")
+            buffer = []
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode("utf-8")
+
+
+def iter_csv(rows: Iterable[Dict], chunk_rows: int = 500) -> Iterator[bytes]:
+    """Encode rows as CSV with a header line, chunk_rows lines per chunk"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow({k: _isoformat(v) for k, v in row.items()})
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the caller"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _parquet_schema(pa):
+    return pa.schema([
+        ("session_id", pa.string()),
+        ("session_created_at", pa.timestamp("us")),
+        ("candidate_id", pa.int64()),
+        ("candidate", pa.string()),
+        ("interviewer_id", pa.int64()),
+        ("interviewer", pa.string()),
+        ("position", pa.string()),
+        ("overall_result", pa.string()),
+        ("average_score", pa.float64()),
+        ("total_questions", pa.int64()),
+        ("passed_questions", pa.int64()),
+        ("interaction_id", pa.int64()),
+        ("question_index", pa.int64()),
+        ("question", pa.string()),
+        ("answer", pa.string()),
+        ("reference_answer", pa.string()),
+        ("grading_score", pa.float64()),
+        ("is_passed", pa.bool_()),
+        ("feedback", pa.string()),
+        ("processing_time_ms", pa.int64()),
+        ("interaction_created_at", pa.timestamp("us"))
+    ])
+
+
+def iter_parquet(rows: Iterable[Dict], row_group_size: int = 10000) -> Iterator[bytes]:
+    """
+    Encode rows as a Parquet file, one row group per row_group_size rows
+
+    Each row group is yielded as soon as it is written, so only one row
+    group is held in memory. Requires pyarrow.
+
+    Raises:
+        RuntimeError: If pyarrow is not installed (raised here, before streaming starts)
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)") from e
+
+    return _parquet_chunks(pa, pq, rows, row_group_size)
+
+
+def _parquet_chunks(pa, pq, rows: Iterable[Dict], row_group_size: int) -> Iterator[bytes]:
+    schema = _parquet_schema(pa)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+
+    def flush_batch(batch):
+        columns = {name: [row[name] for row in batch] for name in EXPORT_COLUMNS}
+        writer.write_table(pa.Table.from_pydict(columns, schema=schema), row_group_size=row_group_size)
+        return sink.drain()
+
+    try:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= row_group_size:
+                yield flush_batch(batch)
+                batch = []
+        if batch:
+            yield flush_batch(batch)
+    finally:
+        # Footer của Parquet chỉ được ghi khi close
+        writer.close()
+    yield sink.drain()
+
+
+def iter_export(
+    fmt: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    batch_size: int = 1000
+) -> Iterator[bytes]:
+    """
+    Stream an export in the given format as byte chunks
+
+    Raises:
+        ValueError: If the format is unknown or date_from is after date_to
+        RuntimeError: If Parquet is requested without pyarrow installed
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})")
+    if date_from and date_to and date_from > date_to:
+        raise ValueError("date_from must not be after date_to")
+
+    logger.info(f"Exporting interviews as {fmt} (from={date_from}, to={date_to})")
+    rows = export_rows(date_from, date_to, batch_size=batch_size)
+    if fmt == "ndjson":
+        return iter_ndjson(rows)
+    if fmt == "csv":
+        return iter_csv(rows)
+    return iter_parquet(rows, row_group_size=max(batch_size, 10000))
@@ -1,8 +1,11 @@
+import hashlib
 from typing import Dict, List, Optional
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
-from config.database import db_manager, Question, UserInteraction
+from config.database import db_manager, INTERACTION_ORDER, Question, ReferenceAnswer, UserInteraction
+from src.database.question_db import question_hash
 from src.utils.logger import logger
 
 class InterviewDatabase:
@@ -10,7 +13,7 @@ class InterviewDatabase:
         self.db_manager = db_manager
     
     def get_all_questions(self) -> List[Dict]:
-        session: Session = self.db_manager.get_session()
+        session: Session = self.db_manager.get_read_session()
         
         try:
             questions = session.query(Question).all()
@@ -28,7 +31,7 @@ class InterviewDatabase:
             session.close()
     
     def get_question_by_id(self, question_id: int) -> Optional[Dict]:
-        session: Session = self.db_manager.get_session()
+        session: Session = self.db_manager.get_read_session()
         
         try:
             question = session.query(Question).filter(Question.id == question_id).first()
@@ -50,6 +53,7 @@ class InterviewDatabase:
         try:
             question = Question(
                 name=name,
+                content_hash=question_hash(name),
                 answer=answer,
                 category=category,
                 level=level
@@ -80,22 +84,37 @@ class InterviewDatabase:
         grading_score: int = None,
         feedback: str = None,
         session_id: str = None,
-        processing_time_ms: int = None
+        processing_time_ms: int = None,
+        question_index: int = None,
+        answer_source: str = None
     ) -> int:
+        """
+        Save one graded answer
+        
+        The reference answer is not stored inline: with answer_source
+        'database' it is questions.answer itself, otherwise the text goes to
+        reference_answers once per distinct content and is referenced by id.
+        """
         session: Session = self.db_manager.get_session()
         
         try:
+            reference_answer_id = None
+            if final_answer and not (answer_source == "database" and question_id):
+                reference_answer_id = self._reference_answer_id(session, final_answer)
+            
             interaction = UserInteraction(
                 candidate_id=candidate_id,
                 interviewer_id=interviewer_id,
                 question_id=question_id,
                 question_summarized=question_summarized,
                 answer_original=answer_original,
-                final_answer=final_answer,
+                answer_source=answer_source,
+                reference_answer_id=reference_answer_id,
                 is_passed=is_passed,
                 grading_score=grading_score,
                 feedback=feedback,
                 session_id=session_id,
+                question_index=question_index,
                 processing_time_ms=processing_time_ms
             )
             
@@ -113,9 +132,44 @@ class InterviewDatabase:
         finally:
             session.close()
     
-    def get_user_interactions(self, candidate_id: int) -> List[Dict]:
+    def _reference_answer_id(self, session: Session, answer: str) -> int:
+        """Id of the stored reference answer with this text, inserted if new (same transaction)"""
+        content_hash = hashlib.sha256(answer.encode("utf-8")).hexdigest()
+        # DO UPDATE (không đổi gì) để RETURNING luôn trả về id, kể cả khi dòng đã có
+        stmt = insert(ReferenceAnswer).values(content_hash=content_hash, answer=answer)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ReferenceAnswer.content_hash],
+            set_={"content_hash": stmt.excluded.content_hash}
+        ).returning(ReferenceAnswer.id)
+        return session.execute(stmt).scalar_one()
+    
+    def delete_session_interactions(self, session_id: str, keep_ids: List[int] = None) -> int:
+        """Delete interactions of a session, except keep_ids (rows left by an interrupted run)"""
         session: Session = self.db_manager.get_session()
         
+        try:
+            query = session.query(UserInteraction).filter(
+                UserInteraction.session_id == session_id
+            )
+            if keep_ids:
+                query = query.filter(UserInteraction.id.notin_(keep_ids))
+            deleted = query.delete(synchronize_session=False)
+            session.commit()
+            
+            if deleted:
+                logger.info(f"Deleted {deleted} stale interactions of session {session_id}")
+            return deleted
+            
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error deleting session interactions: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def get_user_interactions(self, candidate_id: int) -> List[Dict]:
+        session: Session = self.db_manager.get_read_session()
+        
         try:
             interactions = session.query(UserInteraction).filter(
                 UserInteraction.candidate_id == candidate_id
@@ -137,12 +191,12 @@ class InterviewDatabase:
             session.close()
     
     def get_session_interactions(self, session_id: str) -> List[Dict]:
-        session: Session = self.db_manager.get_session()
+        session: Session = self.db_manager.get_read_session()
         
         try:
             interactions = session.query(UserInteraction).filter(
                 UserInteraction.session_id == session_id
-            ).order_by(UserInteraction.created_at).all()
+            ).order_by(*INTERACTION_ORDER).all()
             
             return [
                 {
@@ -157,38 +211,46 @@ class InterviewDatabase:
             session.close()
     
     def get_statistics(self) -> Dict:
-        session: Session = self.db_manager.get_session()
+        """
+        Statistics over every saved interaction (one aggregate query)
+        
+        Includes sessions whose summary is not saved yet; the dashboard
+        counters of /api/v1/stats (interview_stats) only count saved sessions.
+        """
+        session: Session = self.db_manager.get_read_session()
         
         try:
-            total_questions = session.query(Question).count()
-            total_interactions = session.query(UserInteraction).count()
-            total_users = session.query(func.count(func.distinct(UserInteraction.candidate_id))).scalar()
-            passed_count = session.query(UserInteraction).filter(
-                UserInteraction.is_passed == True
-            ).count()
-            
-            avg_score = session.query(func.avg(UserInteraction.grading_score)).scalar() or 0
+            total_questions = session.query(func.count(Question.id)).scalar()
+            row = session.query(
+                func.count(UserInteraction.id).label("total"),
+                func.count(func.distinct(UserInteraction.candidate_id)).label("users"),
+                func.count(UserInteraction.id).filter(UserInteraction.is_passed.is_(True)).label("passed"),
+                func.avg(UserInteraction.grading_score).label("avg_score")
+            ).one()
             
             return {
                 "total_questions": total_questions,
-                "total_interactions": total_interactions,
-                "total_users": total_users,
-                "passed_count": passed_count,
-                "pass_rate": passed_count / total_interactions if total_interactions > 0 else 0,
-                "average_score": round(float(avg_score), 2)
+                "total_interactions": row.total,
+                "total_users": row.users,
+                "passed_count": row.passed,
+                "pass_rate": row.passed / row.total if row.total > 0 else 0,
+                "average_score": round(float(row.avg_score or 0), 2)
             }
         finally:
             session.close()
     
     def get_user_statistics(self, candidate_id: int) -> Dict:
-        session: Session = self.db_manager.get_session()
+        """Candidate statistics over all of their interactions, aggregated in SQL"""
+        session: Session = self.db_manager.get_read_session()
         
         try:
-            interactions = session.query(UserInteraction).filter(
-                UserInteraction.candidate_id == candidate_id
-            ).all()
+            row = session.query(
+                func.count(UserInteraction.id).label("total"),
+                func.count(UserInteraction.id).filter(UserInteraction.is_passed.is_(True)).label("passed"),
+                func.avg(UserInteraction.grading_score).label("avg_score")
+            ).filter(UserInteraction.candidate_id == candidate_id).one()
             
-            if not interactions:
+            if not row.total:
                 return {
                     "candidate_id": candidate_id,
                     "total_questions": 0,
@@ -197,23 +259,18 @@ class InterviewDatabase:
                     "average_score": 0
                 }
             
-            total = len(interactions)
-            passed = sum(1 for i in interactions if i.is_passed)
-            scores = [i.grading_score for i in interactions if i.grading_score is not None]
-            avg_score = sum(scores) / len(scores) if scores else 0
-            
             return {
                 "candidate_id": candidate_id,
-                "total_questions": total,
-                "passed_count": passed,
-                "pass_rate": passed / total,
-                "average_score": round(avg_score, 2)
+                "total_questions": row.total,
+                "passed_count": row.passed,
+                "pass_rate": row.passed / row.total,
+                "average_score": round(float(row.avg_score or 0), 2)
             }
         finally:
             session.close()
 
     def get_question_answer(self, question_id: int) -> str:
-        session = self.db_manager.get_session()
+        session = self.db_manager.get_read_session()
         
         try:
             from config.database import Question
@@ -0,0 +1,400 @@
+"""
+Database operations for the durable processing job queue
+"""
+import math
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from config.database import db_manager, ProcessingJob
+from config.settings import settings
+from src.utils.logger import logger
+
+
+# Dùng giờ UTC của DB để mọi node có cùng đồng hồ
+DB_UTC_NOW = "(now() AT TIME ZONE 'utc')"
+
+# Priority lanes (số nhỏ được claim trước)
+PRIORITY_LEVELS = {"interactive": 0, "background": 1}
+PRIORITY_NAMES = {level: name for name, level in PRIORITY_LEVELS.items()}
+
+# Ước tính khi chưa có job nào hoàn tất
+DEFAULT_JOB_SECONDS = 180.0
+
+
+class JobQueueDatabase:
+    """Database operations for processing_jobs"""
+
+    def __init__(self):
+        self.db_manager = db_manager
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: Dict,
+        idempotency_key: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        priority: str = "background"
+    ) -> str:
+        """
+        Enqueue a job. A job with the same idempotency key is only queued once.
+
+        Returns:
+            job_id of the new job, or of the existing job with the same key
+        """
+        session: Session = self.db_manager.get_session()
+
+        try:
+            stmt = insert(ProcessingJob).values(
+                job_id=uuid.uuid4().hex,
+                job_type=job_type,
+                payload=payload,
+                idempotency_key=idempotency_key,
+                status='queued',
+                priority=PRIORITY_LEVELS[priority],
+                attempts=0,
+                max_attempts=max_attempts or settings.job_max_attempts,
+                available_at=datetime.utcnow()
+            ).on_conflict_do_nothing(
+                index_elements=['idempotency_key']
+            ).returning(ProcessingJob.job_id)
+
+            job_id = session.execute(stmt).scalar()
+            if job_id is None:
+                job_id = session.query(ProcessingJob.job_id).filter(
+                    ProcessingJob.idempotency_key == idempotency_key
+                ).scalar()
+                logger.info(f"Job with key {idempotency_key} already exists: {job_id}")
+            else:
+                logger.info(f"Enqueued {job_type} job {job_id}")
+
+            session.commit()
+            return job_id
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error enqueueing job: {e}", exc_info=True)
+            raise
+        finally:
+            session.close()
+
+    def claim(
+        self,
+        job_types: List[str],
+        worker_id: str,
+        lease_seconds: int = None,
+        priorities: Optional[List[str]] = None
+    ) -> Optional[Dict]:
+        """
+        Claim the next available job with FOR UPDATE SKIP LOCKED
+
+        Higher-priority lanes are claimed first; `priorities` restricts the
+        worker to the given lanes (dedicated capacity per lane).
+        Jobs whose lease expired (worker died without finishing) are reclaimed.
+        A reclaimed job that has used up its attempts is dead-lettered instead.
+        """
+        lease_seconds = lease_seconds or settings.job_lease_seconds
+        levels = [PRIORITY_LEVELS[p] for p in (priorities or PRIORITY_LEVELS)]
+        session: Session = self.db_manager.get_session()
+
+        try:
+            row = session.execute(
+                text(f"""
+                    UPDATE processing_jobs
+                    SET status = 'running',
+                        attempts = attempts + 1,
+                        worker_id = :worker_id,
+                        heartbeat_at = {DB_UTC_NOW},
+                        started_at = {DB_UTC_NOW},
+                        lease_expires_at = {DB_UTC_NOW} + make_interval(secs => :lease_seconds),
+                        updated_at = {DB_UTC_NOW}
+                    WHERE id = (
+                        SELECT id FROM processing_jobs
+                        WHERE job_type = ANY(:job_types)
+                          AND priority = ANY(:levels)
+                          AND (
+                            (status = 'queued' AND available_at <= {DB_UTC_NOW})
+                            OR (status = 'running' AND lease_expires_at < {DB_UTC_NOW})
+                          )
+                        ORDER BY priority, available_at, id
+                        LIMIT 1
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING job_id, job_type, payload, priority, attempts, max_attempts, idempotency_key
+                """),
+                {
+                    "worker_id": worker_id,
+                    "lease_seconds": lease_seconds,
+                    "job_types": list(job_types),
+                    "levels": levels
+                }
+            ).mappings().first()
+
+            if row is None:
+                session.commit()
+                return None
+
+            if row["attempts"] > row["max_attempts"]:
+                self._dead_letter(session, row["job_id"], "Lease expired after final attempt")
+                session.commit()
+                return None
+
+            session.commit()
+            logger.info(f"Worker {worker_id} claimed {row['job_type']} job {row['job_id']} (attempt {row['attempts']})")
+            job = dict(row)
+            job["priority"] = PRIORITY_NAMES.get(job["priority"], "background")
+            return job
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error claiming job: {e}", exc_info=True)
+            raise
+        finally:
+            session.close()
+
+    def heartbeat(
+        self,
+        job_id: str,
+        worker_id: str,
+        lease_seconds: int = None,
+        stage: Optional[str] = None,
+        progress: Optional[float] = None
+    ) -> bool:
+        """
+        Extend the lease of a running job and record its progress
+
+        Returns:
+            False if the worker no longer holds the lease
+        """
+        lease_seconds = lease_seconds or settings.job_lease_seconds
+        session: Session = self.db_manager.get_session()
+
+        try:
+            updated = session.execute(
+                text(f"""
+                    UPDATE processing_jobs
+                    SET heartbeat_at = {DB_UTC_NOW},
+                        lease_expires_at = {DB_UTC_NOW} + make_interval(secs => :lease_seconds),
+                        stage = COALESCE(:stage, stage),
+                        progress = COALESCE(:progress, progress),
+                        updated_at = {DB_UTC_NOW}
+                    WHERE job_id = :job_id AND worker_id = :worker_id AND status = 'running'
+                """),
+                {
+                    "job_id": job_id,
+                    "worker_id": worker_id,
+                    "lease_seconds": lease_seconds,
+                    "stage": stage,
+                    "progress": progress
+                }
+            ).rowcount
+            session.commit()
+            return updated == 1
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error sending heartbeat for job {job_id}: {e}")
+            return False
+        finally:
+            session.close()
+
+    def complete(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        """Mark a job as succeeded"""
+        session: Session = self.db_manager.get_session()
+
+        try:
+            updated = session.query(ProcessingJob).filter(
+                ProcessingJob.job_id == job_id,
+                ProcessingJob.worker_id == worker_id,
+                ProcessingJob.status == 'running'
+            ).update({
+                ProcessingJob.status: 'succeeded',
+                ProcessingJob.stage: 'done',
+                ProcessingJob.progress: 1.0,
+                ProcessingJob.result: result,
+                ProcessingJob.lease_expires_at: None,
+                ProcessingJob.finished_at: datetime.utcnow()
+            }, synchronize_session=False)
+            session.commit()
+
+            if not updated:
+                logger.warning(f"Job {job_id} completed by {worker_id} after losing its lease")
+            return updated == 1
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error completing job {job_id}: {e}", exc_info=True)
+            raise
+        finally:
+            session.close()
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> str:
+        """
+        Record a failed attempt: retry with exponential backoff, or
+        dead-letter the job once max_attempts is reached
+
+        Returns:
+            New status ('queued' or 'dead')
+        """
+        session: Session = self.db_manager.get_session()
+
+        try:
+            job = session.query(ProcessingJob).filter(
+                ProcessingJob.job_id == job_id,
+                ProcessingJob.worker_id == worker_id,
+                ProcessingJob.status == 'running'
+            ).with_for_update().first()
+
+            if not job:
+                session.rollback()
+                logger.warning(f"Job {job_id} failed on {worker_id} after losing its lease")
+                return 'lost'
+
+            if job.attempts >= job.max_attempts:
+                self._dead_letter(session, job_id, error)
+                session.commit()
+                return 'dead'
+
+            delay = self._backoff_seconds(job.attempts)
+            job.status = 'queued'
+            job.last_error = error
+            job.worker_id = None
+            job.lease_expires_at = None
+            job.available_at = datetime.utcnow() + timedelta(seconds=delay)
+            session.commit()
+
+            logger.warning(f"Job {job_id} attempt {job.attempts} failed, retrying in {delay:.0f}s: {error}")
+            return 'queued'
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error failing job {job_id}: {e}", exc_info=True)
+            raise
+        finally:
+            session.close()
+
+    def requeue(self, job_id: str) -> bool:
+        """Move a dead-lettered job back to the queue with fresh attempts"""
+        session: Session = self.db_manager.get_session()
+
+        try:
+            updated = session.query(ProcessingJob).filter(
+                ProcessingJob.job_id == job_id,
+                ProcessingJob.status == 'dead'
+            ).update({
+                ProcessingJob.status: 'queued',
+                ProcessingJob.attempts: 0,
+                ProcessingJob.available_at: datetime.utcnow(),
+                ProcessingJob.finished_at: None
+            }, synchronize_session=False)
+            session.commit()
+            return updated == 1
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error requeueing job {job_id}: {e}", exc_info=True)
+            raise
+        finally:
+            session.close()
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Get job status by job_id"""
+        session: Session = self.db_manager.get_session()
+
+        try:
+            job = session.query(ProcessingJob).filter(
+                ProcessingJob.job_id == job_id
+            ).first()
+
+            if not job:
+                return None
+
+            status = {
+                "job_id": job.job_id,
+                "job_type": job.job_type,
+                "priority": PRIORITY_NAMES.get(job.priority, "background"),
+                "status": job.status,
+                "stage": job.stage or job.status,
+                "progress": job.progress or 0.0,
+                "attempts": job.attempts,
+                "max_attempts": job.max_attempts,
+                "result": job.result,
+                "error": job.last_error,
+                "created_at": job.created_at.isoformat() if job.created_at else None,
+                "available_at": job.available_at.isoformat() if job.available_at else None,
+                "finished_at": job.finished_at.isoformat() if job.finished_at else None
+            }
+
+            if job.status == 'queued':
+                position = self._queue_position(session, job)
+                status["queue_position"] = position
+                status["estimated_wait_seconds"] = self._estimate_wait(session, job, position)
+
+            return status
+        finally:
+            session.close()
+
+    def _queue_position(self, session: Session, job: ProcessingJob) -> int:
+        """1-based position among queued jobs of the same type, in claim order"""
+        ahead = session.execute(
+            text("""
+                SELECT count(*) FROM processing_jobs
+                WHERE job_type = :job_type
+                  AND status = 'queued'
+                  AND (priority < :priority
+                       OR (priority = :priority AND (available_at, id) < (:available_at, :id)))
+            """),
+            {
+                "job_type": job.job_type,
+                "priority": job.priority,
+                "available_at": job.available_at,
+                "id": job.id
+            }
+        ).scalar()
+        return ahead + 1
+
+    def _estimate_wait(self, session: Session, job: ProcessingJob, position: int) -> int:
+        """Queue position x recent average duration / current concurrency"""
+        stats = session.execute(
+            text(f"""
+                SELECT
+                    (SELECT avg(extract(epoch FROM finished_at - started_at)) FROM (
+                        SELECT finished_at, started_at FROM processing_jobs
+                        WHERE job_type = :job_type AND status = 'succeeded' AND started_at IS NOT NULL
+                        ORDER BY finished_at DESC
+                        LIMIT 50
+                    ) recent) AS avg_seconds,
+                    (SELECT count(*) FROM processing_jobs
+                     WHERE job_type = :job_type AND status = 'running') AS running,
+                    extract(epoch FROM :available_at - {DB_UTC_NOW}) AS backoff_seconds
+            """),
+            {"job_type": job.job_type, "available_at": job.available_at}
+        ).mappings().first()
+
+        avg_seconds = float(stats["avg_seconds"] or DEFAULT_JOB_SECONDS)
+        concurrency = max(stats["running"], 1)
+        estimate = math.ceil(position / concurrency) * avg_seconds
+        return int(max(estimate, float(stats["backoff_seconds"] or 0)))
+
+    def _dead_letter(self, session: Session, job_id: str, error: str):
+        session.query(ProcessingJob).filter(
+            ProcessingJob.job_id == job_id
+        ).update({
+            ProcessingJob.status: 'dead',
+            ProcessingJob.last_error: error,
+            ProcessingJob.lease_expires_at: None,
+            ProcessingJob.finished_at: datetime.utcnow()
+        }, synchronize_session=False)
+        logger.error(f"Job {job_id} moved to dead letter: {error}")
+
+    @staticmethod
+    def _backoff_seconds(attempts: int) -> float:
+        delay = settings.job_retry_base_seconds * (2 ** max(attempts - 1, 0))
+        delay = min(delay, settings.job_retry_max_seconds)
+        # Jitter để các worker không retry đồng loạt
+        return delay * random.uniform(0.8, 1.2)
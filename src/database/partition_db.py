@@ -0,0 +1,129 @@
+"""
+Monthly partitions of user_interactions: creation, retention and archival
+"""
+import gzip
+import json
+import os
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from sqlalchemy import text
+
+from config.database import db_manager
+from src.utils.logger import logger
+
+
+PARENT_TABLE = "user_interactions"
+PARTITION_NAME = re.compile(r"^user_interactions_(\d{4})_(\d{2})$")
+PARTITION_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def month_start(value: date, months_back: int = 0) -> date:
+    """First day of the month `months_back` months before value"""
+    index = value.year * 12 + value.month - 1 - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class InteractionPartitionDatabase:
+    """Maintenance of the monthly user_interactions partitions"""
+
+    def __init__(self):
+        self.db_manager = db_manager
+
+    def is_partitioned(self) -> bool:
+        with self.db_manager.engine.connect() as connection:
+            return bool(connection.execute(text(
+                "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"
+            ), {"table": PARENT_TABLE}).scalar())
+
+    def ensure(self, months_ahead: int = 3) -> int:
+        """Create missing partitions up to months_ahead; returns how many were created"""
+        with self.db_manager.engine.begin() as connection:
+            created = connection.execute(
+                text("SELECT ensure_user_interaction_partitions(now()::date, :ahead)"),
+                {"ahead": months_ahead}
+            ).scalar()
+        if created:
+            logger.info(f"Created {created} user_interactions partitions")
+        return created
+
+    def list_partitions(self) -> List[Dict]:
+        """Attached monthly partitions, oldest first (the DEFAULT partition is not included)"""
+        with self.db_manager.engine.connect() as connection:
+            rows = connection.execute(text(
+                "SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound, "
+                "c.reltuples::bigint AS estimated_rows, pg_total_relation_size(c.oid) AS size_bytes "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+            ), {"table": PARENT_TABLE}).all()
+
+        partitions = []
+        for row in rows:
+            bounds = PARTITION_BOUNDS.search(row.bound or "")
+            if not bounds:
+                continue
+            partitions.append({
+                "name": row.name,
+                "start": datetime.fromisoformat(bounds.group(1)).date(),
+                "end": datetime.fromisoformat(bounds.group(2)).date(),
+                "estimated_rows": max(row.estimated_rows, 0),
+                "size_bytes": row.size_bytes
+            })
+        return partitions
+
+    def expired(self, retention_months: int, today: Optional[date] = None) -> List[Dict]:
+        """Partitions whose whole month is older than the retention window"""
+        cutoff = month_start(today or date.today(), retention_months)
+        return [p for p in self.list_partitions() if p["end"] <= cutoff]
+
+    def detach(self, name: str):
+        """
+        Detach a partition; it stays queryable as a standalone table
+
+        The column default is dropped so the detached table no longer
+        depends on the parent's id sequence.
+        """
+        self._check_name(name)
+        with self.db_manager.engine.begin() as connection:
+            connection.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+            connection.execute(text(f'ALTER TABLE "{name}" ALTER COLUMN id DROP DEFAULT'))
+        logger.info(f"Detached partition {name}")
+
+    def archive(self, name: str, directory: str, batch_size: int = 5000) -> Dict:
+        """
+        Write a partition to <directory>/<name>.ndjson.gz, then detach and drop it
+
+        Rows are streamed with a server-side cursor; the file is written under
+        a temporary name and only renamed once complete, and the partition is
+        dropped only after that.
+
+        Returns:
+            {"path": ..., "rows": ...}
+        """
+        self._check_name(name)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.ndjson.gz")
+        temporary = f"{path}.tmp"
+
+        rows = 0
+        with self.db_manager.engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(
+                text(f'SELECT * FROM "{name}" ORDER BY id')
+            )
+            with gzip.open(temporary, "wt", encoding="utf-8") as output:
+                for row in result.mappings():
+                    output.write(json.dumps(dict(row), ensure_ascii=False, default=str) + "\n")
+                    rows += 1
+        os.replace(temporary, path)
+
+        with self.db_manager.engine.begin() as connection:
+            connection.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+            connection.execute(text(f'DROP TABLE "{name}"'))
+
+        logger.info(f"Archived partition {name}: {rows} rows -> {path}")
+        return {"path": path, "rows": rows}
+
+    def _check_name(self, name: str):
+        # Tên được ghép vào DDL: chỉ chấp nhận partition tháng
+        if not PARTITION_NAME.match(name):
+            raise ValueError(f"Not a monthly user_interactions partition: {name}")
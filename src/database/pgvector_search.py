@@ -1,3 +1,5 @@
+import threading
+import time
 from typing import List, Tuple, Optional, Dict
 from sqlalchemy.orm import Session
 from sqlalchemy import text
@@ -5,19 +7,56 @@ from langchain_community.embeddings import HuggingFaceEmbeddings
 
 from config.database import db_manager, Question
 from config.settings import settings
+from src.database.embedding_db import EmbeddingVersionDatabase
 from src.utils.logger import logger
 
 
+_embedding_models: Dict[str, HuggingFaceEmbeddings] = {}
+_embedding_models_lock = threading.Lock()
+
+
+def get_embeddings(model_name: str) -> HuggingFaceEmbeddings:
+    """HuggingFaceEmbeddings for model_name, loaded once per process"""
+    with _embedding_models_lock:
+        if model_name not in _embedding_models:
+            _embedding_models[model_name] = HuggingFaceEmbeddings(model_name=model_name)
+        return _embedding_models[model_name]
+
+
 class PgVectorSearch:
-    """Search questions using pgvector in PostgreSQL"""
+    """
+    Search questions using pgvector in PostgreSQL
+    
+    Queries are embedded with the model of the active embedding version and
+    matched against its column. The version is re-read every
+    settings.embedding_version_check_seconds, so a re-embedding flip
+    (scripts.reembed_questions) is picked up without a restart.
+    """
     
     def __init__(self):
         self.db_manager = db_manager
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=settings.embedding_model
-        )
+        self.versions = EmbeddingVersionDatabase()
+        self._version = None
+        self._version_checked = 0.0
+        self._refresh_version()
         logger.info("PgVector search initialized")
     
+    def _refresh_version(self) -> Dict:
+        if self._version is None or time.monotonic() - self._version_checked >= settings.embedding_version_check_seconds:
+            version = self.versions.active()
+            if self._version is None or version["id"] != self._version["id"]:
+                logger.info(f"Question search uses {version['column_name']} ({version['model']})")
+                if version["model"] != settings.embedding_model:
+                    # Đang re-embed sang model mới: tiếp tục dùng model cũ tới khi flip
+                    logger.warning(
+                        f"EMBEDDING_MODEL is {settings.embedding_model} but questions are embedded with "
+                        f"{version['model']}; run python -m scripts.reembed_questions"
+                    )
+                self.embeddings = get_embeddings(version["model"])
+            self._version = version
+            self._version_checked = time.monotonic()
+        return self._version
+    
     def search_similar_questions(
         self, 
         query_text: str, 
@@ -41,6 +80,9 @@ class PgVectorSearch:
         session: Session = self.db_manager.get_session()
         
         try:
+            version = self._refresh_version()
+            column = version["column_name"]
+            
             # Generate embedding for query
             query_embedding = self.embeddings.embed_query(query_text)
             
@@ -51,6 +93,7 @@ class PgVectorSearch:
             # pgvector's <=> operator returns cosine distance (0 = identical, 2 = opposite)
             # We convert to similarity: 1 - (distance / 2)
             # Note: Using string formatting for vector literal to avoid SQLAlchemy binding issues
+            # (tên cột lấy từ embedding_versions, EmbeddingVersionDatabase chỉ tạo embedding / embedding_v<id>)
             query_sql = f"""
                 SELECT 
                     id,
@@ -58,10 +101,10 @@ class PgVectorSearch:
                     answer,
                     category,
                     level,
-                    1 - (embedding <=> '{embedding_str}'::vector) AS similarity
+                    1 - ({column} <=> '{embedding_str}'::vector) AS similarity
                 FROM questions
-                WHERE embedding IS NOT NULL
-                ORDER BY embedding <=> '{embedding_str}'::vector
+                WHERE {column} IS NOT NULL
+                ORDER BY {column} <=> '{embedding_str}'::vector
                 LIMIT :k
             """
             
@@ -1,97 +1,254 @@
 import json
+import sqlite3
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 import os
 
 from config.settings import settings
 from src.utils.logger import logger
 
+
+QA_COLUMNS = ("id", "question", "answer", "reference_answer", "matched_question", "timestamp")
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS qa_pairs (
+        id INTEGER PRIMARY KEY,
+        question TEXT NOT NULL,
+        answer TEXT NOT NULL,
+        reference_answer TEXT,
+        matched_question TEXT,
+        timestamp TEXT NOT NULL,
+        extra TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scores (
+        id INTEGER PRIMARY KEY,
+        question_id INTEGER NOT NULL,
+        score INTEGER,
+        passed INTEGER NOT NULL,
+        timestamp TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS metadata (
+        id INTEGER PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        data TEXT NOT NULL
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT)",
+)
+
+
 class QADatabase:
-    def __init__(self, db_path: str = None):
-        self.db_path = db_path or settings.database_path
-        self.data = self._load_or_create_db()
-    
-    def _load_or_create_db(self) -> Dict:
+    """
+    Lightweight local Q&A store on SQLite (WAL mode)
+
+    Every save is a single-row INSERT (O(1), the file is never rewritten).
+    Readers get their own connection, so streaming a large store with
+    iter_qa_pairs() does not block writers. The WAL is checkpointed every
+    `checkpoint_every` writes; compact() also reclaims free pages.
+    """
+
+    def __init__(self, db_path: str = None, checkpoint_every: int = 1000):
+        self.db_path = db_path or settings.qa_database_path
+        self.checkpoint_every = checkpoint_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection = self._load_or_create_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: autocommit, mỗi INSERT là một transaction
+        connection = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA busy_timeout = 5000")
+        return connection
+
+    def _load_or_create_db(self) -> sqlite3.Connection:
         try:
-            if os.path.exists(self.db_path):
-                with open(self.db_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                logger.info("Loaded existing database")
-                return data
-            else:
-                data = {
-                    "qa_pairs": [],
-                    "scores": [],
-                    "metadata": [],
-                    "created_at": datetime.now().isoformat()
-                }
-                self._save_db(data)
-                logger.info("Created new database")
-                return data
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            exists = os.path.exists(self.db_path)
+
+            connection = self._connect()
+            if not exists:
+                # Phải đặt trước khi tạo bảng
+                connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("PRAGMA journal_mode = WAL")
+            # WAL + NORMAL: không fsync mỗi commit, vẫn không hỏng file khi crash
+            connection.execute("PRAGMA synchronous = NORMAL")
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.execute(
+                "INSERT OR IGNORE INTO info (key, value) VALUES ('created_at', ?)",
+                (datetime.now().isoformat(),)
+            )
+
+            logger.info(f"{'Loaded existing' if exists else 'Created new'} database {self.db_path}")
+            return connection
         except Exception as e:
             logger.error(f"Error loading database: {e}")
             raise
-    
-    def _save_db(self, data: Dict = None):
-        data = data or self.data
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        with open(self.db_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    
+
+    def _insert(self, statement: str, params: tuple) -> int:
+        with self._lock:
+            row_id = self._connection.execute(statement, params).lastrowid
+            self._writes += 1
+            if self.checkpoint_every and self._writes % self.checkpoint_every == 0:
+                # Giữ file -wal nhỏ khi có reader giữ snapshot lâu (auto-checkpoint bị chặn)
+                self._connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        return row_id
+
     def save_qa_pair(
-        self, 
+        self,
         question: str,
-        answer: str, 
+        answer: str,
         reference_answer: Optional[str] = None,
         matched_question: Optional[str] = None,
         metadata: Optional[Dict] = None
     ) -> int:
-        qa_id = len(self.data["qa_pairs"]) + 1
-        self.data["qa_pairs"].append({
-            "id": qa_id,
-            "question": question,
-            "answer": answer,
-            "reference_answer": reference_answer,
-            "matched_question": matched_question,
-            "timestamp": datetime.now().isoformat(),
-            **(metadata or {})
-        })
-        self._save_db()
+        qa_id = self._insert(
+            "INSERT INTO qa_pairs (question, answer, reference_answer, matched_question, timestamp, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                question,
+                answer,
+                reference_answer,
+                matched_question,
+                datetime.now().isoformat(),
+                json.dumps(metadata, ensure_ascii=False) if metadata else None
+            )
+        )
         logger.info(f"Saved Q&A pair #{qa_id}: {question[:50]}...")
         return qa_id
-    
+
     def save_score(self, question_id: int, score: int, passed: bool):
         """Lưu điểm đánh giá"""
-        self.data["scores"].append({
-            "question_id": question_id,
-            "score": score,
-            "passed": passed,
-            "timestamp": datetime.now().isoformat()
-        })
-        self._save_db()
+        self._insert(
+            "INSERT INTO scores (question_id, score, passed, timestamp) VALUES (?, ?, ?, ?)",
+            (question_id, score, int(bool(passed)), datetime.now().isoformat())
+        )
         logger.info(f"Saved score for question #{question_id}: {score}")
-    
+
     def save_metadata(self, metadata: Dict):
         """Lưu metadata"""
-        self.data["metadata"].append({
-            "timestamp": datetime.now().isoformat(),
-            **metadata
-        })
-        self._save_db()
-    
+        self._insert(
+            "INSERT INTO metadata (timestamp, data) VALUES (?, ?)",
+            (datetime.now().isoformat(), json.dumps(metadata, ensure_ascii=False))
+        )
+
+    def iter_qa_pairs(self, batch_size: int = 500) -> Iterator[Dict]:
+        """Stream Q&A pairs in id order, batch_size rows in memory at a time"""
+        connection = self._connect()
+        try:
+            cursor = connection.execute(f"SELECT {', '.join(QA_COLUMNS)}, extra FROM qa_pairs ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    qa_pair = {column: row[column] for column in QA_COLUMNS}
+                    if row["extra"]:
+                        qa_pair.update(json.loads(row["extra"]))
+                    yield qa_pair
+        finally:
+            connection.close()
+
     def get_all_qa_pairs(self) -> List[Dict]:
-        """Lấy tất cả Q&A pairs"""
-        return self.data["qa_pairs"]
-    
+        """Lấy tất cả Q&A pairs (store lớn: dùng iter_qa_pairs)"""
+        return list(self.iter_qa_pairs())
+
     def get_statistics(self) -> Dict:
         """Lấy thống kê"""
-        total_qa = len(self.data["qa_pairs"])
-        total_scores = len(self.data["scores"])
-        passed_count = sum(1 for s in self.data["scores"] if s["passed"])
-        
+        with self._lock:
+            total_qa = self._connection.execute("SELECT count(*) FROM qa_pairs").fetchone()[0]
+            total_scores, passed_count = self._connection.execute(
+                "SELECT count(*), coalesce(sum(passed), 0) FROM scores"
+            ).fetchone()
+
         return {
             "total_qa_pairs": total_qa,
             "total_scores": total_scores,
             "passed_count": passed_count,
             "pass_rate": passed_count / total_scores if total_scores > 0 else 0
-        }
\ No newline at end of file
+        }
+
+    def compact(self, vacuum: bool = False) -> Dict:
+        """
+        Fold the WAL back into the main file and truncate it; with vacuum,
+        also rebuild the file (reclaims all free pages, takes an exclusive lock)
+
+        Returns:
+            {"size_bytes": ..., "wal_bytes": ...} after compaction
+        """
+        with self._lock:
+            if vacuum:
+                self._connection.execute("VACUUM")
+            else:
+                self._connection.execute("PRAGMA incremental_vacuum")
+            # Sau VACUUM: trang mới nằm trong WAL, checkpoint để file -wal về 0
+            self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        wal_path = f"{self.db_path}-wal"
+        return {
+            "size_bytes": os.path.getsize(self.db_path),
+            "wal_bytes": os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+        }
+
+    def import_json(self, json_path: str) -> int:
+        """
+        Import a store written by the old JSON-file QADatabase into an empty
+        store (ids are kept); returns the Q&A pairs imported
+        """
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN")
+            try:
+                for qa_pair in data.get("qa_pairs", []):
+                    extra = {k: v for k, v in qa_pair.items() if k not in QA_COLUMNS}
+                    # Giữ id cũ: scores tham chiếu qa_pairs theo id
+                    connection.execute(
+                        "INSERT INTO qa_pairs (id, question, answer, reference_answer, matched_question, timestamp, extra) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            qa_pair.get("id"),
+                            qa_pair.get("question", ""),
+                            qa_pair.get("answer", ""),
+                            qa_pair.get("reference_answer"),
+                            qa_pair.get("matched_question"),
+                            qa_pair.get("timestamp") or datetime.now().isoformat(),
+                            json.dumps(extra, ensure_ascii=False) if extra else None
+                        )
+                    )
+                connection.executemany(
+                    "INSERT INTO scores (question_id, score, passed, timestamp) VALUES (?, ?, ?, ?)",
+                    [
+                        (s.get("question_id"), s.get("score"), int(bool(s.get("passed"))), s.get("timestamp"))
+                        for s in data.get("scores", [])
+                    ]
+                )
+                connection.executemany(
+                    "INSERT INTO metadata (timestamp, data) VALUES (?, ?)",
+                    [
+                        (m.get("timestamp"), json.dumps({k: v for k, v in m.items() if k != "timestamp"}, ensure_ascii=False))
+                        for m in data.get("metadata", [])
+                    ]
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+        imported = len(data.get("qa_pairs", []))
+        logger.info(f"Imported {imported} Q&A pairs from {json_path}")
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,196 @@
+"""
+Question bank: content hashes and batched upserts for imports
+"""
+import hashlib
+import unicodedata
+from datetime import datetime
+from typing import Dict, List, Tuple
+from sqlalchemy import column, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from config.database import db_manager, Question
+from src.database.session_document_db import SessionDocumentDatabase
+from src.utils.cache import interview_detail_cache, interview_list_cache, interview_list_version_cache
+from src.utils.logger import logger
+
+
+# Interaction 'database' đọc questions.answer hiện tại: chép text vào reference_answers
+# (cùng hash với InterviewDatabase._reference_answer_id) trước khi answer đổi
+PIN_REFERENCE_ANSWERS = (
+    """
+    INSERT INTO reference_answers (content_hash, answer, created_at)
+    SELECT DISTINCT encode(sha256(convert_to(q.answer, 'UTF8')), 'hex'), q.answer, now() AT TIME ZONE 'utc'
+    FROM questions q
+    JOIN user_interactions i ON i.question_id = q.id
+    WHERE q.id = ANY(:question_ids) AND i.answer_source = 'database' AND i.reference_answer_id IS NULL
+    ON CONFLICT (content_hash) DO NOTHING
+    """,
+    """
+    UPDATE user_interactions i
+    SET reference_answer_id = r.id
+    FROM questions q, reference_answers r
+    WHERE q.id = i.question_id
+      AND r.content_hash = encode(sha256(convert_to(q.answer, 'UTF8')), 'hex')
+      AND q.id = ANY(:question_ids) AND i.answer_source = 'database' AND i.reference_answer_id IS NULL
+    RETURNING i.session_id
+    """
+)
+
+
+def normalize_question(name: str) -> str:
+    """Unicode NFKC, case-folded, whitespace collapsed - variants of the same question compare equal"""
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+def question_hash(name: str) -> str:
+    """sha256 hex of the normalized question (questions.content_hash)"""
+    return hashlib.sha256(normalize_question(name).encode("utf-8")).hexdigest()
+
+
+class QuestionDatabase:
+    """Batched question upserts keyed by content hash"""
+
+    def __init__(self):
+        self.db_manager = db_manager
+        self.documents = SessionDocumentDatabase()
+
+    def existing(self, session: Session, hashes: List[str], embedding_column: str = "embedding") -> Dict[str, Dict]:
+        """
+        Stored id/name/answer/category/level of the given hashes, and whether
+        embedding_column (the active embedding version's column) is set
+        """
+        rows = session.execute(
+            select(
+                Question.content_hash,
+                Question.id,
+                Question.name,
+                Question.answer,
+                Question.category,
+                Question.level,
+                column(embedding_column).is_not(None).label("embedded")
+            ).select_from(Question).where(Question.content_hash.in_(hashes))
+        ).all()
+        return {row.content_hash: row._asdict() for row in rows}
+
+    def upsert(self, session: Session, rows: List[Dict]) -> List[Tuple[int, bool]]:
+        """
+        Insert or update questions by content_hash with multi-row INSERTs
+        (caller commits)
+
+        Rows with embedding None keep the stored embedding.
+
+        Returns:
+            (id, inserted) per row, in the order of rows
+        """
+        if not rows:
+            return []
+
+        # executemany: SQLAlchemy gộp thành INSERT nhiều dòng (insertmanyvalues), câu lệnh compile một lần
+        statement = insert(Question.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Question.content_hash],
+            set_={
+                "name": statement.excluded.name,
+                "answer": statement.excluded.answer,
+                "category": statement.excluded.category,
+                "level": statement.excluded.level,
+                "embedding": func.coalesce(statement.excluded.embedding, Question.embedding),
+                "updated_at": datetime.utcnow()
+            }
+        ).returning(
+            Question.id, literal_column("xmax = 0").label("inserted"), sort_by_parameter_order=True
+        )
+
+        return [tuple(row) for row in session.execute(statement, rows)]
+
+    def pin_reference_answers(self, session: Session, question_ids: List[int]) -> List[str]:
+        """
+        Freeze the reference answer of interactions graded against these
+        questions' current answer (caller commits)
+
+        'database' interactions store no text and read questions.answer;
+        call this before the answer changes or the question is merged away,
+        so graded interviews keep the answer they were graded against.
+
+        Returns:
+            Session ids whose interactions were pinned
+        """
+        if not question_ids:
+            return []
+        params = {"question_ids": list(question_ids)}
+        session.execute(text(PIN_REFERENCE_ANSWERS[0]), params)
+        return sorted({row.session_id for row in session.execute(text(PIN_REFERENCE_ANSWERS[1]), params) if row.session_id})
+
+    def rebuild_documents(self, session: Session, session_ids: List[str]):
+        """
+        Rebuild the stored detail documents of these sessions (caller
+        commits, then calls invalidate_caches)
+        """
+        for session_id in session_ids:
+            if self.documents.load(session, session_id) is not None:
+                self.documents.rebuild(session, session_id)
+
+    def invalidate_caches(self, session_ids: List[str]):
+        """Drop cached API responses of rebuilt sessions (after commit)"""
+        if not session_ids:
+            return
+        for session_id in session_ids:
+            interview_detail_cache.invalidate(session_id)
+        interview_list_cache.clear()
+        interview_list_version_cache.clear()
+
+    def backfill_hashes(self, session: Session, batch_size: int = 1000) -> Dict:
+        """
+        Hash questions stored before content_hash existed and merge duplicates
+        (caller commits)
+
+        Duplicates left by earlier imports keep the lowest id; interactions
+        pointing to the others are moved to it before they are deleted, with
+        their 'database' reference answers pinned first.
+
+        Returns:
+            {"hashed": ..., "merged": ..., "session_ids": sessions to rebuild}
+        """
+        keep: Dict[str, int] = {}
+        merge: Dict[int, int] = {}
+
+        # Hash đã có trong bảng (dòng mới) cũng tham gia gộp
+        for content_hash, question_id in session.execute(
+            select(Question.content_hash, func.min(Question.id))
+            .where(Question.content_hash.is_not(None))
+            .group_by(Question.content_hash)
+        ):
+            keep[content_hash] = question_id
+
+        missing = session.execute(
+            select(Question.id, Question.name).where(Question.content_hash.is_(None)).order_by(Question.id)
+        ).all()
+        updates = []
+        for question_id, name in missing:
+            content_hash = question_hash(name)
+            if content_hash in keep and keep[content_hash] != question_id:
+                merge[question_id] = keep[content_hash]
+            else:
+                keep[content_hash] = question_id
+                updates.append({"question_id": question_id, "content_hash": content_hash})
+
+        for start in range(0, len(updates), batch_size):
+            session.execute(
+                text("UPDATE questions SET content_hash = :content_hash WHERE id = :question_id"),
+                updates[start:start + batch_size]
+            )
+
+        session_ids: List[str] = []
+        if merge:
+            # Bản bị gộp có thể có answer khác bản giữ lại
+            session_ids = self.pin_reference_answers(session, list(merge))
+            pairs = [{"old_id": old, "new_id": new} for old, new in merge.items()]
+            session.execute(
+                text("UPDATE user_interactions SET question_id = :new_id WHERE question_id = :old_id"), pairs
+            )
+            session.execute(text("DELETE FROM questions WHERE id = :old_id"), [{"old_id": p["old_id"]} for p in pairs])
+            self.rebuild_documents(session, session_ids)
+            logger.info(f"Merged {len(merge)} duplicate questions")
+
+        return {"hashed": len(updates), "merged": len(merge), "session_ids": session_ids}
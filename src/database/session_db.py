@@ -1,18 +1,33 @@
 """
 Database operations for interview sessions
 """
-from typing import Optional, Dict
+from datetime import datetime
+from typing import Optional, Dict, List
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from config.database import db_manager, InterviewSession
+from src.database.session_document_db import SessionDocumentDatabase
+from src.database.stats_db import StatsDatabase
+from src.utils.cache import interview_detail_cache, interview_list_cache, interview_list_version_cache
 from src.utils.logger import logger
 
 
+# Cột được ghi đè khi lưu lại summary của một session đã có
+SUMMARY_COLUMNS = (
+    "position", "total_questions", "passed_questions", "average_score",
+    "overall_result", "strengths", "weaknesses", "summary"
+)
+
+
 class SessionDatabase:
     """Database operations for interview sessions"""
     
     def __init__(self):
         self.db_manager = db_manager
+        self.documents = SessionDocumentDatabase()
+        self.stats = StatsDatabase()
     
     def save_session_summary(
         self,
@@ -31,53 +46,38 @@ class SessionDatabase:
         """
         Save or update interview session summary
         
+        One INSERT ... ON CONFLICT (session_id) DO UPDATE ... RETURNING, so
+        concurrent saves of the same session cannot both insert. The
+        materialized detail document and the dashboard statistics are
+        updated in the same transaction.
+        
         Returns:
             session record id
         """
+        values = {
+            "session_id": session_id,
+            "candidate_id": candidate_id,
+            "interviewer_id": interviewer_id,
+            "position": position,
+            "total_questions": total_questions,
+            "passed_questions": passed_questions,
+            "average_score": average_score,
+            "overall_result": overall_result,
+            "strengths": strengths,
+            "weaknesses": weaknesses,
+            "summary": summary
+        }
         session: Session = self.db_manager.get_session()
         
         try:
-            # Check if session already exists
-            existing = session.query(InterviewSession).filter(
-                InterviewSession.session_id == session_id
-            ).first()
+            record = session.execute(self._upsert_statement([values])).one()
+            self.documents.rebuild(session, session_id)
+            self.stats.record_session(session, record)
+            session.commit()
+            self._invalidate_caches(session_id)
             
-            if existing:
-                # Update existing
-                existing.position = position
-                existing.total_questions = total_questions
-                existing.passed_questions = passed_questions
-                existing.average_score = average_score
-                existing.overall_result = overall_result
-                existing.strengths = strengths
-                existing.weaknesses = weaknesses
-                existing.summary = summary
-                
-                session.commit()
-                logger.info(f"Updated session summary for {session_id}")
-                return existing.id
-            else:
-                # Create new
-                new_session = InterviewSession(
-                    session_id=session_id,
-                    candidate_id=candidate_id,
-                    interviewer_id=interviewer_id,
-                    position=position,
-                    total_questions=total_questions,
-                    passed_questions=passed_questions,
-                    average_score=average_score,
-                    overall_result=overall_result,
-                    strengths=strengths,
-                    weaknesses=weaknesses,
-                    summary=summary
-                )
-                
-                session.add(new_session)
-                session.commit()
-                session.refresh(new_session)
-                
-                logger.info(f"Created session summary for {session_id}")
-                return new_session.id
+            logger.info(f"{'Created' if record.inserted else 'Updated'} session summary for {session_id}")
+            return record.id
                 
         except Exception as e:
             session.rollback()
@@ -86,9 +86,84 @@ class SessionDatabase:
         finally:
             session.close()
     
+    def save_session_summaries(self, summaries: List[Dict], batch_size: int = 500) -> Dict[str, int]:
+        """
+        Bulk variant of save_session_summary for backfills / re-summarizing
+        
+        Args:
+            summaries: Dicts with the keyword arguments of save_session_summary
+            batch_size: Sessions per INSERT ... ON CONFLICT statement (and transaction)
+        
+        Returns:
+            session_id -> session record id
+        """
+        # Một câu lệnh không được upsert cùng một session_id hai lần: giữ bản cuối
+        deduplicated = list({item["session_id"]: item for item in summaries}.values())
+        ids: Dict[str, int] = {}
+        
+        for start in range(0, len(deduplicated), batch_size):
+            batch = deduplicated[start:start + batch_size]
+            session: Session = self.db_manager.get_session()
+            
+            try:
+                records = session.execute(self._upsert_statement(batch)).all()
+                for record in records:
+                    self.documents.rebuild(session, record.session_id)
+                    self.stats.record_session(session, record)
+                session.commit()
+                
+                ids.update({record.session_id: record.id for record in records})
+                inserted = sum(1 for record in records if record.inserted)
+                logger.info(f"Saved {len(records)} session summaries ({inserted} created, {len(records) - inserted} updated)")
+                
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error saving session summaries: {e}", exc_info=True)
+                raise
+            finally:
+                session.close()
+        
+        interview_detail_cache.clear()
+        interview_list_cache.clear()
+        interview_list_version_cache.clear()
+        return ids
+    
+    def _upsert_statement(self, rows: List[Dict]):
+        """
+        INSERT ... ON CONFLICT (session_id) DO UPDATE ... RETURNING
+        
+        Candidate/interviewer are kept from the first save, as before. The
+        returned columns are what documents/stats need from the record;
+        xmax = 0 marks rows that were inserted rather than updated.
+        """
+        now = datetime.utcnow()
+        stmt = insert(InterviewSession).values([{**row, "updated_at": now} for row in rows])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[InterviewSession.session_id],
+            set_={
+                column: stmt.excluded[column]
+                for column in SUMMARY_COLUMNS + ("updated_at",)
+            }
+        )
+        return stmt.returning(
+            InterviewSession.id,
+            InterviewSession.session_id,
+            InterviewSession.candidate_id,
+            InterviewSession.interviewer_id,
+            InterviewSession.position,
+            InterviewSession.created_at,
+            literal_column("xmax = 0").label("inserted")
+        )
+    
+    def _invalidate_caches(self, session_id: str):
+        """Drop cached API responses affected by a session write"""
+        interview_detail_cache.invalidate(session_id)
+        interview_list_cache.clear()
+        interview_list_version_cache.clear()
+    
     def get_session_summary(self, session_id: str) -> Optional[Dict]:
         """Get session summary by session_id"""
-        session: Session = self.db_manager.get_session()
+        session: Session = self.db_manager.get_read_session()
         
         try:
             record = session.query(InterviewSession).filter(
@@ -0,0 +1,139 @@
+"""
+Materialized interview detail documents (read model for GET /api/v1/interviews/{session_id})
+"""
+import json
+import zlib
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, joinedload
+
+from config.database import (
+    db_manager, INTERACTION_ORDER, REFERENCE_ANSWER_TEXT, InterviewSession, InterviewSessionDocument, Question,
+    ReferenceAnswer, UserInteraction
+)
+from config.settings import settings
+from src.utils.logger import logger
+
+
+def build_session_document(session: Session, session_id: str) -> Optional[Dict]:
+    """Assemble the interview detail document from the normalized tables"""
+    # Session + candidate + interviewer trong một query
+    session_record = session.query(InterviewSession).options(
+        joinedload(InterviewSession.candidate),
+        joinedload(InterviewSession.interviewer)
+    ).filter(
+        InterviewSession.session_id == session_id
+    ).first()
+    
+    if not session_record:
+        return None
+    
+    candidate = session_record.candidate
+    interviewer = session_record.interviewer
+    
+    # Interactions + tên câu hỏi + đáp án mẫu trong một query, theo thứ tự câu hỏi trong buổi phỏng vấn
+    interactions = session.query(
+        UserInteraction.question_summarized,
+        UserInteraction.answer_original,
+        REFERENCE_ANSWER_TEXT.label('reference_answer'),
+        UserInteraction.grading_score,
+        UserInteraction.is_passed,
+        UserInteraction.feedback,
+        Question.name.label('question_name')
+    ).outerjoin(
+        Question,
+        Question.id == UserInteraction.question_id
+    ).outerjoin(
+        ReferenceAnswer,
+        ReferenceAnswer.id == UserInteraction.reference_answer_id
+    ).filter(
+        UserInteraction.session_id == session_id
+    ).order_by(
+        *INTERACTION_ORDER
+    ).all()
+    
+    # Format questions
+    questions = []
+    for i in interactions:
+        questions.append({
+            "question": i.question_name or i.question_summarized or "N/A",
+            "answer": i.answer_original,
+            "correctAnswer": i.reference_answer,
+            "score": i.grading_score,
+            "passed": i.is_passed,
+            "feedback": i.feedback
+        })
+    
+    return {
+        "session_id": session_id,
+        "candidate": candidate.name if candidate else "Unknown",
+        "interviewer": interviewer.name if interviewer else "Unknown",
+        "position": session_record.position or "N/A",
+        "date": session_record.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "overallScore": round(session_record.average_score, 1) if session_record.average_score else 0.0,
+        "overallResult": session_record.overall_result,
+        "totalQuestions": session_record.total_questions,
+        "passedQuestions": session_record.passed_questions,
+        "strengths": session_record.strengths,
+        "weaknesses": session_record.weaknesses,
+        "summary": session_record.summary,
+        "questions": questions
+    }
+
+
+class SessionDocumentDatabase:
+    """Store and load materialized detail documents"""
+    
+    def __init__(self, compress: Optional[bool] = None):
+        self.db_manager = db_manager
+        self.compress = settings.session_document_compression if compress is None else compress
+    
+    def save(self, session: Session, session_id: str, document: Dict):
+        """Upsert a document inside the caller's transaction (caller commits)"""
+        if self.compress:
+            values = {
+                "document": None,
+                "document_zlib": zlib.compress(json.dumps(document, ensure_ascii=False).encode("utf-8"))
+            }
+        else:
+            values = {"document": document, "document_zlib": None}
+        
+        statement = insert(InterviewSessionDocument).values(
+            session_id=session_id, built_at=datetime.utcnow(), **values
+        )
+        session.execute(statement.on_conflict_do_update(
+            index_elements=[InterviewSessionDocument.session_id],
+            set_={**values, "built_at": statement.excluded.built_at}
+        ))
+    
+    def rebuild(self, session: Session, session_id: str) -> Optional[Dict]:
+        """Build and store the document in the caller's transaction"""
+        document = build_session_document(session, session_id)
+        if document is not None:
+            self.save(session, session_id, document)
+        return document
+    
+    def load(self, session: Session, session_id: str) -> Optional[Dict]:
+        """Primary-key lookup of a stored document"""
+        record = session.get(InterviewSessionDocument, session_id)
+        if not record:
+            return None
+        if record.document_zlib is not None:
+            return json.loads(zlib.decompress(record.document_zlib))
+        return record.document
+    
+    def get_or_build(self, session: Session, session_id: str) -> Optional[Dict]:
+        """
+        Load a stored document, building it once for sessions saved before
+        documents existed
+        """
+        document = self.load(session, session_id)
+        if document is not None:
+            return document
+        
+        document = self.rebuild(session, session_id)
+        if document is not None:
+            session.commit()
+            logger.info(f"Backfilled detail document for session {session_id}")
+        return document
@@ -0,0 +1,287 @@
+"""
+Database operations for pre-aggregated dashboard statistics (interview_stats)
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from config.database import db_manager, InterviewSession, InterviewStat, UserInteraction
+from src.utils.logger import logger
+
+
+GLOBAL_SCOPE = "global"
+SESSION_SCOPE = "session"
+STATS_SCOPES = (GLOBAL_SCOPE, "position", "interviewer", "day", "candidate")
+
+COUNTER_COLUMNS = (
+    "sessions_count", "sessions_passed", "questions_count", "questions_passed", "score_sum", "score_count"
+)
+
+
+def session_scope_keys(record: InterviewSession) -> Dict[str, str]:
+    """Summary rows a session is counted in"""
+    return {
+        GLOBAL_SCOPE: "",
+        "position": record.position or "N/A",
+        "interviewer": str(record.interviewer_id or ""),
+        "day": record.created_at.date().isoformat(),
+        "candidate": str(record.candidate_id)
+    }
+
+
+def format_stat(row: InterviewStat) -> Dict:
+    return {
+        "scope": row.scope,
+        "key": row.scope_key,
+        "totalInterview": row.sessions_count,
+        "totalPass": row.sessions_passed,
+        "totalFailed": row.sessions_count - row.sessions_passed,
+        "passRate": round(row.sessions_passed / row.sessions_count, 4) if row.sessions_count else 0.0,
+        "totalQuestions": row.questions_count,
+        "passedQuestions": row.questions_passed,
+        "averageScore": round(row.score_sum / row.score_count, 2) if row.score_count else 0.0,
+        "updatedAt": row.updated_at.isoformat() if row.updated_at else None
+    }
+
+
+class StatsDatabase:
+    """Maintain and read interview_stats"""
+    
+    def __init__(self):
+        self.db_manager = db_manager
+    
+    def record_session(self, session: Session, record: InterviewSession):
+        """
+        Replace a session's contribution in every summary row
+        
+        Runs in the caller's transaction (right after the session summary is
+        flushed), so the stats always match the committed sessions. The
+        previous contribution is kept in the session's own row, which makes
+        re-saving a reprocessed session exact instead of double counting.
+        """
+        previous = session.query(InterviewStat).filter(
+            InterviewStat.scope == SESSION_SCOPE,
+            InterviewStat.scope_key == record.session_id
+        ).with_for_update().first()
+        
+        contribution = self._session_contribution(session, record)
+        keys = session_scope_keys(record)
+        old_contribution = {col: getattr(previous, col) for col in COUNTER_COLUMNS} if previous else None
+        old_keys = previous.scope_keys if previous else {}
+        
+        candidates_delta = 0
+        for scope in STATS_SCOPES:
+            if scope == GLOBAL_SCOPE:
+                continue
+            if old_contribution and old_keys.get(scope) == keys[scope]:
+                delta = {col: contribution[col] - old_contribution[col] for col in COUNTER_COLUMNS}
+                after = self._apply(session, scope, keys[scope], delta)
+                before = after - delta["sessions_count"]
+            else:
+                if old_contribution and scope in old_keys:
+                    negated = {col: -old_contribution[col] for col in COUNTER_COLUMNS}
+                    if self._apply(session, scope, old_keys[scope], negated) == 0:
+                        # Session chuyển sang key khác: bỏ dòng rỗng để khớp với rebuild()
+                        session.query(InterviewStat).filter(
+                            InterviewStat.scope == scope,
+                            InterviewStat.scope_key == old_keys[scope]
+                        ).delete(synchronize_session=False)
+                        if scope == "candidate":
+                            candidates_delta -= 1
+                after = self._apply(session, scope, keys[scope], contribution)
+                before = after - contribution["sessions_count"]
+            
+            # Đếm số ứng viên khác nhau: dòng candidate đi từ 0 -> >0 session
+            if scope == "candidate" and before == 0 and after > 0:
+                candidates_delta += 1
+        
+        global_delta = {
+            col: contribution[col] - (old_contribution[col] if old_contribution else 0)
+            for col in COUNTER_COLUMNS
+        }
+        self._apply(session, GLOBAL_SCOPE, "", global_delta, candidates_delta)
+        
+        stmt = insert(InterviewStat).values(
+            scope=SESSION_SCOPE,
+            scope_key=record.session_id,
+            scope_keys=keys,
+            updated_at=datetime.utcnow(),
+            **contribution
+        )
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[InterviewStat.scope, InterviewStat.scope_key],
+            set_={
+                **{col: stmt.excluded[col] for col in COUNTER_COLUMNS},
+                "scope_keys": stmt.excluded.scope_keys,
+                "updated_at": stmt.excluded.updated_at
+            }
+        ))
+    
+    def get_stats(self, scope: str = GLOBAL_SCOPE, key: str = "") -> Optional[Dict]:
+        """Primary-key lookup of one summary row"""
+        session: Session = self.db_manager.get_session()
+        
+        try:
+            return self.load(session, scope, key)
+        finally:
+            session.close()
+    
+    def list_stats(self, scope: str, limit: int = 50) -> List[Dict]:
+        """Rows of a scope, busiest first (day scope: most recent first)"""
+        session: Session = self.db_manager.get_session()
+        
+        try:
+            return self.load_scope(session, scope, limit)
+        finally:
+            session.close()
+    
+    def load(self, session: Session, scope: str, key: str = "") -> Optional[Dict]:
+        row = session.get(InterviewStat, (scope, key))
+        if not row and scope == GLOBAL_SCOPE:
+            # Chưa có session nào được lưu
+            row = InterviewStat(scope=GLOBAL_SCOPE, scope_key="", candidates_count=0,
+                                **{col: 0 for col in COUNTER_COLUMNS})
+        if not row:
+            return None
+        
+        stats = format_stat(row)
+        if scope == GLOBAL_SCOPE:
+            stats["totalCandidates"] = row.candidates_count
+        return stats
+    
+    def load_scope(self, session: Session, scope: str, limit: int = 50) -> List[Dict]:
+        query = session.query(InterviewStat).filter(InterviewStat.scope == scope)
+        if scope == "day":
+            query = query.order_by(InterviewStat.scope_key.desc())
+        else:
+            query = query.order_by(InterviewStat.sessions_count.desc(), InterviewStat.scope_key)
+        return [format_stat(row) for row in query.limit(limit).all()]
+    
+    def rebuild(self) -> int:
+        """
+        Recompute interview_stats from interview_sessions/user_interactions
+        
+        For the initial backfill and to repair drift (e.g. rows deleted by hand).
+        
+        Returns:
+            number of sessions counted
+        """
+        session: Session = self.db_manager.get_session()
+        
+        try:
+            # Chặn record_session đồng thời cho tới khi rebuild commit
+            session.execute(text("LOCK TABLE interview_stats IN SHARE ROW EXCLUSIVE MODE"))
+            
+            contributions = self._contributions_query(session).add_columns(
+                InterviewSession.session_id,
+                InterviewSession.position,
+                InterviewSession.interviewer_id,
+                InterviewSession.candidate_id,
+                InterviewSession.created_at
+            ).group_by(InterviewSession.id)
+            
+            session.query(InterviewStat).delete(synchronize_session=False)
+            
+            # Dòng per-session được ghi theo batch; chỉ giữ tổng theo key trong bộ nhớ
+            totals: Dict[tuple, Dict] = {}
+            candidates = set()
+            batch = []
+            counted = 0
+            now = datetime.utcnow()
+            
+            for row in contributions.yield_per(1000):
+                contribution = self._row_contribution(row)
+                keys = session_scope_keys(row)
+                candidates.add(row.candidate_id)
+                batch.append({
+                    "scope": SESSION_SCOPE, "scope_key": row.session_id,
+                    "scope_keys": keys, "updated_at": now, **contribution
+                })
+                for scope in STATS_SCOPES:
+                    bucket = totals.setdefault((scope, keys[scope]), {col: 0 for col in COUNTER_COLUMNS})
+                    for col in COUNTER_COLUMNS:
+                        bucket[col] += contribution[col]
+                
+                counted += 1
+                if len(batch) >= 1000:
+                    session.execute(insert(InterviewStat), batch)
+                    batch = []
+            if batch:
+                session.execute(insert(InterviewStat), batch)
+            
+            totals.setdefault((GLOBAL_SCOPE, ""), {col: 0 for col in COUNTER_COLUMNS})
+            session.execute(insert(InterviewStat), [
+                {
+                    "scope": scope,
+                    "scope_key": key,
+                    "candidates_count": len(candidates) if scope == GLOBAL_SCOPE else 0,
+                    "updated_at": now,
+                    **values
+                }
+                for (scope, key), values in totals.items()
+            ])
+            session.commit()
+            
+            logger.info(f"Rebuilt interview_stats from {counted} sessions")
+            return counted
+            
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error rebuilding stats: {e}", exc_info=True)
+            raise
+        finally:
+            session.close()
+    
+    def _contributions_query(self, session: Session):
+        """Per-session counters: the session itself plus its graded interactions"""
+        return session.query(
+            func.max(case((InterviewSession.overall_result == 'pass', 1), else_=0)).label("sessions_passed"),
+            func.count(UserInteraction.id).label("questions_count"),
+            func.count(UserInteraction.id).filter(UserInteraction.is_passed.is_(True)).label("questions_passed"),
+            func.coalesce(func.sum(UserInteraction.grading_score), 0.0).label("score_sum"),
+            func.count(UserInteraction.grading_score).label("score_count")
+        ).select_from(
+            InterviewSession
+        ).outerjoin(
+            UserInteraction,
+            UserInteraction.session_id == InterviewSession.session_id
+        )
+    
+    def _session_contribution(self, session: Session, record: InterviewSession) -> Dict:
+        row = self._contributions_query(session).filter(
+            InterviewSession.id == record.id
+        ).one()
+        return self._row_contribution(row)
+    
+    def _row_contribution(self, row) -> Dict:
+        return {
+            "sessions_count": 1,
+            "sessions_passed": row.sessions_passed,
+            "questions_count": row.questions_count,
+            "questions_passed": row.questions_passed,
+            "score_sum": float(row.score_sum),
+            "score_count": row.score_count
+        }
+    
+    def _apply(self, session: Session, scope: str, key: str, delta: Dict, candidates_delta: int = 0) -> int:
+        """Add delta to a summary row (created on first use); returns its sessions_count"""
+        table = InterviewStat.__table__
+        stmt = insert(InterviewStat).values(
+            scope=scope,
+            scope_key=key,
+            candidates_count=candidates_delta,
+            updated_at=datetime.utcnow(),
+            **delta
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[InterviewStat.scope, InterviewStat.scope_key],
+            set_={
+                **{col: table.c[col] + stmt.excluded[col] for col in COUNTER_COLUMNS},
+                "candidates_count": table.c.candidates_count + stmt.excluded.candidates_count,
+                "updated_at": stmt.excluded.updated_at
+            }
+        ).returning(InterviewStat.sessions_count)
+        return session.execute(stmt).scalar()
@@ -1,7 +1,10 @@
 from typing import Optional
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from config.database import db_manager, User
+from src.utils.cache import MISSING, user_id_cache
 from src.utils.logger import logger
 
 
@@ -15,6 +18,10 @@ class UserDatabase:
         """
         Tìm hoặc tạo user trong database
         
+        Một câu INSERT ... ON CONFLICT (name, role) DO UPDATE ... RETURNING id
+        nên an toàn khi nhiều batch cùng tạo một user; id được cache trong
+        process nên các lần gọi sau không cần truy vấn DB.
+        
         Args:
             name: Tên người dùng
             role: 'candidate' hoặc 'interviewer'
@@ -22,27 +29,30 @@ class UserDatabase:
         Returns:
             user_id: ID của user
         """
+        user_id = user_id_cache.get((name, role))
+        if user_id is not MISSING:
+            return user_id
+        
         session: Session = self.db_manager.get_session()
         
         try:
-            # Tìm user theo tên và role
-            user = session.query(User).filter(
-                User.name == name,
-                User.role == role
-            ).first()
+            # DO UPDATE (không phải DO NOTHING) để RETURNING luôn trả về id; xmax = 0 <=> dòng mới được insert
+            stmt = insert(User).values(name=name, role=role)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[User.name, User.role],
+                set_={"name": stmt.excluded.name}
+            ).returning(User.id, literal_column("xmax = 0").label("inserted"))
             
-            if user:
-                logger.info(f"Found existing {role}: {name} (ID: {user.id})")
-                return user.id
-            
-            # Tạo user mới
-            new_user = User(name=name, role=role)
-            session.add(new_user)
+            row = session.execute(stmt).one()
             session.commit()
-            session.refresh(new_user)
             
-            logger.info(f"Created new {role}: {name} (ID: {new_user.id})")
-            return new_user.id
+            if row.inserted:
+                logger.info(f"Created new {role}: {name} (ID: {row.id})")
+            else:
+                logger.info(f"Found existing {role}: {name} (ID: {row.id})")
+            
+            user_id_cache.set((name, role), row.id)
+            return row.id
             
         except Exception as e:
             session.rollback()
@@ -53,7 +63,7 @@ class UserDatabase:
     
     def get_user_by_id(self, user_id: int) -> Optional[dict]:
         """Lấy thông tin user theo ID"""
-        session: Session = self.db_manager.get_session()
+        session: Session = self.db_manager.get_read_session()
         
         try:
             user = session.query(User).filter(User.id == user_id).first()
@@ -71,7 +81,7 @@ class UserDatabase:
     
     def get_user_by_name_and_role(self, name: str, role: str) -> Optional[dict]:
         """Lấy thông tin user theo tên và role"""
-        session: Session = self.db_manager.get_session()
+        session: Session = self.db_manager.get_read_session()
         
         try:
             user = session.query(User).filter(
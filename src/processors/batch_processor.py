@@ -1,11 +1,22 @@
-import uuid
+from typing import Callable, Optional
+
+from config.database import db_manager
 from src.processors.interview_processor import InterviewProcessor
 from src.chains.session_summary_chain import SessionSummaryChain
+from src.database.checkpoint_db import (
+    CheckpointDatabase, stable_session_id, payload_source_id, GRADE_STAGE, SUMMARY_STAGE
+)
+from src.database.interview_db import InterviewDatabase
 from src.database.session_db import SessionDatabase
 from src.utils.logger import logger
 
 
-def process_interview_batch(json_input: dict) -> dict:
+def process_interview_batch(
+    json_input: dict,
+    progress_callback: Optional[Callable[[str, float], None]] = None,
+    reprocess: bool = False,
+    processor: Optional[InterviewProcessor] = None
+) -> dict:
     """
     Xử lý batch interview từ webhook response
     
@@ -15,18 +26,48 @@ def process_interview_batch(json_input: dict) -> dict:
             - interviewer_name: Tên người phỏng vấn
             - position: Vị trí ứng tuyển
             - qa_pairs: List các cặp câu hỏi-trả lời
+            - session_id / source_id (optional): định danh ổn định của nguồn
+        progress_callback: Optional callback(stage, progress) để báo tiến độ
+        reprocess: Bỏ checkpoint cũ và chấm lại toàn bộ
+        processor: InterviewProcessor dùng lại giữa các batch (tránh load lại model)
             
     Returns:
         Dictionary chứa kết quả xử lý
     """
+    # Một connection cho cả buổi phỏng vấn thay vì checkout lại ở mỗi lần gọi DB
+    with db_manager.unit_of_work():
+        return _process_interview_batch(json_input, progress_callback, reprocess, processor)
+
+
+def _process_interview_batch(
+    json_input: dict,
+    progress_callback: Optional[Callable[[str, float], None]],
+    reprocess: bool,
+    processor: Optional[InterviewProcessor]
+) -> dict:
+    report = progress_callback or (lambda stage, progress: None)
     try:
-        processor = InterviewProcessor()
+        processor = processor or InterviewProcessor()
         
         # Extract data
         candidate_name = json_input.get('candidate_name', 'Unknown Candidate')
         interviewer_name = json_input.get('interviewer_name', 'Unknown Interviewer')
         qa_pairs = json_input.get('qa_pairs', [])
-        session_id = str(uuid.uuid4())
+        # Session id ổn định theo nguồn -> chạy lại sẽ tiếp tục từ checkpoint
+        session_id = json_input.get('session_id') or stable_session_id(
+            json_input.get('source_id') or payload_source_id(json_input)
+        )
+        
+        checkpoints = CheckpointDatabase()
+        if reprocess:
+            checkpoints.clear(session_id, GRADE_STAGE, SUMMARY_STAGE)
+        graded = checkpoints.get_stage_items(session_id, GRADE_STAGE)
+        
+        # Xóa interaction do lần chạy bị gián đoạn để lại (chưa kịp checkpoint)
+        InterviewDatabase().delete_session_interactions(
+            session_id,
+            keep_ids=[r['interaction_id'] for r in graded.values()]
+        )
         
         # Tạo hoặc lấy candidate và interviewer
         candidate_id = processor.get_or_create_user(candidate_name, 'candidate')
@@ -36,6 +77,8 @@ def process_interview_batch(json_input: dict) -> dict:
         print(f"Session: {session_id}")
         print(f"Candidate: {candidate_name} (ID: {candidate_id})")
         print(f"Interviewer: {interviewer_name} (ID: {interviewer_id})")
+        if graded:
+            print(f"Resuming: {len(graded)}/{len(qa_pairs)} questions already graded")
         print(f"{'='*80}\n")
         
         # Process each interview
@@ -48,14 +91,22 @@ def process_interview_batch(json_input: dict) -> dict:
             candidate_answer = qa_pair.get('answer', '')
             
             print(f"[Q{i}] {question_summarized}")
+            report("grading", 0.9 * (i - 1) / len(qa_pairs))
             
-            result = processor.process_answer(
-                candidate_id=candidate_id,
-                interviewer_id=interviewer_id,
-                candidate_answer=candidate_answer,
-                question_summarized=question_summarized,
-                session_id=session_id
-            )
+            result = graded.get(str(i))
+            if result:
+                print("    ↺ Already graded (checkpoint)")
+            else:
+                result = processor.process_answer(
+                    candidate_id=candidate_id,
+                    interviewer_id=interviewer_id,
+                    candidate_answer=candidate_answer,
+                    question_summarized=question_summarized,
+                    session_id=session_id,
+                    question_index=i
+                )
+                if result['status'] == 'success':
+                    checkpoints.save(session_id, GRADE_STAGE, result, item_key=str(i))
             
             if result['status'] == 'success':
                 # Kiểm tra có trong DB hay không
@@ -90,9 +141,6 @@ def process_interview_batch(json_input: dict) -> dict:
         print(f"SUMMARY: {passed_count}/{len(results)} passed | Avg: {avg_score:.1f}/10 | Rate: {pass_rate:.0%}")
         print(f"{'='*80}\n")
         
-        # Generate AI summary
-        print("Generating AI summary...")
-        summary_chain = SessionSummaryChain()
         session_db = SessionDatabase()
         
         # Prepare questions data for summary
@@ -107,13 +155,22 @@ def process_interview_batch(json_input: dict) -> dict:
                     'feedback': result.get('feedback', '')
                 })
         
-        # Generate summary
+        # Generate AI summary
         position = json_input.get('position', 'N/A')
-        ai_summary = summary_chain.generate_summary(
-            candidate_name=candidate_name,
-            position=position,
-            questions_data=questions_data
-        )
+        ai_summary = checkpoints.get(session_id, SUMMARY_STAGE)
+        if ai_summary:
+            print("Using checkpointed AI summary...")
+        else:
+            print("Generating AI summary...")
+            report("summary", 0.9)
+            summary_chain = SessionSummaryChain()
+            ai_summary = summary_chain.generate_summary(
+                candidate_name=candidate_name,
+                position=position,
+                questions_data=questions_data
+            )
+            if not ai_summary.get('error'):
+                checkpoints.save(session_id, SUMMARY_STAGE, ai_summary)
         
         # Save to database
         try:
@@ -74,7 +74,8 @@ class InterviewProcessor:
         interviewer_id: int,
         candidate_answer: str,
         question_summarized: str,
-        session_id: str = None
+        session_id: str = None,
+        question_index: int = None
     ) -> Dict:
         start_time = time.time()
         logger.info(f"Processing answer from candidate {candidate_id} with interviewer {interviewer_id}")
@@ -148,7 +149,9 @@ class InterviewProcessor:
                 grading_score=grade_result["score"],
                 feedback=grade_result["feedback"],
                 session_id=session_id,
-                processing_time_ms=processing_time
+                processing_time_ms=processing_time,
+                question_index=question_index,
+                answer_source=answer_source
             )
 
             logger.info(
@@ -0,0 +1,71 @@
+from typing import Callable, Dict, Optional
+
+from config.settings import settings
+from src.database.embedding_db import EmbeddingVersionDatabase
+from src.database.pgvector_search import get_embeddings
+from src.utils.logger import logger
+
+
+def run_reembedding(
+    model_name: Optional[str] = None,
+    chunk_size: int = 256,
+    progress_callback: Optional[Callable[[str, float], None]] = None,
+    activate: bool = True
+) -> Dict:
+    """
+    Re-embed the question bank with model_name into a shadow column
+
+    Resumable: chunks are committed as they are embedded and a rerun for the
+    same model continues with the questions still missing a vector. Search
+    keeps using the active version until the shadow column is complete and
+    indexed; the flip itself happens in one transaction.
+
+    Args:
+        model_name: HuggingFace model (default: settings.embedding_model)
+        chunk_size: Questions embedded and written per transaction
+        progress_callback: Optional callback(stage, progress)
+        activate: Flip search to the new column when done (False: leave it building)
+
+    Returns:
+        Dictionary with the status and the version
+    """
+    report = progress_callback or (lambda stage, progress: None)
+    model_name = model_name or settings.embedding_model
+    versions = EmbeddingVersionDatabase()
+
+    active = versions.active()
+    if active["model"] == model_name:
+        logger.info(f"Questions are already embedded with {model_name} ({active['column_name']})")
+        return {"status": "unchanged", "version": active}
+
+    embeddings = get_embeddings(model_name)
+    dimensions = len(embeddings.embed_query("dimension probe"))
+    version = versions.begin(model_name, dimensions)
+
+    total = versions.remaining(version)
+    done = 0
+    report("embedding", 0.0)
+    while True:
+        rows = versions.pending(version, chunk_size)
+        if not rows:
+            break
+        vectors = embeddings.embed_documents([name for _, name in rows])
+        versions.fill(version, [(i, n, v) for (i, n), v in zip(rows, vectors)])
+        done += len(rows)
+        # Câu hỏi thêm trong lúc chạy làm total tăng; chặn ở 0.9 để chừa cho build index
+        report("embedding", min(0.9, 0.9 * done / max(total, 1)))
+        if len(rows) < chunk_size:
+            break
+    logger.info(f"Embedded {done} questions into {version['column_name']}")
+
+    report("indexing", 0.9)
+    versions.build_index(version)
+
+    if not activate:
+        report("done", 1.0)
+        return {"status": "built", "embedded": done, "version": version}
+
+    report("activating", 0.95)
+    version = versions.activate(version, embeddings.embed_documents)
+    report("done", 1.0)
+    return {"status": "activated", "embedded": done, "version": version}
@@ -1,4 +1,4 @@
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 import os
 import tempfile
 from datetime import datetime
@@ -11,19 +11,32 @@ import unicodedata
 from src.services.google_drive_service import GoogleDriveService
 from src.services.speech_to_text_service import SpeechToTextService
 from src.chains.transcript_analyzer_chain import TranscriptAnalyzerChain
+from src.database.checkpoint_db import (
+    CheckpointDatabase, stable_session_id, TRANSCRIPT_STAGE, QA_PAIRS_STAGE
+)
 from src.utils.logger import logger
 
 
+WEBHOOK_INFO_PATH = 'data/webhook_info.json'
+
+
 class DriveWebhookHandler:
 
     def __init__(self):
         self.drive_service = GoogleDriveService()
         self.speech_service = SpeechToTextService()
         self.transcript_analyzer = TranscriptAnalyzerChain()
+        self.checkpoints = CheckpointDatabase()
         self.temp_dir = os.path.join(tempfile.gettempdir(), 'interview_audio')
         os.makedirs(self.temp_dir, exist_ok=True)
 
-    def handle_file_created(self, file_id: str, file_name: Optional[str] = None) -> Dict:
+    def handle_file_created(
+        self,
+        file_id: str,
+        file_name: Optional[str] = None,
+        progress_callback: Optional[Callable[[str, float], None]] = None
+    ) -> Dict:
+        report = progress_callback or (lambda stage, progress: None)
         try:
             logger.info(f"Processing new file: {file_id}")
 
@@ -49,112 +62,47 @@ class DriveWebhookHandler:
                     "file_name": file_name
                 }
 
-            # Tải file về
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_extension = self._get_file_extension(mime_type)
-            local_file_path = os.path.join(
-                self.temp_dir,
-                f"{file_name}_{timestamp}{file_extension}"
-            )
-
-            logger.info(f"Downloading file to {local_file_path}...")
-            file_content = self.drive_service.download_file(file_id, local_file_path)
+            checksum = file_info.get('md5Checksum') or file_info.get('modifiedTime')
+            source_id = f"drive:{file_id}:{checksum}"
+            session_id = stable_session_id(source_id)
 
-            if not file_content:
-                return {
-                    "status": "error",
-                    "message": "Failed to download file"
-                }
-
-            # Chuẩn hóa về WAV 16k mono bằng ffmpeg (cho cả audio/video)
-            audio_path = os.path.join(self.temp_dir, f"{file_name}_{timestamp}.wav")
-            try:
-                logger.info("Normalizing media to wav 16k mono via ffmpeg...")
-                # ffmpeg -y -i input -vn -ac 1 -ar 16000 -acodec pcm_s16le output.wav
-                subprocess.run(
-                    ["ffmpeg", "-y", "-i", local_file_path, "-vn", "-ac", "1", "-ar", "16000",
-                     "-acodec", "pcm_s16le", audio_path],
-                    check=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                logger.info(f"Audio ready at {audio_path}")
-            except Exception as e:
-                logger.error(f"ffmpeg convert failed: {e}")
-                return {
-                    "status": "error",
-                    "message": f"Failed to prepare audio: {e}"
-                }
-
-            # Nếu dài > ~60s, cắt thành các đoạn 55s và ghép transcript
-            chunks_dir = os.path.join(self.temp_dir, f"chunks_{timestamp}")
-            os.makedirs(chunks_dir, exist_ok=True)
-            chunk_pattern = os.path.join(chunks_dir, "chunk_%03d.wav")
-            try:
-                logger.info("Segmenting audio into 55s chunks via ffmpeg...")
-                # ffmpeg -i in.wav -f segment -segment_time 55 -ar 16000 -ac 1 -c:a pcm_s16le chunk_%03d.wav
-                subprocess.run(
-                    ["ffmpeg", "-y", "-i", audio_path, "-f", "segment", "-segment_time", "55",
-                     "-ar", "16000", "-ac", "1", "-c:a", "pcm_s16le", "-reset_timestamps", "1", chunk_pattern],
-                    check=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-            except Exception as e:
-                logger.error(f"ffmpeg segment failed: {e}")
-                # Nếu segment lỗi, fallback: nhận toàn bộ (có thể fail nếu >60s)
-                chunks = [audio_path]
+            transcript_checkpoint = self.checkpoints.get(session_id, TRANSCRIPT_STAGE)
+            if transcript_checkpoint:
+                logger.info(f"Resuming session {session_id}: transcript already checkpointed")
+                transcript = transcript_checkpoint["transcript"]
             else:
-                # Thu thập các chunk được tạo; nếu chỉ có 1 chunk thì vẫn dùng
-                chunks = sorted(glob.glob(os.path.join(chunks_dir, "chunk_*.wav")))
-                if not chunks:
-                    chunks = [audio_path]
-
-            # Chuyển đổi audio sang text (theo từng chunk nếu có)
-            logger.info("Starting speech-to-text conversion...")
-            transcripts: list[str] = []
-            for idx, chunk_path in enumerate(chunks, 1):
-                logger.info(f"Transcribing chunk {idx}/{len(chunks)}: {os.path.basename(chunk_path)}")
-                piece = self.speech_service.transcribe_audio_file(
-                    chunk_path,
-                    language_code="vi-VN"
-                )
-                if piece:
-                    transcripts.append(piece)
-                else:
-                    logger.warning(f"Empty transcript for chunk {idx}")
-
-            transcript = " ".join(transcripts).strip()
-
-            if not transcript:
-                return {
-                    "status": "error",
-                    "message": "Failed to transcribe audio",
-                    "file_id": file_id,
-                    "file_name": file_name
-                }
-
-            # Xóa file tạm
-            try:
-                # Clean up temp files
-                if os.path.exists(local_file_path):
-                    os.remove(local_file_path)
-                if os.path.exists(audio_path):
-                    os.remove(audio_path)
-                if os.path.isdir(chunks_dir):
-                    shutil.rmtree(chunks_dir, ignore_errors=True)
-            except Exception:
-                pass
+                transcribed = self._transcribe_file(file_id, file_name, mime_type, report)
+                if transcribed["status"] != "success":
+                    return transcribed
+                transcript = transcribed["transcript"]
+                self.checkpoints.save(session_id, TRANSCRIPT_STAGE, {"transcript": transcript})
 
             # Phân tích transcript: tóm tắt và tách Q&A pairs
-            logger.info("Analyzing transcript...")
-            analysis_result = self.transcript_analyzer.analyze_transcript(transcript)
-
-            qa_pairs = analysis_result.get("qa_pairs", [])
-            qa_pairs = self._filter_professional_qa_pairs(qa_pairs)
+            analysis_result = self.checkpoints.get(session_id, QA_PAIRS_STAGE)
+            if analysis_result:
+                logger.info(f"Resuming session {session_id}: Q&A pairs already checkpointed")
+                qa_pairs = analysis_result.get("qa_pairs", [])
+            else:
+                logger.info("Analyzing transcript...")
+                report("analyze", 0.8)
+                analysis_result = self.transcript_analyzer.analyze_transcript(transcript)
+
+                qa_pairs = analysis_result.get("qa_pairs", [])
+                qa_pairs = self._filter_professional_qa_pairs(qa_pairs)
+                if qa_pairs:
+                    self.checkpoints.save(session_id, QA_PAIRS_STAGE, {
+                        "interviewer_name": analysis_result.get("interviewer_name", "Unknown"),
+                        "candidate_name": analysis_result.get("candidate_name", "Unknown"),
+                        "summary": analysis_result.get("summary", ""),
+                        "qa_pairs": qa_pairs
+                    })
 
             result = {
                 "status": "success",
+                "file_id": file_id,
+                "file_name": file_name,
+                "source_id": source_id,
+                "session_id": session_id,
                 "interviewer_name": analysis_result.get("interviewer_name", "Unknown"),
                 "candidate_name": analysis_result.get("candidate_name", "Unknown"),
                 "summary": analysis_result.get("summary", ""),
@@ -198,9 +146,125 @@ class DriveWebhookHandler:
                 "file_id": file_id
             }
 
-    def process_changes_since(self) -> Dict:
+    def _transcribe_file(
+        self,
+        file_id: str,
+        file_name: str,
+        mime_type: str,
+        report: Callable[[str, float], None]
+    ) -> Dict:
+        """Download a Drive media file, normalize it with ffmpeg and run STT per chunk"""
+        # Tải file về
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        file_extension = self._get_file_extension(mime_type)
+        local_file_path = os.path.join(
+            self.temp_dir,
+            f"{file_name}_{timestamp}{file_extension}"
+        )
+
+        logger.info(f"Downloading file to {local_file_path}...")
+        report("download", 0.05)
+        file_content = self.drive_service.download_file(file_id, local_file_path)
+
+        if not file_content:
+            return {
+                "status": "error",
+                "message": "Failed to download file"
+            }
+
+        # Chuẩn hóa về WAV 16k mono bằng ffmpeg (cho cả audio/video)
+        audio_path = os.path.join(self.temp_dir, f"{file_name}_{timestamp}.wav")
+        try:
+            report("transcode", 0.2)
+            logger.info("Normalizing media to wav 16k mono via ffmpeg...")
+            # ffmpeg -y -i input -vn -ac 1 -ar 16000 -acodec pcm_s16le output.wav
+            subprocess.run(
+                ["ffmpeg", "-y", "-i", local_file_path, "-vn", "-ac", "1", "-ar", "16000",
+                 "-acodec", "pcm_s16le", audio_path],
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+            logger.info(f"Audio ready at {audio_path}")
+        except Exception as e:
+            logger.error(f"ffmpeg convert failed: {e}")
+            return {
+                "status": "error",
+                "message": f"Failed to prepare audio: {e}"
+            }
+
+        # Nếu dài > ~60s, cắt thành các đoạn 55s và ghép transcript
+        chunks_dir = os.path.join(self.temp_dir, f"chunks_{timestamp}")
+        os.makedirs(chunks_dir, exist_ok=True)
+        chunk_pattern = os.path.join(chunks_dir, "chunk_%03d.wav")
         try:
-            with open('data/webhook_info.json', 'r') as f:
+            logger.info("Segmenting audio into 55s chunks via ffmpeg...")
+            # ffmpeg -i in.wav -f segment -segment_time 55 -ar 16000 -ac 1 -c:a pcm_s16le chunk_%03d.wav
+            subprocess.run(
+                ["ffmpeg", "-y", "-i", audio_path, "-f", "segment", "-segment_time", "55",
+                 "-ar", "16000", "-ac", "1", "-c:a", "pcm_s16le", "-reset_timestamps", "1", chunk_pattern],
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        except Exception as e:
+            logger.error(f"ffmpeg segment failed: {e}")
+            # Nếu segment lỗi, fallback: nhận toàn bộ (có thể fail nếu >60s)
+            chunks = [audio_path]
+        else:
+            # Thu thập các chunk được tạo; nếu chỉ có 1 chunk thì vẫn dùng
+            chunks = sorted(glob.glob(os.path.join(chunks_dir, "chunk_*.wav")))
+            if not chunks:
+                chunks = [audio_path]
+
+        # Chuyển đổi audio sang text (theo từng chunk nếu có)
+        logger.info("Starting speech-to-text conversion...")
+        transcripts: list[str] = []
+        for idx, chunk_path in enumerate(chunks, 1):
+            logger.info(f"Transcribing chunk {idx}/{len(chunks)}: {os.path.basename(chunk_path)}")
+            report("transcribe", 0.3 + 0.5 * (idx - 1) / len(chunks))
+            piece = self.speech_service.transcribe_audio_file(
+                chunk_path,
+                language_code="vi-VN"
+            )
+            if piece:
+                transcripts.append(piece)
+            else:
+                logger.warning(f"Empty transcript for chunk {idx}")
+
+        transcript = " ".join(transcripts).strip()
+
+        if not transcript:
+            return {
+                "status": "error",
+                "message": "Failed to transcribe audio",
+                "file_id": file_id,
+                "file_name": file_name
+            }
+
+        # Xóa file tạm
+        try:
+            # Clean up temp files
+            if os.path.exists(local_file_path):
+                os.remove(local_file_path)
+            if os.path.exists(audio_path):
+                os.remove(audio_path)
+            if os.path.isdir(chunks_dir):
+                shutil.rmtree(chunks_dir, ignore_errors=True)
+        except Exception:
+            pass
+
+        return {"status": "success", "transcript": transcript}
+
+    def collect_changed_media_files(self) -> Dict:
+        """
+        List media files changed since the saved start_page_token
+
+        The token is not advanced here; call save_start_page_token() with
+        `new_start_page_token` once the files have been handled.
+        """
+        try:
+            with open(WEBHOOK_INFO_PATH, 'r') as f:
                 info = json.load(f)
         except Exception:
             return {"status": "error", "message": "webhook_info.json not found"}
@@ -213,15 +277,13 @@ class DriveWebhookHandler:
         logger.info(f"Processing changes since token: {start_token}, folder_id: {folder_id}")
 
         service = self.drive_service.service
-        changes_processed = 0
-        files_processed = 0
+        files: Dict[str, Dict] = {}
         next_token = start_token
-        last_result = None  # Lưu kết quả của file cuối cùng được xử lý thành công
 
         while True:
             resp = service.changes().list(
                 pageToken=next_token,
-                fields="changes(fileId, file(name, mimeType, parents)),nextPageToken,newStartPageToken",
+                fields="changes(fileId, file(name, mimeType, parents, md5Checksum, modifiedTime)),nextPageToken,newStartPageToken",
                 includeItemsFromAllDrives=True,
                 supportsAllDrives=True
             ).execute()
@@ -252,32 +314,69 @@ class DriveWebhookHandler:
                     logger.warning(f"Skipping {file_name}: not audio/video (mimeType: {mime_type})")
                     continue
 
-                logger.info(f"Processing media file: {file_name} (ID: {file_id})")
-                files_processed += 1
-                try:
-                    result = self.handle_file_created(file_id, file_name)
-                    # Lưu kết quả nếu xử lý thành công
-                    if result.get("status") == "success":
-                        last_result = result
-                        logger.info(f"Successfully processed: {file_name}")
-                    else:
-                        logger.warning(f"Failed to process {file_name}: {result.get('message', 'Unknown error')}")
-                except Exception:
-                    self._log_exception(f"Error processing changed file: {file_id}")
-                changes_processed += 1
+                # Một file có thể xuất hiện nhiều lần trong change list -> giữ bản mới nhất
+                files[file_id] = {
+                    "file_id": file_id,
+                    "file_name": file_name,
+                    "mime_type": mime_type,
+                    "checksum": file.get('md5Checksum') or file.get('modifiedTime')
+                }
 
             next_token = resp.get('nextPageToken')
             if not next_token:
-                new_token = resp.get('newStartPageToken') or info.get('start_page_token')
-                info['start_page_token'] = new_token
-                logger.info(f"Updated start_page_token to: {new_token}")
-                try:
-                    with open('data/webhook_info.json', 'w') as f:
-                        json.dump(info, f, indent=2)
-                except Exception:
-                    self._log_exception("Failed to persist new start_page_token")
+                new_token = resp.get('newStartPageToken') or start_token
                 break
 
+        return {
+            "status": "success",
+            "files": list(files.values()),
+            "new_start_page_token": new_token
+        }
+
+    def save_start_page_token(self, token: str) -> None:
+        """Persist the change feed position after changes have been handled"""
+        try:
+            with open(WEBHOOK_INFO_PATH, 'r') as f:
+                info = json.load(f)
+            info['start_page_token'] = token
+            with open(WEBHOOK_INFO_PATH, 'w') as f:
+                json.dump(info, f, indent=2)
+            logger.info(f"Updated start_page_token to: {token}")
+        except Exception:
+            self._log_exception("Failed to persist new start_page_token")
+
+    def process_changes_since(
+        self,
+        progress_callback: Optional[Callable[[str, float], None]] = None
+    ) -> Dict:
+        collected = self.collect_changed_media_files()
+        if collected["status"] != "success":
+            return collected
+
+        changes_processed = 0
+        files_processed = 0
+        last_result = None  # Lưu kết quả của file cuối cùng được xử lý thành công
+
+        for file in collected["files"]:
+            file_id = file["file_id"]
+            file_name = file["file_name"]
+
+            logger.info(f"Processing media file: {file_name} (ID: {file_id})")
+            files_processed += 1
+            try:
+                result = self.handle_file_created(file_id, file_name, progress_callback)
+                # Lưu kết quả nếu xử lý thành công
+                if result.get("status") == "success":
+                    last_result = result
+                    logger.info(f"Successfully processed: {file_name}")
+                else:
+                    logger.warning(f"Failed to process {file_name}: {result.get('message', 'Unknown error')}")
+            except Exception:
+                self._log_exception(f"Error processing changed file: {file_id}")
+            changes_processed += 1
+
+        self.save_start_page_token(collected["new_start_page_token"])
+
         logger.info(f"Changes processing complete: {changes_processed} changes, {files_processed} files processed")
 
         # Trả về kết quả với summary và qa_pairs từ file cuối cùng (nếu có)
@@ -290,6 +389,8 @@ class DriveWebhookHandler:
         # Thêm thông tin từ file cuối cùng được xử lý thành công
         if last_result:
             response.update({
+                "source_id": last_result.get("source_id"),
+                "session_id": last_result.get("session_id"),
                 "interviewer_name": last_result.get("interviewer_name", "Unknown"),
                 "candidate_name": last_result.get("candidate_name", "Unknown"),
                 "summary": last_result.get("summary", ""),
@@ -70,7 +70,7 @@ class GoogleDriveService:
         try:
             file = self.service.files().get(
                 fileId=file_id,
-                fields='id,name,mimeType,createdTime,modifiedTime,size'
+                fields='id,name,mimeType,createdTime,modifiedTime,size,md5Checksum'
             ).execute()
             return file
         except Exception as e:
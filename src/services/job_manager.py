@@ -0,0 +1,225 @@
+"""
+In-process background execution for long-running interview processing jobs
+"""
+import math
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from config.settings import settings
+from src.utils.logger import logger
+
+
+# progress_callback(stage, progress) - progress là số thực trong khoảng [0, 1]
+ProgressCallback = Callable[[str, float], None]
+
+# Priority lanes, highest priority first
+INTERACTIVE = "interactive"  # Yêu cầu thủ công (recruiter đang chờ)
+BACKGROUND = "background"    # Webhook / backfill
+LANES = (INTERACTIVE, BACKGROUND)
+
+# Thời gian xử lý ước tính khi lane chưa có job nào hoàn tất
+DEFAULT_JOB_SECONDS = 180.0
+
+
+class JobManager:
+    """
+    Schedule pipeline jobs on a shared worker pool with priority lanes
+
+    Workers always take the oldest job of the highest-priority lane that is
+    below its concurrency limit, so a manual request never waits behind a
+    webhook backlog as long as background jobs cannot occupy every worker.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        lane_limits: Optional[Dict[str, int]] = None,
+        max_history: int = 500
+    ):
+        self.max_workers = max_workers or settings.job_workers
+        self.lane_limits = lane_limits or {
+            INTERACTIVE: settings.job_interactive_concurrency,
+            BACKGROUND: settings.job_background_concurrency
+        }
+        self.max_history = max_history
+        self._jobs: Dict[str, Dict] = {}
+        self._tasks: Dict[str, tuple] = {}
+        self._queues = {lane: deque() for lane in LANES}
+        self._running = {lane: 0 for lane in LANES}
+        self._avg_seconds = {lane: DEFAULT_JOB_SECONDS for lane in LANES}
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._shutdown = False
+        self._threads = []
+
+    def submit(self, job_type: str, func: Callable, *args, priority: str = BACKGROUND, **kwargs) -> str:
+        """
+        Queue a job for background execution
+
+        `func` is called as func(progress_callback, *args, **kwargs) and its
+        return value is stored as the job result.
+
+        Returns:
+            job_id
+        """
+        if priority not in LANES:
+            raise ValueError(f"Unknown priority lane: {priority}")
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "job_type": job_type,
+            "priority": priority,
+            "status": "queued",
+            "stage": "queued",
+            "progress": 0.0,
+            "result": None,
+            "error": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None
+        }
+
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Job manager is shut down")
+            self._ensure_workers()
+            self._jobs[job_id] = job
+            self._tasks[job_id] = (func, args, kwargs)
+            self._queues[priority].append(job_id)
+            self._prune_history()
+            self._cond.notify()
+
+        logger.info(f"Queued {job_type} job {job_id} ({priority})")
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Get a snapshot of a job's status, with queue position while queued"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return None
+
+            snapshot = dict(job)
+            if job["status"] == "queued":
+                position = self._queue_position(job_id, job["priority"])
+                snapshot["queue_position"] = position
+                snapshot["estimated_wait_seconds"] = self._estimate_wait(job["priority"], position)
+            return snapshot
+
+    def update_progress(self, job_id: str, stage: str, progress: float):
+        """Record the current stage and progress of a running job"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job["stage"] = stage
+                job["progress"] = round(max(job["progress"], min(progress, 1.0)), 3)
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting jobs; queued jobs are dropped"""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _ensure_workers(self):
+        # Tạo worker khi có job đầu tiên (tránh tạo thread lúc import)
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(
+                target=self._worker_loop,
+                name=f"interview-job-{len(self._threads)}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_lane(self) -> Optional[str]:
+        for lane in LANES:
+            if self._queues[lane] and self._running[lane] < self.lane_limits[lane]:
+                return lane
+        return None
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                lane = self._next_lane()
+                while lane is None and not self._shutdown:
+                    self._cond.wait()
+                    lane = self._next_lane()
+                if self._shutdown:
+                    return
+
+                job_id = self._queues[lane].popleft()
+                func, args, kwargs = self._tasks.pop(job_id)
+                self._running[lane] += 1
+
+            try:
+                self._run(job_id, lane, func, args, kwargs)
+            finally:
+                with self._cond:
+                    self._running[lane] -= 1
+                    self._cond.notify_all()
+
+    def _run(self, job_id: str, lane: str, func: Callable, args: tuple, kwargs: dict):
+        started = time.monotonic()
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = "running"
+            job["started_at"] = datetime.utcnow().isoformat()
+
+        def progress_callback(stage: str, progress: float):
+            self.update_progress(job_id, stage, progress)
+
+        try:
+            result = func(progress_callback, *args, **kwargs)
+            status = "failed" if isinstance(result, dict) and result.get("status") == "error" else "succeeded"
+            error = None
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            result, status, error = None, "failed", str(e)
+
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = status
+            job["stage"] = "done" if status == "succeeded" else job["stage"]
+            job["progress"] = 1.0 if status == "succeeded" else job["progress"]
+            job["result"] = result
+            job["error"] = error
+            job["finished_at"] = datetime.utcnow().isoformat()
+            # EMA thời gian xử lý để ước tính thời gian chờ
+            self._avg_seconds[lane] = 0.8 * self._avg_seconds[lane] + 0.2 * (time.monotonic() - started)
+
+        logger.info(f"Job {job_id} finished with status: {status}")
+
+    def _queue_position(self, job_id: str, lane: str) -> int:
+        """1-based position: jobs in higher-priority lanes run first"""
+        ahead = 0
+        for higher in LANES[:LANES.index(lane)]:
+            ahead += len(self._queues[higher])
+        return ahead + self._queues[lane].index(job_id) + 1
+
+    def _estimate_wait(self, lane: str, position: int) -> int:
+        concurrency = max(min(self.lane_limits[lane], self.max_workers), 1)
+        return int(math.ceil(position / concurrency) * self._avg_seconds[lane])
+
+    def _prune_history(self):
+        """Forget the oldest finished jobs once history grows past max_history"""
+        overflow = len(self._jobs) - self.max_history
+        if overflow <= 0:
+            return
+
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in ("succeeded", "failed")
+        ]
+        for job_id in finished[:overflow]:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager()
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from config.settings import settings
+from src.utils.metrics import metrics
+
+
+# Phân biệt "không có trong cache" với giá trị None đã cache
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after `ttl` seconds
+
+    Hits and misses are counted in `metrics` as cache.<name>.hits / .misses.
+    """
+
+    def __init__(self, name: str, maxsize: int = 512, ttl: float = 30.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value or MISSING"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                metrics.increment(f"cache.{self.name}.hits")
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+        metrics.increment(f"cache.{self.name}.misses")
+        return MISSING
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        hits = metrics.get(f"cache.{self.name}.hits")
+        misses = metrics.get(f"cache.{self.name}.misses")
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "size": size,
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl
+        }
+
+
+# Response cache cho /api/v1/interviews - invalidate trong SessionDatabase.save_session_summary
+interview_list_cache = TTLCache(
+    "interview_list",
+    maxsize=settings.response_cache_max_entries,
+    ttl=settings.response_cache_ttl_seconds
+)
+# Version của danh sách (max(updated_at), max(id)) - cache riêng để không làm lệch hit/miss của interview_list
+interview_list_version_cache = TTLCache(
+    "interview_list_version",
+    maxsize=1,
+    ttl=settings.response_cache_ttl_seconds
+)
+interview_detail_cache = TTLCache(
+    "interview_detail",
+    maxsize=settings.response_cache_max_entries,
+    ttl=settings.response_cache_ttl_seconds
+)
+# (name, role) -> users.id; id không đổi nên TTL dài, chỉ để không giữ id của user đã bị xóa mãi mãi
+user_id_cache = TTLCache(
+    "user_id",
+    maxsize=settings.user_id_cache_max_entries,
+    ttl=3600.0
+)
+CACHES = (interview_list_cache, interview_list_version_cache, interview_detail_cache, user_id_cache)
@@ -0,0 +1,32 @@
+import threading
+from collections import Counter
+from typing import Dict
+
+
+class Metrics:
+    """Thread-safe in-process counters (LLM calls, cache hits, ...)"""
+
+    def __init__(self):
+        self._counters = Counter()
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def get(self, name: str) -> int:
+        with self._lock:
+            return self._counters[name]
+
+    def total(self, prefix: str) -> int:
+        """Sum of all counters whose name starts with prefix"""
+        with self._lock:
+            return sum(v for k, v in self._counters.items() if k.startswith(prefix))
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+
+# Create default metrics registry
+metrics = Metrics()
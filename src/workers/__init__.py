@@ -0,0 +1 @@
+# Queue workers package
@@ -0,0 +1,71 @@
+"""
+Run queue workers
+
+Usage:
+    python -m src.workers                          # transcribe + grade
+    python -m src.workers --job-types transcribe --concurrency 2
+    python -m src.workers --job-types grade --concurrency 8
+    python -m src.workers --priorities interactive  # dedicated capacity for manual requests
+    python -m src.workers --requeue JOB_ID         # retry a dead-lettered job
+"""
+import argparse
+import signal
+import threading
+
+from src.database.job_queue_db import JobQueueDatabase, PRIORITY_LEVELS
+from src.workers.tasks import JOB_HANDLERS
+from src.workers.worker import Worker
+from src.utils.logger import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interview processing queue worker")
+    parser.add_argument("--job-types", default=",".join(JOB_HANDLERS),
+                        help="Comma-separated job types to claim (default: all)")
+    parser.add_argument("--priorities", default=",".join(PRIORITY_LEVELS),
+                        help="Comma-separated priority lanes to claim (default: all, interactive first)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of worker threads")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to wait when the queue is empty")
+    parser.add_argument("--lease-seconds", type=int, default=None, help="Job lease duration")
+    parser.add_argument("--requeue", metavar="JOB_ID", help="Requeue a dead-lettered job and exit")
+    args = parser.parse_args()
+
+    if args.requeue:
+        if JobQueueDatabase().requeue(args.requeue):
+            print(f"✓ Requeued job {args.requeue}")
+        else:
+            print(f"✗ Job {args.requeue} is not dead-lettered")
+        return
+
+    job_types = [t.strip() for t in args.job_types.split(",") if t.strip()]
+    priorities = [p.strip() for p in args.priorities.split(",") if p.strip()]
+    unknown = set(priorities) - set(PRIORITY_LEVELS)
+    if unknown:
+        parser.error(f"Unknown priorities: {', '.join(sorted(unknown))}")
+    stop_event = threading.Event()
+
+    def handle_signal(signum, frame):
+        logger.info("Shutdown requested, finishing current jobs...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    threads = []
+    for _ in range(args.concurrency):
+        worker = Worker(
+            job_types,
+            poll_interval=args.poll_interval,
+            lease_seconds=args.lease_seconds,
+            priorities=priorities
+        )
+        thread = threading.Thread(target=worker.run, args=(stop_event,), name=worker.worker_id)
+        thread.start()
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
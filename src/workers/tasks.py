@@ -0,0 +1,124 @@
+"""
+Durable job types executed by `python -m src.workers`
+"""
+import threading
+from typing import Callable, Dict, Optional
+
+from src.database.job_queue_db import JobQueueDatabase
+from src.utils.logger import logger
+
+
+TRANSCRIBE_JOB = "transcribe"  # Drive download + ffmpeg + STT + transcript analysis
+GRADE_JOB = "grade"            # process_interview_batch (grading + summary)
+REEMBED_JOB = "reembed"        # Re-embed questions into a shadow column, then flip search
+
+_local = threading.local()
+
+
+def _get_drive_handler():
+    """One DriveWebhookHandler per worker thread (Google API clients are not thread-safe)"""
+    if getattr(_local, "drive_handler", None) is None:
+        from src.services.drive_webhook_handler import DriveWebhookHandler
+        _local.drive_handler = DriveWebhookHandler()
+    return _local.drive_handler
+
+
+def enqueue_drive_file(
+    file_id: str,
+    file_name: Optional[str] = None,
+    checksum: Optional[str] = None,
+    priority: str = "background",
+    force: bool = False
+) -> str:
+    """
+    Queue a Drive file for transcription
+
+    With a checksum the job is keyed on (file id, checksum), so repeated
+    notifications for the same upload are only processed once. force
+    queues a new job even if one exists for this upload.
+    """
+    idempotency_key = f"drive:{file_id}:{checksum}" if checksum and not force else None
+    return JobQueueDatabase().enqueue(
+        TRANSCRIBE_JOB,
+        {"file_id": file_id, "file_name": file_name, "checksum": checksum},
+        idempotency_key=idempotency_key,
+        priority=priority
+    )
+
+
+def run_transcribe_job(job: Dict, progress_callback: Callable[[str, float], None]) -> Dict:
+    """Transcribe and analyse a Drive file, then queue grading as a separate job"""
+    payload = job["payload"]
+    result = _get_drive_handler().handle_file_created(
+        payload["file_id"],
+        payload.get("file_name"),
+        progress_callback=progress_callback
+    )
+
+    if result["status"] != "success":
+        return result
+
+    # Key theo job_id: retry job transcribe không tạo thêm job grade
+    grade_job_id = JobQueueDatabase().enqueue(
+        GRADE_JOB,
+        result,
+        idempotency_key=f"grade:{job['job_id']}",
+        priority=job["priority"]
+    )
+    logger.info(f"Queued grading job {grade_job_id} for file {payload['file_id']}")
+
+    return {
+        "status": "success",
+        "webhook_result": result,
+        "grade_job_id": grade_job_id
+    }
+
+
+def run_grade_job(job: Dict, progress_callback: Callable[[str, float], None]) -> Dict:
+    """Grade an analysed interview and save the session summary"""
+    from src.processors.batch_processor import process_interview_batch
+
+    return process_interview_batch(job["payload"], progress_callback=progress_callback)
+
+
+def enqueue_reembedding(model_name: str, chunk_size: int = 256) -> str:
+    """
+    Queue re-embedding of the question bank with model_name
+
+    Keyed on (active version, model): repeated requests for the same switch
+    are only queued once.
+    """
+    from src.database.embedding_db import EmbeddingVersionDatabase
+
+    active = EmbeddingVersionDatabase().active()
+    return JobQueueDatabase().enqueue(
+        REEMBED_JOB,
+        {"model": model_name, "chunk_size": chunk_size},
+        idempotency_key=f"reembed:{active['id']}:{model_name}"
+    )
+
+
+def run_reembed_job(job: Dict, progress_callback: Callable[[str, float], None]) -> Dict:
+    """Re-embed questions (resumes where a failed attempt stopped) and activate the new column"""
+    from src.processors.reembed_processor import run_reembedding
+
+    payload = job["payload"]
+    result = run_reembedding(
+        payload["model"],
+        chunk_size=payload.get("chunk_size", 256),
+        progress_callback=progress_callback
+    )
+    version = result["version"]
+    return {
+        "status": result["status"],
+        "embedded": result.get("embedded", 0),
+        "model": version["model"],
+        "column_name": version["column_name"]
+    }
+
+
+JOB_HANDLERS = {
+    TRANSCRIBE_JOB: run_transcribe_job,
+    GRADE_JOB: run_grade_job,
+    REEMBED_JOB: run_reembed_job,
+}
@@ -0,0 +1,104 @@
+"""
+Queue worker: claims processing_jobs and runs them with lease heartbeats
+"""
+import os
+import socket
+import threading
+import uuid
+from typing import Dict, List, Optional
+
+from config.settings import settings
+from src.database.job_queue_db import JobQueueDatabase
+from src.workers.tasks import JOB_HANDLERS
+from src.utils.logger import logger
+
+
+class Worker:
+    """Poll the durable queue for the given job types and execute claimed jobs"""
+
+    def __init__(
+        self,
+        job_types: List[str],
+        worker_id: Optional[str] = None,
+        poll_interval: float = 2.0,
+        lease_seconds: Optional[int] = None,
+        priorities: Optional[List[str]] = None
+    ):
+        unknown = set(job_types) - set(JOB_HANDLERS)
+        if unknown:
+            raise ValueError(f"Unknown job types: {', '.join(sorted(unknown))}")
+
+        self.job_types = job_types
+        self.priorities = priorities
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds or settings.job_lease_seconds
+        self.queue = JobQueueDatabase()
+
+    def run(self, stop_event: threading.Event):
+        """Process jobs until stop_event is set"""
+        logger.info(f"Worker {self.worker_id} started for: {', '.join(self.job_types)}")
+
+        while not stop_event.is_set():
+            try:
+                worked = self.run_once()
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} loop error: {e}", exc_info=True)
+                worked = False
+
+            if not worked:
+                stop_event.wait(self.poll_interval)
+
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def run_once(self) -> bool:
+        """
+        Claim and execute at most one job
+
+        Returns:
+            True if a job was claimed
+        """
+        job = self.queue.claim(self.job_types, self.worker_id, self.lease_seconds, self.priorities)
+        if not job:
+            return False
+
+        self._execute(job)
+        return True
+
+    def _execute(self, job: Dict):
+        job_id = job["job_id"]
+        state = {"stage": "running", "progress": 0.0}
+        finished = threading.Event()
+
+        def progress_callback(stage: str, progress: float):
+            state["stage"] = stage
+            state["progress"] = round(max(state["progress"], min(progress, 1.0)), 3)
+
+        def heartbeat_loop():
+            while not finished.wait(self.lease_seconds / 3):
+                if not self.queue.heartbeat(job_id, self.worker_id, self.lease_seconds, state["stage"], state["progress"]):
+                    logger.warning(f"Worker {self.worker_id} lost the lease on job {job_id}")
+                    return
+
+        heartbeat = threading.Thread(target=heartbeat_loop, name=f"heartbeat-{job_id[:8]}", daemon=True)
+        heartbeat.start()
+
+        try:
+            result = JOB_HANDLERS[job["job_type"]](job, progress_callback)
+            if isinstance(result, dict) and result.get("status") == "error":
+                error = result.get("message", "Job returned an error")
+            else:
+                error = None
+        except Exception as e:
+            logger.error(f"Job {job_id} raised: {e}", exc_info=True)
+            result, error = None, str(e)
+        finally:
+            finished.set()
+            heartbeat.join()
+
+        if error is None:
+            self.queue.complete(job_id, self.worker_id, result)
+            logger.info(f"Job {job_id} succeeded")
+        else:
+            status = self.queue.fail(job_id, self.worker_id, error)
+            logger.warning(f"Job {job_id} failed ({status}): {error}")
@@ -0,0 +1,88 @@
+"""
+fields= / exclude= projection of API payloads (src/api/routes.py)
+"""
+from src.api.routes import _exclude_fields, _field_tree, _include_fields, _project
+
+
+DETAIL = {
+    "session_id": "uuid-123",
+    "candidate": "Trần Thị B",
+    "overallScore": 8.5,
+    "questions": [
+        {"question": "REST và GraphQL?", "score": 8.5, "feedback": "Tốt", "correctAnswer": "REST..."},
+        {"question": "Index là gì?", "score": 6.0, "feedback": "Ổn", "correctAnswer": "B-tree..."}
+    ]
+}
+
+
+def test_field_tree_empty():
+    assert _field_tree(None) is None
+    assert _field_tree("") is None
+    assert _field_tree(" , ,") is None
+
+
+def test_field_tree_nested_paths():
+    assert _field_tree(" candidate , questions.score,questions.question") == {
+        "candidate": True,
+        "questions": {"score": True, "question": True}
+    }
+
+
+def test_field_tree_parent_overrides_child():
+    assert _field_tree("questions,questions.score") == {"questions": True}
+    assert _field_tree("questions.score,questions") == {"questions": True}
+    assert _field_tree("questions.feedback.text,questions.feedback") == {"questions": {"feedback": True}}
+
+
+def test_include_traverses_lists():
+    result = _include_fields(DETAIL, _field_tree("candidate,questions.score"))
+    assert result == {"candidate": "Trần Thị B", "questions": [{"score": 8.5}, {"score": 6.0}]}
+
+
+def test_include_parent_keeps_whole_value():
+    result = _include_fields(DETAIL, _field_tree("questions,questions.score"))
+    assert result == {"questions": DETAIL["questions"]}
+
+
+def test_include_skips_missing_keys():
+    result = _include_fields(DETAIL, _field_tree("overallScore,missing,questions.missing"))
+    assert result == {"overallScore": 8.5, "questions": [{}, {}]}
+
+
+def test_include_path_below_scalar_keeps_scalar():
+    assert _include_fields(DETAIL, _field_tree("candidate.name")) == {"candidate": "Trần Thị B"}
+
+
+def test_exclude_traverses_lists():
+    result = _exclude_fields(DETAIL, _field_tree("questions.correctAnswer,questions.feedback"))
+    assert result["questions"] == [
+        {"question": "REST và GraphQL?", "score": 8.5},
+        {"question": "Index là gì?", "score": 6.0}
+    ]
+    assert result["candidate"] == DETAIL["candidate"]
+
+
+def test_exclude_ignores_missing_keys():
+    assert _exclude_fields(DETAIL, _field_tree("missing,questions.missing")) == DETAIL
+
+
+def test_exclude_parent_drops_whole_value():
+    result = _exclude_fields(DETAIL, _field_tree("questions,questions.score"))
+    assert "questions" not in result
+    assert result["overallScore"] == 8.5
+
+
+def test_project_fields_then_exclude():
+    result = _project(DETAIL, "candidate,questions", "questions.correctAnswer,questions.feedback")
+    assert result == {
+        "candidate": "Trần Thị B",
+        "questions": [
+            {"question": "REST và GraphQL?", "score": 8.5},
+            {"question": "Index là gì?", "score": 6.0}
+        ]
+    }
+
+
+def test_project_without_params_returns_payload():
+    assert _project(DETAIL, None, None) is DETAIL
+    assert DETAIL["questions"][0]["correctAnswer"] == "REST..."